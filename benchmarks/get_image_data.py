@@ -0,0 +1,66 @@
+"""
+Per-call overhead of `ImageControl.get_image_data` against a stubbed library.
+
+Compares the previous implementation, which queried the image description and built
+a new ctypes array type on every call, with the cached image format.
+
+    python benchmarks/get_image_data.py
+"""
+
+import ctypes
+import timeit
+
+import numpy as np
+
+from tisgrabber.wrapper import ImageControl
+
+WIDTH, HEIGHT, BITS_PER_PIXEL = 1920, 1200, 24
+
+
+class StubLibrary:
+    """Stand-in for the tisgrabber DLL with a static image."""
+
+    def __init__(self) -> None:
+        self.image = np.zeros((HEIGHT, WIDTH, BITS_PER_PIXEL // 8), dtype=np.uint8)
+
+    def IC_InitLibrary(self, license_key):
+        return 1
+
+    def IC_GetImageDescription(self, grabber, width, height, bits_per_pixel, fmt):
+        width.value, height.value = WIDTH, HEIGHT
+        bits_per_pixel.value, fmt.value = BITS_PER_PIXEL, 1
+        return 1
+
+    def IC_GetImagePtr(self, grabber):
+        return self.image.ctypes.data_as(ctypes.POINTER(ctypes.c_void_p))
+
+
+def get_image_data_uncached(ic: ImageControl, grabber) -> np.ndarray:
+    """The implementation before the image format cache."""
+    width, height, bits_per_pixel, _ = ic.get_image_description(grabber)
+    buffer_size = width * height * bits_per_pixel // 8
+    image_ptr = ic._get_image_ptr(grabber)
+    image_data = ctypes.cast(image_ptr, ctypes.POINTER(ctypes.c_ubyte * buffer_size))
+    return np.ndarray(
+        buffer=image_data.contents,
+        dtype=np.uint8,
+        shape=(height, width, bits_per_pixel // 8),
+    )
+
+
+def main(number: int = 100_000) -> dict[str, float]:
+    ic = ImageControl(library=StubLibrary())
+    grabber = ctypes.pointer(ctypes.c_int())
+    results = {
+        "uncached": timeit.timeit(
+            lambda: get_image_data_uncached(ic, grabber), number=number
+        ),
+        "cached": timeit.timeit(lambda: ic.get_image_data(grabber), number=number),
+    }
+    for name, total in results.items():
+        print(f"{name:>10}: {1e6 * total / number:.2f} µs per call")
+    return results
+
+
+if __name__ == "__main__":
+    main()
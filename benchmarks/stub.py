@@ -0,0 +1,143 @@
+"""
+A minimal stand-in for the tisgrabber DLL, for measuring the cost of the Python layer.
+
+Unlike `tisgrabber.simulated.SimulatedLibrary`, every function returns immediately
+with fixed values, so that benchmarks measure the wrapper and not the simulation.
+"""
+
+import ctypes
+
+import numpy as np
+
+from tisgrabber.tisgrabber import (
+    DEVICELOSTCALLBACK,
+    ENUMCODECCB,
+    FRAMEREADYCALLBACK,
+    FRAMEREADYCALLBACKEX,
+)
+
+WIDTH, HEIGHT, BITS_PER_PIXEL, COLOR_FORMAT = 1920, 1200, 24, 1
+
+
+def _set(arg, value) -> None:
+    # output arguments are passed as `byref(obj)` or as the ctypes object itself
+    getattr(arg, "_obj", arg).value = value
+
+
+class StubLibrary:
+    """Stand-in for the tisgrabber DLL with every property available and an image."""
+
+    FRAMEREADYCALLBACK = FRAMEREADYCALLBACK
+    FRAMEREADYCALLBACKEX = FRAMEREADYCALLBACKEX
+    DEVICELOSTCALLBACK = DEVICELOSTCALLBACK
+    ENUMCODECCB = ENUMCODECCB
+
+    def __init__(self) -> None:
+        self.image = np.zeros((HEIGHT, WIDTH, BITS_PER_PIXEL // 8), dtype=np.uint8)
+        self.image_ptr = self.image.ctypes.data_as(ctypes.POINTER(ctypes.c_void_p))
+        self.frame_ready_callback = None
+        self.frame_ready_data = None
+
+    def IC_InitLibrary(self, license_key):
+        return 1
+
+    def IC_CloseLibrary(self):
+        pass
+
+    def IC_GetImageDescription(self, grabber, width, height, bits_per_pixel, fmt):
+        _set(width, WIDTH)
+        _set(height, HEIGHT)
+        _set(bits_per_pixel, BITS_PER_PIXEL)
+        _set(fmt, COLOR_FORMAT)
+        return 1
+
+    def IC_GetImagePtr(self, grabber):
+        return self.image_ptr
+
+    def IC_SetFrameReadyCallback(self, grabber, callback, data):
+        self.frame_ready_callback = callback
+        self.frame_ready_data = data
+        return 1
+
+    def IC_IsCameraPropertyAvailable(self, grabber, prop):
+        return 1
+
+    def IC_IsCameraPropertyAutoAvailable(self, grabber, prop):
+        return 1
+
+    def IC_CameraPropertyGetRange(self, grabber, prop, minimum, maximum):
+        _set(minimum, 0)
+        _set(maximum, 100)
+        return 1
+
+    def IC_GetCameraProperty(self, grabber, prop, value):
+        _set(value, 50)
+        return 1
+
+    def IC_SetCameraProperty(self, grabber, prop, value):
+        return 1
+
+    def IC_EnableAutoCameraProperty(self, grabber, prop, enable):
+        return 1
+
+    def IC_GetAutoCameraProperty(self, grabber, prop, value):
+        _set(value, 0)
+        return 1
+
+    def IC_IsVideoPropertyAvailable(self, grabber, prop):
+        return 1
+
+    def IC_IsVideoPropertyAutoAvailable(self, grabber, prop):
+        return 1
+
+    def IC_VideoPropertyGetRange(self, grabber, prop, minimum, maximum):
+        _set(minimum, 0)
+        _set(maximum, 100)
+        return 1
+
+    def IC_GetVideoProperty(self, grabber, prop, value):
+        _set(value, 50)
+        return 1
+
+    def IC_SetVideoProperty(self, grabber, prop, value):
+        return 1
+
+    def IC_EnableAutoVideoProperty(self, grabber, prop, enable):
+        return 1
+
+    def IC_GetAutoVideoProperty(self, grabber, prop, value):
+        _set(value, 0)
+        return 1
+
+    def IC_GetExpRegVal(self, grabber, value):
+        _set(value, -5)
+        return 1
+
+    def IC_SetExpRegVal(self, grabber, value):
+        return 1
+
+    def IC_GetPropertyAbsoluteValue(self, grabber, item, element, value):
+        _set(value, 0.01)
+        return 1
+
+    def IC_GetPropertyAbsoluteValueRange(
+        self, grabber, item, element, minimum, maximum
+    ):
+        _set(minimum, 0.0001)
+        _set(maximum, 1.0)
+        return 1
+
+    def IC_SetPropertyAbsoluteValue(self, grabber, item, element, value):
+        return 1
+
+    def IC_GetPropertyValue(self, grabber, item, element, value):
+        _set(value, 50)
+        return 1
+
+    def IC_GetPropertyValueRange(self, grabber, item, element, minimum, maximum):
+        _set(minimum, 0)
+        _set(maximum, 100)
+        return 1
+
+    def IC_SetPropertyValue(self, grabber, item, element, value):
+        return 1
@@ -0,0 +1,330 @@
+"""
+Benchmarks of the hot paths of the Python layer, run against a stubbed library.
+
+Every benchmark measures the time per call of the wrapper on top of a library that
+returns immediately (see `stub.py`), so that the numbers show what the Python layer
+costs on top of the DLL. Results are written as JSON and can be compared against a
+previous run to find regressions between releases.
+
+    python benchmarks/suite.py -o results.json
+    python benchmarks/suite.py --compare baseline.json --threshold 0.2
+"""
+
+import argparse
+import ctypes
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Callable, Optional
+
+from stub import StubLibrary
+
+import tisgrabber.cam as cam
+from tisgrabber.simulated import SimulatedLibrary
+from tisgrabber.structs import HGRABBER
+from tisgrabber.wrapper import ImageControl
+
+REPOSITORY = Path(__file__).resolve().parent.parent
+
+# name -> setup function returning the callable to time
+BENCHMARKS: dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(setup: Callable[[], Callable[[], object]]):
+    BENCHMARKS[setup.__name__] = setup
+    return setup
+
+
+def _camera() -> cam.Camera:
+    cam.ic = ImageControl(StubLibrary())
+    return cam.Camera(ctypes.pointer(HGRABBER()))
+
+
+@benchmark
+def get_image_data():
+    camera = _camera()
+    return camera.get_image_data
+
+
+@benchmark
+def get_image_data_out():
+    camera = _camera()
+    out = camera.get_image_data().copy()
+    return lambda: camera.get_image_data(out)
+
+
+@benchmark
+def get_image_data_instrumented():
+    camera = _camera()
+    cam.ic.enable_instrumentation()
+    return camera.get_image_data
+
+
+@benchmark
+def camera_setting_get():
+    setting = _camera().focus
+    return lambda: setting.value
+
+
+@benchmark
+def camera_setting_set():
+    setting = _camera().focus
+    return lambda: setattr(setting, "value", 50)
+
+
+@benchmark
+def video_setting_get():
+    setting = _camera().brightness
+    return lambda: setting.setting
+
+
+@benchmark
+def video_setting_set():
+    setting = _camera().brightness
+    return lambda: setattr(setting, "setting", 50)
+
+
+@benchmark
+def video_setting_get_cached():
+    camera = _camera()
+    camera.enable_property_cache()
+    setting = camera.brightness
+    return lambda: setting.setting
+
+
+@benchmark
+def property_get():
+    camera = _camera()
+    return lambda: cam.ic.get_property_absolute_value(
+        camera._grabber, "Exposure", "Value"
+    )
+
+
+@benchmark
+def property_handle_get():
+    handle = _camera().property_handle("Exposure", "Value")
+    return lambda: handle.value
+
+
+@benchmark
+def property_set():
+    camera = _camera()
+    return lambda: cam.ic.set_property_absolute_value(
+        camera._grabber, "Exposure", "Value", 0.01
+    )
+
+
+@benchmark
+def property_handle_set():
+    handle = _camera().property_handle("Exposure", "Value")
+    return lambda: setattr(handle, "value", 0.01)
+
+
+@benchmark
+def property_range():
+    camera = _camera()
+    return lambda: cam.ic.get_property_absolute_value_range(
+        camera._grabber, "Exposure", "Value"
+    )
+
+
+@benchmark
+def property_handle_range():
+    handle = _camera().property_handle("Exposure", "Value")
+    return lambda: handle.range
+
+
+@benchmark
+def callback_dispatch_baseline():
+    # a ctypes callback that does nothing, i.e. the cost of crossing into Python
+    library = StubLibrary()
+    callback = library.FRAMEREADYCALLBACK(lambda grabber, ptr, number, data: None)
+    grabber = ctypes.pointer(HGRABBER())
+    ptr = ctypes.cast(library.image_ptr, ctypes.POINTER(ctypes.c_ubyte))
+    return lambda: callback(grabber, ptr, 0, None)
+
+
+@benchmark
+def callback_dispatch():
+    # the frame handler wrapper: frame log, image format lookup and image view
+    camera = _camera()
+    camera.set_frame_handler(lambda image, frame_number: None)
+    library = cam.ic._ic
+    callback = library.frame_ready_callback
+    grabber = camera._grabber
+    ptr = ctypes.cast(library.image_ptr, ctypes.POINTER(ctypes.c_ubyte))
+    return lambda: callback(grabber, ptr, 0, None)
+
+
+@benchmark
+def camera_init():
+    cam.ic = ImageControl(StubLibrary())
+    grabber = ctypes.pointer(HGRABBER())
+    return lambda: cam.Camera(grabber)
+
+
+def count_calls() -> dict[str, int]:
+    """Count the library calls of opening a camera and of using its settings."""
+    library = SimulatedLibrary()
+    cam.ic = ImageControl(library)
+    grabber = cam.ic.create_grabber()
+    cam.ic.open_dev_by_unique_name(grabber, cam.ic.get_unique_name_from_list(0))
+    counts = {}
+    library.calls.clear()
+    camera = cam.Camera(grabber)
+    counts["camera_init"] = library.calls.total()
+    library.calls.clear()
+    camera.brightness.setting
+    counts["video_setting_first_get"] = library.calls.total()
+    library.calls.clear()
+    camera.brightness.setting
+    counts["video_setting_get"] = library.calls.total()
+    cam.ic.release_grabber(grabber)
+    return counts
+
+
+def measure(
+    function: Callable[[], object], repeat: int, min_time: float
+) -> tuple[int, list[float]]:
+    """Return the number of calls per round and the time per call of every round."""
+    timer = timeit.Timer(function)
+    number, total = timer.autorange()
+    number = max(1, int(number * min_time / max(total, 1e-9)))
+    times = timer.repeat(repeat=repeat, number=number)
+    return number, [t / number for t in times]
+
+
+def measure_import(module: str, repeat: int) -> list[float]:
+    """Time `import module` in fresh interpreters, without interpreter startup."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    env = dict(os.environ, PYTHONPATH=str(REPOSITORY))
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            env=env,
+            text=True,
+        ).stdout
+        times.append(float(output))
+    return times
+
+
+def summarize(number: int, times: list[float]) -> dict[str, float]:
+    return {
+        "number": number,
+        "repeat": len(times),
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "ops_per_second": 1 / min(times),
+    }
+
+
+def metadata() -> dict[str, Optional[str]]:
+    try:
+        package_version = version("py-tisgrabber")
+    except PackageNotFoundError:
+        package_version = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            cwd=REPOSITORY,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "version": package_version,
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def run(
+    names: list[str], repeat: int = 5, min_time: float = 0.2
+) -> dict[str, dict[str, float]]:
+    results = {}
+    for name in names:
+        if name == "import_cam":
+            times = measure_import("tisgrabber.cam", repeat)
+            results[name] = summarize(1, times)
+        else:
+            number, times = measure(BENCHMARKS[name](), repeat, min_time)
+            results[name] = summarize(number, times)
+        print(f"{name:>28}: {1e6 * results[name]['min']:10.2f} µs")
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]], baseline_path: Path, threshold: float
+) -> list[str]:
+    """Print the change against a baseline and return the names of regressions."""
+    baseline = json.loads(baseline_path.read_text())["results"]
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        change = result["min"] / baseline[name]["min"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:>28}: {100 * change:+7.1f} %{flag}")
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-o", "--output", type=Path, help="write results as JSON")
+    parser.add_argument("--compare", type=Path, help="JSON results to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown reported as regression (default: 0.1)",
+    )
+    parser.add_argument("--filter", default="", help="only run matching benchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per round")
+    args = parser.parse_args(argv)
+
+    names = [name for name in [*BENCHMARKS, "import_cam"] if args.filter in name]
+    start = time.perf_counter()
+    results = run(names, args.repeat, args.min_time)
+    counts = count_calls()
+    for name, count in counts.items():
+        print(f"{name:>28}: {count:7d} library calls")
+    report = {
+        "metadata": metadata(),
+        "unit": "seconds per call",
+        "results": results,
+        "library_calls": counts,
+    }
+    print(f"{len(results)} benchmarks in {time.perf_counter() - start:.1f} s")
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.compare is not None:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import ctypes
+
+import pytest
+
+import tisgrabber.cam as cam
+from tisgrabber.simulated import SimulatedLibrary
+from tisgrabber.tisgrabber import _declarations
+from tisgrabber.wrapper import ImageControl
+
+
+def prototyped(library, name):
+    """
+    The simulated function behind a ctypes function pointer of its declared prototype.
+
+    Like the DLL, it rejects calls whose arguments do not match the `argtypes`.
+    """
+    prototype = _declarations()._prototypes[name]
+    function_type = ctypes.CFUNCTYPE(prototype.restype, *prototype.argtypes)
+    return function_type(getattr(library, name))
+
+
+@pytest.fixture
+def library():
+    return SimulatedLibrary()
+
+
+@pytest.fixture
+def ic(library, monkeypatch):
+    ic = ImageControl(library)
+    monkeypatch.setattr(cam, "ic", ic)
+    return ic
+
+
+@pytest.fixture
+def camera(ic):
+    grabber = ic.create_grabber()
+    ic.open_dev_by_unique_name(grabber, ic.get_unique_name_from_list(0))
+    camera = cam.Camera(grabber)
+    yield camera
+    camera.release_grabber()
@@ -0,0 +1,78 @@
+import asyncio
+import contextlib
+import threading
+
+import numpy as np
+import pytest
+
+from tisgrabber.acquisition import Acquisition
+from tisgrabber.replay import ReplayCamera
+
+
+def test_missing_primitive_fails_on_instantiation():
+    class Incomplete(Acquisition):
+        def start_live(self):
+            pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        Incomplete()
+
+
+def test_stream_restores_previous_handler():
+    camera = ReplayCamera(np.arange(2 * 4 * 8 * 3, dtype=np.uint8).reshape(2, 4, 8, 3))
+
+    def previous(image, frame_number):
+        pass
+
+    camera.set_frame_handler(previous)
+
+    async def receive():
+        async with contextlib.aclosing(camera.stream()) as frames:
+            async for frame in frames:
+                assert camera.frame_handler != previous
+                array = frame.array.copy()
+                frame.release()
+                return array
+
+    image = asyncio.run(receive())
+    assert image.shape == (4, 8, 3)
+    assert not camera.is_live
+    assert camera.frame_handler is previous
+
+
+@pytest.fixture
+def replay():
+    frames = np.arange(4 * 4 * 8 * 3, dtype=np.uint8).reshape(4, 4, 8, 3)
+    camera = ReplayCamera(frames, frame_rate=None)
+    yield camera
+    camera.release_grabber()
+
+
+def test_burst(replay):
+    replay.start_live()
+    burst = replay.burst(3, timeout=5.0)
+    assert burst.images.shape == (3, 4, 8, 3)
+    assert list(np.diff(burst.frame_numbers)) == [1, 1]
+    assert replay.frame_handler is None
+
+
+@pytest.mark.parametrize("n", [0, -1])
+def test_burst_requires_frames(replay, n):
+    with pytest.raises(ValueError):
+        replay.burst(n, timeout=0.01)
+
+
+def test_burst_timeout_restores_handler(replay):
+    def previous(image, frame_number):
+        pass
+
+    replay.set_frame_handler(previous)
+    replay.enable_trigger(True)
+    replay.start_live()
+    # a single frame once the burst has been armed
+    trigger = threading.Timer(0.05, replay.software_trigger)
+    trigger.start()
+    with pytest.raises(TimeoutError, match="1 of 2"):
+        replay.burst(2, timeout=0.5)
+    trigger.join()
+    assert replay.frame_handler is previous
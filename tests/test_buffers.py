@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+import tisgrabber.cam as cam
+from tisgrabber.exceptions import ICError
+
+
+@pytest.fixture
+def ring(camera):
+    ring = camera.ring_buffer(3)
+    camera.start_live()
+    camera.snap_image(timeout=2000)
+    yield ring
+    ring.close()
+    camera.stop_live()
+
+
+def test_acquire_locks_and_releases(ring, library):
+    slot = ring.acquire(0)
+    assert ring.locked_indices == [0]
+    assert slot.data.shape == (480, 640, 3)
+    slot.release()
+    assert slot.released
+    assert ring.locked_indices == []
+    assert library.calls["IC_ReleaseMemBuffer"] == 1
+    with pytest.raises(ICError):
+        slot.data
+
+
+def test_nested_locks(ring):
+    with ring.last() as first, ring.acquire(first.index):
+        first.release()
+        assert ring.locked_indices == [first.index]
+    assert ring.locked_indices == []
+
+
+def test_acquire_out_of_range(ring):
+    with pytest.raises(IndexError):
+        ring.acquire(3)
+
+
+def test_callback_buffers_are_not_released(camera, library):
+    ring = camera.ring_buffer(3)
+    slots = []
+    received = threading.Event()
+
+    def on_frame(frame, data):
+        if not received.is_set():
+            slots.append(frame.lock(ring))
+            received.set()
+
+    camera.set_frame_ready_callback_ex(on_frame)
+    camera.start_live()
+    try:
+        assert received.wait(2.0)
+    finally:
+        camera.stop_live()
+    ring.close()
+    assert slots[0].released
+    assert library.calls["IC_ReleaseMemBuffer"] == 0
+
+
+def test_geometry_is_described_again_after_invalidation(camera, library):
+    frames = []
+    described = []
+    enough = threading.Event()
+
+    def on_frame(frame, data):
+        frames.append(frame.shape)
+        if len(frames) == 2:
+            # e.g. a new ROI
+            cam.ic.invalidate_image_format(camera._grabber)
+        elif len(frames) == 4:
+            described.append(library.calls["IC_GetMemBufferDescription"])
+            enough.set()
+
+    # the four frames are delivered in buffers 0, 1, 0, 1
+    camera.ring_buffer(2)
+    camera.set_frame_ready_callback_ex(on_frame)
+    camera.start_live()
+    try:
+        assert enough.wait(2.0)
+    finally:
+        camera.stop_live()
+    # once per buffer, and again after the invalidation
+    assert described == [4]
+    assert set(frames[:4]) == {(480, 640, 3)}
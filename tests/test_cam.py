@@ -0,0 +1,183 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import tisgrabber.cam as cam
+from tisgrabber.cam import PropertyCache
+from tisgrabber.wrapper import ImageControl
+
+
+def test_cache_hits_and_misses():
+    cache = PropertyCache()
+    queries = []
+
+    def query(value):
+        queries.append(value)
+        return value
+
+    assert cache.get("key", query, 1) == 1
+    assert cache.get("key", query, 2) == 1
+    assert queries == [1]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_entries_expire():
+    cache = PropertyCache(ttl=0.05)
+    cache.get("key", lambda: 1)
+    assert cache.get("key", lambda: 2) == 1
+    time.sleep(0.06)
+    assert cache.get("key", lambda: 3) == 3
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_auto_modes_expire_without_ttl():
+    cache = PropertyCache(auto_ttl=0.05)
+    cache.get("value", lambda: 1)
+    cache.get_auto("auto", lambda: False)
+    time.sleep(0.06)
+    assert cache.get("value", lambda: 2) == 1
+    assert cache.get_auto("auto", lambda: True) is True
+
+
+def test_refresh_keeps_ranges(library, camera):
+    cache = camera.enable_property_cache()
+    camera.gain.setting
+    camera.gain.setting_range
+    cache.refresh()
+    calls = library.calls.copy()
+    camera.gain.setting
+    camera.gain.setting_range
+    assert library.calls - calls == {
+        "IC_GetAutoVideoProperty": 1,
+        "IC_GetVideoProperty": 1,
+    }
+
+
+def test_auto_mode_bypasses_cache(library, ic, camera):
+    cache = camera.enable_property_cache()
+    camera.gain.auto = True
+    calls = library.calls["IC_GetVideoProperty"]
+    camera.gain.setting
+    camera.gain.setting
+    assert library.calls["IC_GetVideoProperty"] == calls + 2
+    assert cache.bypassed == 2
+
+
+def test_auto_mode_switched_elsewhere_is_seen(ic, camera):
+    camera.enable_property_cache(auto_ttl=0.05)
+    assert camera.gain.auto is False
+    ic.set_property_switch(camera._grabber, "Gain", "Auto", True)
+    time.sleep(0.06)
+    assert camera.gain.auto is True
+
+
+def test_property_handle_write_refreshes_cache(camera):
+    camera.enable_property_cache()
+    assert camera.gain.setting == 16
+    camera.property_handle("Gain", "Value", int).value = 21
+    assert camera.gain.setting == 21
+
+
+def test_property_dialog_refreshes_cache(library, camera):
+    camera.enable_property_cache()
+    camera.gain.setting
+    camera.show_property_dialog()
+    calls = library.calls["IC_GetVideoProperty"]
+    camera.gain.setting
+    assert library.calls["IC_GetVideoProperty"] == calls + 1
+
+
+def test_import_loads_no_library():
+    # the DLL cannot be loaded here, importing must not try
+    code = "import tisgrabber.cam as cam; assert cam.ic._instance is None"
+    env = dict(os.environ, TISGRABBER_BACKEND="dll")
+    root = Path(__file__).parents[1]
+    subprocess.run([sys.executable, "-c", code], env=env, cwd=root, check=True)
+
+
+def test_concurrent_first_use_creates_one_instance(library, monkeypatch):
+    created = []
+
+    def create():
+        created.append(threading.current_thread())
+        # widen the window in which other threads could create one as well
+        time.sleep(0.05)
+        return ImageControl(library)
+
+    monkeypatch.setattr(cam, "ImageControl", create)
+    lazy = cam._LazyImageControl()
+    barrier = threading.Barrier(8)
+
+    def use(_):
+        barrier.wait()
+        return lazy.instance
+
+    with ThreadPoolExecutor(8) as executor:
+        instances = set(executor.map(use, range(8)))
+    assert len(created) == 1
+    assert instances == {lazy.instance}
+
+
+def test_property_handle_keeps_the_instance(library, monkeypatch):
+    lazy = cam._LazyImageControl()
+    monkeypatch.setattr(cam, "ic", lazy)
+    monkeypatch.setattr(cam, "ImageControl", lambda: ImageControl(library))
+    grabber = lazy.create_grabber()
+    lazy.open_dev_by_unique_name(grabber, lazy.get_unique_name_from_list(0))
+    handle = cam.Camera(grabber).property_handle("Gain", "Value", int)
+    assert handle._ic is lazy.instance
+    assert handle.value == 16
+    lazy.release_grabber(grabber)
+
+
+def test_creating_a_camera_makes_no_calls(library, ic):
+    grabber = ic.create_grabber()
+    ic.open_dev_by_unique_name(grabber, ic.get_unique_name_from_list(0))
+    calls = library.calls.copy()
+    cam.Camera(grabber)
+    assert library.calls == calls
+    ic.release_grabber(grabber)
+
+
+def test_availability_is_queried_once_per_grabber(library, ic, camera):
+    camera.gain.setting
+    camera.gain.setting
+    cam.Camera(camera._grabber).gain.setting
+    assert library.calls["IC_IsVideoPropertyAvailable"] == 1
+    assert library.calls["IC_IsVideoPropertyAutoAvailable"] == 1
+    other = ic.create_grabber()
+    ic.open_dev_by_unique_name(other, ic.get_unique_name_from_list(0))
+    cam.Camera(other).gain.setting
+    assert library.calls["IC_IsVideoPropertyAvailable"] == 2
+    ic.release_grabber(other)
+
+
+@pytest.mark.parametrize(
+    "invalidate",
+    [
+        lambda ic, camera: camera.set_video_format(
+            ic.get_video_format(camera._grabber, 0)
+        ),
+        lambda ic, camera: ic.open_dev_by_unique_name(
+            camera._grabber, ic.get_unique_name_from_list(0)
+        ),
+        lambda ic, camera: camera.show_property_dialog(),
+    ],
+    ids=["set_video_format", "open_dev_by_unique_name", "show_property_dialog"],
+)
+def test_availability_is_cleared_in_place(library, ic, camera, invalidate):
+    availability = ic.property_availability(camera._grabber)
+    camera.gain.setting
+    assert availability
+    invalidate(ic, camera)
+    assert not availability
+    assert ic.property_availability(camera._grabber) is availability
+    camera.gain.setting
+    assert library.calls["IC_IsVideoPropertyAvailable"] == 2
+    assert availability
@@ -0,0 +1,67 @@
+import logging
+
+from tisgrabber.devices import DeviceMonitor, enumerate_devices
+from tisgrabber.enums import DeviceChange
+from tisgrabber.simulated import SimulatedDevice
+
+
+def test_enumerate_devices(ic):
+    (device,) = enumerate_devices(ic)
+    assert device.name == "DFK 33UX264"
+    assert device.serial == "10000001"
+
+
+def test_refresh_reports_changes(ic, library):
+    monitor = DeviceMonitor(ic)
+    events = []
+    monitor.subscribe(events.append)
+    monitor.refresh()
+    (first,) = monitor.inventory.unique_names
+
+    library.plug(SimulatedDevice(serial="10000002"))
+    inventory = monitor.refresh()
+    assert inventory.generation == 2
+    assert [e.change for e in events] == [DeviceChange.ADDED, DeviceChange.ADDED]
+
+    library.unplug(first)
+    monitor.refresh()
+    assert events[-1].change == DeviceChange.REMOVED
+    assert events[-1].device.unique_name == first
+    assert first not in monitor.inventory
+
+
+def test_unchanged_inventory_keeps_generation(ic):
+    monitor = DeviceMonitor(ic)
+    generation = monitor.refresh().generation
+    assert monitor.refresh().generation == generation
+
+
+def test_failing_subscriber_is_logged(ic, caplog):
+    monitor = DeviceMonitor(ic)
+    events = []
+
+    def fail(event):
+        raise RuntimeError("subscriber")
+
+    monitor.subscribe(fail)
+    monitor.subscribe(events.append)
+    with caplog.at_level(logging.ERROR, logger="tisgrabber.devices"):
+        monitor.refresh()
+    assert len(events) == 1
+    assert "subscriber" in caplog.text
+
+
+def test_monitor_survives_enumeration_errors(ic, monkeypatch):
+    monitor = DeviceMonitor(ic, interval=0.01)
+    failures = 0
+
+    def get_device_count():
+        nonlocal failures
+        failures += 1
+        raise OSError("enumeration")
+
+    with monitor:
+        monkeypatch.setattr(ic, "get_device_count", get_device_count)
+        assert monitor.wait_for("missing", timeout=0.2) is False
+        assert monitor.is_running
+    assert monitor.errors == failures > 0
@@ -0,0 +1,73 @@
+import ctypes
+
+import numpy as np
+import pytest
+
+from tisgrabber.enums import SinkFormat
+from tisgrabber.formats import ImageFormat
+
+
+@pytest.mark.parametrize(
+    "sink_format, bits_per_pixel, dtype, channels",
+    [
+        (SinkFormat.Y800, 8, np.uint8, 1),
+        (SinkFormat.RGB24, 24, np.uint8, 3),
+        (SinkFormat.RGB32, 32, np.uint8, 4),
+        (SinkFormat.UYVY, 16, np.uint8, 2),
+        (SinkFormat.Y16, 16, np.uint16, 1),
+    ],
+)
+def test_layout(sink_format, bits_per_pixel, dtype, channels):
+    image_format = ImageFormat(8, 4, bits_per_pixel, sink_format.value)
+    assert image_format.sink_format == sink_format
+    assert image_format.dtype == dtype
+    assert image_format.shape == (4, 8, channels)
+    assert image_format.nbytes == 8 * 4 * bits_per_pixel // 8
+
+
+def test_size_in_bytes():
+    image_format = ImageFormat(8, 4, 24, SinkFormat.RGB24.value)
+    assert image_format.shape == (4, 8, 3)
+    assert image_format.nbytes == 8 * 4 * 3
+
+
+def test_unknown_format_is_bytes():
+    image_format = ImageFormat(8, 4, 24, 99)
+    assert image_format.sink_format is None
+    assert image_format.shape == (4, 8, 3)
+    with pytest.raises(ValueError):
+        image_format.to_rgb(np.zeros(image_format.shape, np.uint8))
+
+
+def test_view_is_zero_copy():
+    image_format = ImageFormat(8, 4, 24, SinkFormat.RGB24.value)
+    data = (ctypes.c_ubyte * image_format.nbytes)(*range(image_format.nbytes))
+    ptr = ctypes.cast(data, ctypes.POINTER(ctypes.c_ubyte))
+    view = image_format.view(ptr)
+    assert view[0, 1, 2] == 5
+    data[5] = 200
+    assert view[0, 1, 2] == 200
+
+
+def test_bgr_conversions():
+    image_format = ImageFormat(2, 1, 24, SinkFormat.RGB24.value)
+    image = np.array([[[255, 0, 0], [0, 0, 255]]], dtype=np.uint8)
+    rgb = image_format.to_rgb(image)
+    assert rgb.base is image
+    assert rgb[0, 0].tolist() == [0, 0, 255]
+    assert image_format.to_gray(image).tolist() == [[29, 76]]
+
+
+def test_gray_conversions():
+    image_format = ImageFormat(2, 1, 16, SinkFormat.Y16.value)
+    image = np.array([[[1000], [2000]]], dtype=np.uint16)
+    assert image_format.to_gray(image).tolist() == [[1000, 2000]]
+    assert image_format.to_rgb(image)[0, 1].tolist() == [2000] * 3
+
+
+def test_uyvy_conversions():
+    image_format = ImageFormat(2, 1, 16, SinkFormat.UYVY.value)
+    # neutral chroma, luma 16 (black) and 235 (white)
+    image = np.array([[[128, 16], [128, 235]]], dtype=np.uint8)
+    assert image_format.to_gray(image).tolist() == [[16, 235]]
+    assert image_format.to_rgb(image).tolist() == [[[0, 0, 0], [255, 255, 255]]]
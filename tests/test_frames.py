@@ -0,0 +1,117 @@
+import threading
+
+import numpy as np
+import pytest
+
+from tisgrabber.enums import DropPolicy
+from tisgrabber.exceptions import QueueClosedError
+from tisgrabber.formats import ImageFormat
+from tisgrabber.frames import FrameMetadataLog, FramePool, FrameQueue
+
+
+@pytest.fixture
+def pool():
+    return FramePool((4, 8, 3), np.uint8, capacity=2)
+
+
+def test_pool_reuses_arrays(pool):
+    lease = pool.acquire()
+    array = lease.array
+    lease.release()
+    with pool.acquire() as lease:
+        assert lease.array is array
+    stats = pool.stats
+    assert (stats.hits, stats.misses, stats.outstanding, stats.free) == (2, 0, 0, 2)
+
+
+def test_pool_allocates_when_empty(pool):
+    leases = [pool.acquire() for _ in range(3)]
+    assert pool.stats.misses == 1
+    for lease in leases:
+        lease.release()
+    # the surplus array is dropped
+    assert pool.stats.free == 2
+
+
+def test_released_lease_cannot_be_used(pool):
+    lease = pool.copy(np.ones((4, 8, 3), np.uint8))
+    assert lease.array.sum() == 4 * 8 * 3
+    lease.release()
+    lease.release()
+    assert lease.released
+    with pytest.raises(ValueError):
+        lease.array
+
+
+def test_pool_from_format():
+    pool = FramePool.from_format(ImageFormat(8, 4, 16, 4))
+    assert pool.shape == (4, 8, 1)
+    assert pool.dtype == np.uint16
+
+
+def image(value):
+    return np.full((4, 8, 3), value, np.uint8)
+
+
+def test_queue_drop_oldest(pool):
+    queue = FrameQueue(pool, capacity=2)
+    for i in range(3):
+        assert queue.put(image(i), i)
+    assert [queue.get().frame_number for _ in range(2)] == [1, 2]
+    stats = queue.stats
+    assert (stats.enqueued, stats.dropped, stats.high_water_mark) == (3, 1, 2)
+
+
+def test_queue_drop_newest(pool):
+    queue = FrameQueue(pool, capacity=1, policy=DropPolicy.DROP_NEWEST)
+    assert queue.put(image(0), 0)
+    assert not queue.put(image(1), 1)
+    frame = queue.get()
+    assert frame.frame_number == 0
+    assert frame.array[0, 0, 0] == 0
+    frame.release()
+
+
+def test_queue_block_waits_for_consumer(pool):
+    queue = FrameQueue(pool, capacity=1, policy=DropPolicy.BLOCK, timeout=2.0)
+    queue.put(image(0), 0)
+    consumer = threading.Timer(0.05, lambda: queue.get().release())
+    consumer.start()
+    assert queue.put(image(1), 1)
+    consumer.join()
+    assert queue.get().frame_number == 1
+
+
+def test_queue_close(pool):
+    queue = FrameQueue(pool)
+    queue.put(image(0), 0)
+    queue.close()
+    assert not queue.put(image(1), 1)
+    assert [frame.frame_number for frame in queue] == [0]
+    with pytest.raises(QueueClosedError):
+        queue.get()
+    with pytest.raises(TimeoutError):
+        FrameQueue(pool).get(timeout=0.01)
+
+
+def test_metadata_log_counts_dropped_frames():
+    log = FrameMetadataLog(capacity=3)
+    image_format = ImageFormat(8, 4, 24, 1)
+    for frame_number in (0, 1, 4, 5):
+        log.record(frame_number, frame_number * 10, image_format)
+    assert log.dropped == 2
+    assert (len(log), log.total) == (3, 4)
+    assert log.records()["frame_number"].tolist() == [1, 4, 5]
+    assert log.records(last=1)["timestamp_ns"].tolist() == [50]
+    assert log.find(4)["width"] == 8
+    assert log.find(0) is None
+
+
+def test_metadata_log_frame_number_wraps_around():
+    log = FrameMetadataLog()
+    image_format = ImageFormat(8, 4, 24, 1)
+    log.record(2**32 - 1, 0, image_format)
+    log.record(0, 1, image_format)
+    log.restart()
+    log.record(0, 2, image_format)
+    assert log.dropped == 0
@@ -0,0 +1,129 @@
+import time
+
+import numpy as np
+import pytest
+
+import tisgrabber.cam as cam
+from tisgrabber.exceptions import ICError
+from tisgrabber.group import PHASES, CameraGroup, OpenReport, OpenResult, open_all
+from tisgrabber.replay import ReplayCamera
+from tisgrabber.simulated import SimulatedDevice
+
+
+@pytest.fixture
+def cameras(ic, library):
+    library.plug(SimulatedDevice(serial="10000002"))
+    cameras = []
+    for index in range(2):
+        grabber = ic.create_grabber()
+        ic.open_dev_by_unique_name(grabber, ic.get_unique_name_from_list(index))
+        cameras.append(cam.Camera(grabber))
+    yield cameras
+    for camera in cameras:
+        camera.release_grabber()
+
+
+def test_trigger(cameras):
+    with CameraGroup(cameras) as group:
+        group.start_live()
+        try:
+            first = group.trigger(timeout=2.0)
+            second = group.trigger(timeout=2.0)
+        finally:
+            group.stop_live()
+    assert first.complete and second.complete
+    assert (first.index, second.index) == (0, 1)
+    assert first.frames[0].array.shape == cameras[0].get_image_format().shape
+    assert first.latency_ns >= 0
+    first.release()
+    second.release()
+
+
+def test_pools_are_sized_in_live_mode(cameras):
+    with CameraGroup(cameras, pool_capacity=2) as group:
+        assert group._pools == [None, None]
+        group.start_live()
+        group.stop_live()
+        assert [pool.capacity for pool in group._pools] == [2, 2]
+
+
+class SlowStartCamera(ReplayCamera):
+    """Delivers its first frame late, the following ones queue up behind it."""
+
+    def _deliver(self) -> bool:
+        if self._frame_number == 0:
+            time.sleep(0.3)
+        return super()._deliver()
+
+
+def replay_frames():
+    return np.zeros((4, 4, 8, 3), np.uint8)
+
+
+def test_late_frame_is_not_paired_with_a_later_trigger():
+    cameras = [ReplayCamera(replay_frames()), SlowStartCamera(replay_frames())]
+    with CameraGroup(cameras) as group:
+        group.start_live()
+        try:
+            framesets = [group.trigger(timeout=0.1)]
+            framesets += [group.trigger(timeout=2.0) for _ in range(2)]
+        finally:
+            group.stop_live()
+    assert framesets[0].missing == [1]
+    for index, frameset in enumerate(framesets[1:], 1):
+        assert [frame.frame_number for frame in frameset.frames] == [index, index]
+    assert group.late == 1
+    for frameset in framesets:
+        frameset.release()
+
+
+def test_close_detaches_the_handlers(cameras):
+    with CameraGroup(cameras):
+        assert all(camera.frame_handler is not None for camera in cameras)
+    assert all(camera.frame_handler is None for camera in cameras)
+
+
+def test_empty_group():
+    with pytest.raises(ValueError):
+        CameraGroup([])
+
+
+def test_open_all(ic, library):
+    library.plug(SimulatedDevice(serial="10000002"))
+    names = [ic.get_unique_name_from_list(i) for i in range(2)]
+    report = open_all(
+        names + ["missing"], config={"Gain": {"Value": 20}}, start_live=True
+    )
+    try:
+        assert [result.ok for result in report.results] == [True, True, False]
+        assert [camera.gain.setting for camera in report.cameras] == [20, 20]
+        assert list(report.errors) == ["missing"]
+        assert isinstance(report.errors["missing"], ICError)
+        assert report.results[2].camera is None
+        # the failing phase is timed as well
+        assert list(report.results[2].timings) == ["open"]
+        for result in report.results[:2]:
+            assert list(result.timings) == list(PHASES)
+            assert all(seconds >= 0 for seconds in result.timings.values())
+        for phase in PHASES:
+            total = sum(result.timings.get(phase, 0.0) for result in report.results)
+            assert report.total(phase) == pytest.approx(total)
+            assert 0 < report.wall_time(phase) <= report.total(phase) + 1e-9
+    finally:
+        for camera in report.cameras:
+            camera.stop_live()
+            camera.release_grabber()
+
+
+def test_wall_time_merges_overlapping_phases():
+    def result(name, start, end):
+        return OpenResult(name, None, None, {"open": (start, end)})
+
+    report = OpenReport(
+        (result("a", 0.0, 2.0), result("b", 1.0, 3.0), result("c", 5.0, 6.0)),
+        workers=3,
+        elapsed=6.0,
+    )
+    assert report.total("open") == pytest.approx(5.0)
+    assert report.wall_time("open") == pytest.approx(4.0)
+    assert report.total("configure") == report.wall_time("configure") == 0.0
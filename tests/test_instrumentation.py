@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from tisgrabber.exceptions import IC_PROPERTY_ITEM_NOT_AVAILABLE, ICError
+from tisgrabber.instrumentation import InstrumentedLibrary
+
+
+def test_enable_and_disable_swap_the_library(library, ic):
+    stats = ic.enable_instrumentation()
+    assert isinstance(stats, InstrumentedLibrary)
+    assert ic._ic is stats and stats.library is library
+    assert ic.enable_instrumentation() is stats
+    assert ic.instrumentation is stats
+    ic.disable_instrumentation()
+    assert ic._ic is library
+    assert ic.instrumentation is None
+
+
+def test_counts_calls_and_status_errors(ic, camera):
+    stats = ic.enable_instrumentation()
+    ic.get_property_value(camera._grabber, "Gain", "Value")
+    with pytest.raises(ICError):
+        ic.get_property_value(camera._grabber, "Missing", "Value")
+    gain = stats.stats("IC_GetPropertyValue")
+    assert gain.count == 2
+    assert gain.errors == {IC_PROPERTY_ITEM_NOT_AVAILABLE: 1}
+
+
+def test_results_of_other_functions_are_no_errors(ic, camera):
+    stats = ic.enable_instrumentation()
+    grabber = ic.create_grabber()
+    assert not ic.is_dev_valid(grabber)
+    assert not ic.is_property_available(camera._grabber, "Gain", "Missing")
+    ic.release_grabber(grabber)
+    for name in ("IC_IsDevValid", "IC_IsPropertyAvailable"):
+        assert stats.stats(name).count == 1
+        assert not stats.stats(name).errors
+
+
+def test_stats_per_grabber(ic, camera):
+    stats = ic.enable_instrumentation()
+    other = ic.create_grabber()
+    ic.open_dev_by_unique_name(other, ic.get_unique_name_from_list(0))
+    ic.get_frame_rate(camera._grabber)
+    ic.get_frame_rate(camera._grabber)
+    ic.get_frame_rate(other)
+    assert stats.stats("IC_GetFrameRate").count == 3
+    assert stats.stats("IC_GetFrameRate", camera._grabber).count == 2
+    assert stats.stats("IC_GetFrameRate", other).count == 1
+    ic.release_grabber(other)
+
+
+def test_snapshot_and_json(ic, camera):
+    stats = ic.enable_instrumentation()
+    ic.get_frame_rate(camera._grabber)
+    with pytest.raises(ICError):
+        ic.get_property_value(camera._grabber, "Missing", "Value")
+    snapshot = stats.snapshot()
+    assert snapshot["calls"] == 2
+    assert snapshot["functions"]["IC_GetFrameRate"]["count"] == 1
+    assert snapshot["functions"]["IC_GetPropertyValue"]["errors"] == {"-4": 1}
+    (grabber,) = snapshot["grabbers"].values()
+    assert set(grabber) == {"IC_GetFrameRate", "IC_GetPropertyValue"}
+    assert json.loads(stats.to_json())["functions"] == snapshot["functions"]
+    stats.reset()
+    assert stats.snapshot()["calls"] == 0
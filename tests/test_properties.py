@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import pytest
+from conftest import prototyped
+
+from tisgrabber.exceptions import ApplyError
+from tisgrabber.properties import DeviceState
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+
+
+def test_is_property_available_matches_prototype(library, ic, camera):
+    library.IC_IsPropertyAvailable = prototyped(library, "IC_IsPropertyAvailable")
+    assert ic.is_property_available(camera._grabber, "Exposure")
+    assert ic.is_property_available(camera._grabber, "Exposure", "Auto")
+    assert not ic.is_property_available(camera._grabber, "Exposure", "Missing")
+    assert not ic.is_property_available(camera._grabber, "Missing")
+
+
+def test_snapshot_restore(library, camera):
+    library.IC_IsPropertyAvailable = prototyped(library, "IC_IsPropertyAvailable")
+    state = camera.snapshot()
+    assert state.properties["Exposure"]["Auto"] is False
+    assert state.unique_name == "DFK 33UX264 10000001"
+
+    camera.apply({"Exposure": {"Value": 0.02}, "Gain": {"Value": 100}})
+    assert set(state.diff(camera.snapshot())) == {"Exposure", "Gain"}
+    report = camera.restore(state)
+    assert set(report.written) == {("Exposure", "Value"), ("Gain", "Value")}
+    assert not state.diff(camera.snapshot())
+
+
+def test_apply_rolls_back(ic, camera):
+    gain = ic.get_property_value(camera._grabber, "Gain", "Value")
+    with pytest.raises(ApplyError) as info:
+        camera.apply({"Gain": {"Value": gain + 1}, "Exposure": {"Value": 1e9}})
+    assert info.value.report.rolled_back
+    assert ic.get_property_value(camera._grabber, "Gain", "Value") == gain
+
+
+def test_apply_report_counts_calls(library, camera):
+    camera.apply({"Gain": {"Value": 20}, "Brightness": {"Value": 0}})
+    calls = library.calls.copy()
+    report = camera.apply({"Gain": {"Value": 21}, "Brightness": {"Value": 0}})
+    calls = library.calls - calls
+    assert report.reads == calls["IC_GetPropertyValue"] == 2
+    assert report.writes == calls["IC_SetPropertyValue"] == 1
+    assert report.calls_avoided == report.skipped - report.reads == -1
+
+
+def test_state_xml_roundtrip(camera, tmp_path):
+    state = camera.snapshot()
+    state.save(tmp_path / "state.xml")
+    assert DeviceState.load(tmp_path / "state.xml") == state
+
+
+def test_state_parses_device_file():
+    state = DeviceState.load(EXAMPLES / "device.xml")
+    assert state.video_format == "Y800 (744x480)"
+    assert state.properties["Exposure"]["Value"] == 0.25
+    assert state.properties["Trigger"]["Enable"] is False
+    assert DeviceState.from_xml(state.to_xml()) == state
+
+
+def test_property_handle(camera):
+    handle = camera.property_handle("Exposure", "Value")
+    handle.value = 0.02
+    assert handle.value == pytest.approx(0.02)
+    assert handle.range == pytest.approx((1e-4, 30.0))
+    auto = camera.property_handle("Exposure", "Auto", bool)
+    assert auto.value is False
+
+
+def test_discover_properties_is_cached(library, camera, tmp_path):
+    tree = camera.discover_properties(cache=tmp_path)
+    assert tree.items["Trigger"]["Polarity"].map_strings == (
+        "Falling Edge",
+        "Rising Edge",
+    )
+    assert ("Exposure", "Auto") in tree
+    library.calls.clear()
+    assert camera.discover_properties(cache=tmp_path) == tree
+    assert library.calls.total() == 1
@@ -0,0 +1,77 @@
+import threading
+
+import numpy as np
+import pytest
+
+from tisgrabber.formats import ImageFormat
+from tisgrabber.recording import RawReader, RawRecorder
+from tisgrabber.replay import ReplayCamera
+
+
+@pytest.fixture
+def image_format():
+    return ImageFormat(8, 4, 24, 1)
+
+
+def test_write_and_read(tmp_path, image_format):
+    path = tmp_path / "frames.raw"
+    images = np.arange(3 * 4 * 8 * 3, dtype=np.uint8).reshape(3, 4, 8, 3)
+    with RawRecorder(path, image_format, capacity=2) as recorder:
+        assert recorder.write(images[0], 10, timestamp_ns=100)
+        assert recorder.write(images[1], 11, timestamp_ns=200)
+        assert not recorder.write(images[2], 12)
+    assert recorder.dropped == 1
+    with RawReader(path) as reader:
+        assert len(reader) == 2
+        np.testing.assert_array_equal(reader[:], images[:2])
+        assert list(reader.frame_numbers) == [10, 11]
+        assert list(reader.timestamps_ns) == [100, 200]
+
+
+def test_write_after_close_is_dropped(tmp_path, image_format):
+    recorder = RawRecorder(tmp_path / "frames.raw", image_format, capacity=2)
+    recorder.close()
+    assert recorder.closed
+    assert not recorder.write(np.zeros(image_format.shape, np.uint8), 0)
+    assert recorder.dropped == 1
+    recorder.close()
+
+
+def test_close_while_writing(tmp_path, image_format):
+    recorder = RawRecorder(tmp_path / "frames.raw", image_format, capacity=100_000)
+    image = np.zeros(image_format.shape, np.uint8)
+    started = threading.Event()
+
+    def write():
+        started.set()
+        while recorder.write(image, 0):
+            pass
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    started.wait()
+    recorder.close()
+    thread.join()
+    assert recorder.closed
+
+
+def test_record_detaches_on_close(tmp_path):
+    frames = np.zeros((2, 4, 8, 3), np.uint8)
+    camera = ReplayCamera(frames, frame_rate=None)
+    recorder = camera.record(tmp_path / "frames.raw", capacity=8)
+    assert camera.frame_handler == recorder.write
+    recorder.close()
+    assert camera.frame_handler is None
+
+
+def test_record_keeps_replaced_handler(tmp_path):
+    frames = np.zeros((2, 4, 8, 3), np.uint8)
+    camera = ReplayCamera(frames, frame_rate=None)
+    recorder = camera.record(tmp_path / "frames.raw", capacity=8)
+
+    def handler(image, frame_number):
+        pass
+
+    camera.set_frame_handler(handler)
+    recorder.close()
+    assert camera.frame_handler is handler
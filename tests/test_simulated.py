@@ -0,0 +1,46 @@
+import inspect
+
+import pytest
+
+from tisgrabber.simulated import SimulatedLibrary
+from tisgrabber.tisgrabber import _declarations
+
+PROTOTYPES = _declarations()._prototypes
+SIMULATED = sorted(name for name in vars(SimulatedLibrary) if name.startswith("IC_"))
+
+
+@pytest.mark.parametrize("name", SIMULATED)
+def test_signature_matches_declaration(name):
+    assert name in PROTOTYPES, f"{name} is not declared in declare_functions"
+    argtypes = getattr(PROTOTYPES[name], "argtypes", None) or ()
+    parameters = list(
+        inspect.signature(
+            inspect.unwrap(getattr(SimulatedLibrary, name))
+        ).parameters.values()
+    )[1:]
+    assert len(parameters) == len(argtypes)
+    for parameter in parameters:
+        assert parameter.kind is parameter.POSITIONAL_OR_KEYWORD
+        assert parameter.default is parameter.empty
+
+
+def test_declared_functions_are_simulated():
+    declared = {name for name, p in PROTOTYPES.items() if hasattr(p, "argtypes")}
+    assert declared <= set(SIMULATED)
+
+
+def test_calls_are_counted(library, ic):
+    library.calls.clear()
+    ic.get_device_count()
+    assert library.calls["IC_GetDeviceCount"] == 1
+
+
+def test_unplug_invalidates_device(library, ic, camera):
+    assert ic.is_dev_valid(camera._grabber)
+    library.unplug("DFK 33UX264 10000001")
+    assert not ic.is_dev_valid(camera._grabber)
+    assert ic.get_device_count() == 0
+
+
+def test_get_video_format(ic, camera):
+    assert ic.get_video_format(camera._grabber, 0) == "RGB24 (640x480)"
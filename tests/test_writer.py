@@ -0,0 +1,76 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from tisgrabber.frames import FramePool
+from tisgrabber.writer import ImageWriter
+
+
+@pytest.fixture
+def image():
+    return np.arange(4 * 8 * 3, dtype=np.uint8).reshape(4, 8, 3)
+
+
+def test_write_npy(tmp_path, image):
+    with ImageWriter() as writer:
+        assert writer.write(image, tmp_path / "image.npy")
+    np.testing.assert_array_equal(np.load(tmp_path / "image.npy"), image)
+    stats = writer.stats
+    assert (stats.written, stats.failed, stats.queue_depth) == (1, 0, 0)
+    assert stats.nbytes == (tmp_path / "image.npy").stat().st_size
+
+
+def test_unsupported_file_type(tmp_path, image):
+    with ImageWriter() as writer:
+        with pytest.raises(ValueError):
+            writer.write(image, tmp_path / "image.xyz")
+
+
+def test_flush_waits_for_callbacks(tmp_path, image):
+    results = []
+
+    def on_done(result):
+        time.sleep(0.01)
+        results.append(result)
+
+    writer = ImageWriter(workers=4, on_done=on_done)
+    for i in range(8):
+        writer.write(image, tmp_path / f"{i}.npy")
+    writer.flush()
+    assert [result.index for result in results] == list(range(8))
+    assert all(result.error is None for result in results)
+    writer.close()
+
+
+def test_failed_write_is_reported(tmp_path, image):
+    results = []
+    with ImageWriter(on_done=results.append) as writer:
+        writer.write(image, tmp_path / "missing" / "image.npy")
+    (result,) = results
+    assert result.error is not None
+    assert writer.stats.failed == 1
+
+
+def test_leases_are_released(tmp_path, image):
+    pool = FramePool(image.shape, image.dtype, capacity=2)
+    with ImageWriter() as writer:
+        writer.write(pool.copy(image), tmp_path / "image.npy")
+    assert pool.stats.outstanding == 0
+    np.testing.assert_array_equal(np.load(tmp_path / "image.npy"), image)
+
+
+def test_drop_when_full(tmp_path, image):
+    executor = ThreadPoolExecutor(1)
+    # keep the only worker busy until the queue has been filled
+    busy = threading.Event()
+    executor.submit(busy.wait)
+    writer = ImageWriter(max_pending=1, executor=executor)
+    assert writer.write(image, tmp_path / "0.npy")
+    assert not writer.write(image, tmp_path / "1.npy", block=False)
+    busy.set()
+    writer.close()
+    executor.shutdown()
+    assert (writer.stats.written, writer.stats.dropped) == (1, 1)
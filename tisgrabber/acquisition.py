@@ -0,0 +1,196 @@
+import abc
+import asyncio
+import threading
+import time
+from typing import AsyncIterator, Callable, Optional
+
+import numpy as np
+
+from .enums import DropPolicy
+from .formats import ImageFormat
+from .frames import Burst, Frame, FrameMetadataLog, FramePool, FrameQueue
+from .recording import RawRecorder
+from .streaming import FrameStream
+from .wrapper import FilePath
+
+
+class Acquisition(abc.ABC):
+    """
+    Frame acquisition helpers shared by `Camera` and `ReplayCamera`.
+
+    They are built on the abstract primitives `start_live`, `stop_live`,
+    `snap_image`, `get_image_data`, `get_image_format` and `set_frame_handler`, which
+    the class they are mixed into has to implement.
+    """
+
+    frame_log: FrameMetadataLog
+    _frame_handler: Optional[Callable[[np.ndarray, int], None]]
+
+    @abc.abstractmethod
+    def start_live(self) -> None: ...
+
+    @abc.abstractmethod
+    def stop_live(self) -> None: ...
+
+    @abc.abstractmethod
+    def snap_image(self, timeout=1000) -> None: ...
+
+    @abc.abstractmethod
+    def get_image_data(self, out: Optional[np.ndarray] = None) -> np.ndarray: ...
+
+    @abc.abstractmethod
+    def get_image_format(self) -> ImageFormat: ...
+
+    @abc.abstractmethod
+    def set_frame_handler(
+        self, handler: Optional[Callable[[np.ndarray, int], None]]
+    ) -> None: ...
+
+    @property
+    def frame_handler(self) -> Optional[Callable[[np.ndarray, int], None]]:
+        """The handler installed with `set_frame_handler`, or None."""
+        return self._frame_handler
+
+    def _detach_frame_handler(self, handler: Callable[[np.ndarray, int], None]) -> None:
+        # only if it has not been replaced in the meantime
+        if self._frame_handler == handler:
+            self.set_frame_handler(None)
+
+    def snap_into(self, out: np.ndarray, timeout=1000) -> np.ndarray:
+        """Snap an image and copy it into the caller-owned array `out`."""
+        self.snap_image(timeout=timeout)
+        return self.get_image_data(out=out)
+
+    def burst(
+        self, n: int, timeout: float = 10.0, out: Optional[np.ndarray] = None
+    ) -> Burst:
+        """
+        Capture the next `n` frames into one preallocated `(n, h, w, c)` array.
+
+        Live mode has to be running with the frame ready callback called for every
+        frame. The frame handler of the camera is replaced during the burst and
+        restored afterwards.
+
+        :param timeout: Seconds to wait for all frames before raising `TimeoutError`.
+        :param out: Optional caller-supplied array or `np.memmap` to write into.
+        """
+        if n < 1:
+            raise ValueError("A burst has to capture at least 1 frame.")
+        image_format = self.get_image_format()
+        shape = (n,) + image_format.shape
+        if out is None:
+            out = np.empty(shape, dtype=image_format.dtype)
+        elif out.shape != shape or out.dtype != image_format.dtype:
+            raise ValueError(
+                f"Expected an array of shape {shape} and dtype {image_format.dtype}, "
+                f"got {out.shape} and {out.dtype}."
+            )
+        frame_numbers = np.zeros(n, dtype=np.int64)
+        timestamps_ns = np.zeros(n, dtype=np.int64)
+        done = threading.Event()
+        # serializes the callback thread with disarming on timeout
+        lock = threading.Lock()
+        armed = True
+        count = 0
+
+        def on_frame(image: np.ndarray, frame_number: int) -> None:
+            nonlocal count
+            timestamp = time.perf_counter_ns()
+            with lock:
+                if not armed or count >= n:
+                    return
+                out[count] = image
+                frame_numbers[count] = frame_number
+                timestamps_ns[count] = timestamp
+                count += 1
+                if count == n:
+                    done.set()
+
+        previous = self.frame_handler
+        self.set_frame_handler(on_frame)
+        try:
+            completed = done.wait(timeout)
+            with lock:
+                armed = False
+                captured = count
+        finally:
+            if self.frame_handler == on_frame:
+                self.set_frame_handler(previous)
+        if not completed:
+            raise TimeoutError(f"Captured only {captured} of {n} frames in time.")
+        return Burst(out, frame_numbers, timestamps_ns)
+
+    def record(self, path: FilePath, capacity: int) -> RawRecorder:
+        """
+        Record up to `capacity` frames from the frame ready callback into a
+        memory-mapped raw file. Close the returned recorder to detach it from the
+        camera and finish the file.
+        """
+        recorder = RawRecorder(
+            path,
+            self.get_image_format(),
+            capacity,
+            on_close=lambda: self._detach_frame_handler(recorder.write),
+        )
+        self.set_frame_handler(recorder.write)
+        return recorder
+
+    async def snap(self, timeout=1000) -> np.ndarray:
+        """Snap an image in a worker thread and return a copy of it."""
+
+        def snap_copy() -> np.ndarray:
+            self.snap_image(timeout=timeout)
+            return self.get_image_data().copy()
+
+        return await asyncio.get_running_loop().run_in_executor(None, snap_copy)
+
+    async def stream(
+        self, capacity: int = 8, start_live: bool = True
+    ) -> AsyncIterator[Frame]:
+        """
+        Asynchronously iterate over new frames: `async for frame in cam.stream()`.
+
+        Frames are buffered up to `capacity`, after which the oldest ones are dropped.
+        Release each frame after use to return its array to the pool, which is sized
+        from the frames delivered in live mode. Live mode is stopped and the previous
+        frame handler is restored when the iteration is cancelled or the iterator is
+        closed, e.g. with `contextlib.aclosing`.
+        """
+        loop = asyncio.get_running_loop()
+        stream = FrameStream(None, capacity, loop)
+        previous = self.frame_handler
+        self.set_frame_handler(stream.put)
+        try:
+            if start_live:
+                await loop.run_in_executor(None, self.start_live)
+            try:
+                while True:
+                    yield await stream.get()
+            finally:
+                stream.close()
+                if start_live:
+                    await loop.run_in_executor(None, self.stop_live)
+        finally:
+            # unless it has been replaced in the meantime
+            if self.frame_handler == stream.put:
+                self.set_frame_handler(previous)
+
+    def frame_pool(self, capacity: int = 8) -> FramePool:
+        """Return a pool of arrays sized for the current image format."""
+        return FramePool.from_format(self.get_image_format(), capacity)
+
+    def frame_queue(
+        self,
+        capacity: int = 8,
+        policy: DropPolicy = DropPolicy.DROP_OLDEST,
+        timeout: Optional[float] = None,
+    ) -> FrameQueue:
+        """
+        Install a bounded `FrameQueue` as frame ready callback and return it.
+
+        The callback only copies each frame into a pooled array and enqueues it, so
+        that slow consumers never stall the acquisition thread.
+        """
+        queue = FrameQueue(self.frame_pool(capacity + 2), capacity, policy, timeout)
+        self.set_frame_handler(queue.put)
+        return queue
@@ -0,0 +1,256 @@
+import ctypes
+import threading
+from typing import Any, Callable, Optional, Self
+
+import numpy as np
+
+from .exceptions import ICError
+from .formats import ImageFormat
+from .structs import HGRABBER, HMEMBUFFER
+from .wrapper import FRAMEREADYCALLBACKEX, ImageControl
+
+
+def _describe(ic: ImageControl, grabber: HGRABBER, buffer: HMEMBUFFER) -> ImageFormat:
+    width, height, bits_per_pixel = ic.get_mem_buffer_description(buffer)
+    # the buffer description lacks the color format, which is shared by the sink
+    color_format = ic.get_image_format(grabber).color_format
+    return ImageFormat(width, height, bits_per_pixel, color_format)
+
+
+class BufferSlot:
+    """
+    A locked, zero-copy view of one image buffer of the DLL's ring buffer.
+
+    The buffer is not overwritten by the driver until the slot is released, either
+    explicitly with `release` or by leaving the `with` block.
+    """
+
+    def __init__(
+        self,
+        ring: "RingBuffer",
+        buffer: HMEMBUFFER,
+        index: int,
+        data: np.ndarray,
+        owned: bool = False,
+    ) -> None:
+        self._ring = ring
+        self._buffer = buffer
+        self.index = index
+        self._data = data
+        # whether the handle has to be released with IC_ReleaseMemBuffer
+        self._owned = owned
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if dtype is None:
+            return self.data
+        return self.data.astype(dtype, copy=False)
+
+    @property
+    def released(self) -> bool:
+        return self._data is None
+
+    @property
+    def data(self) -> np.ndarray:
+        """The image data. Only valid until the slot is released."""
+        if self._data is None:
+            raise ICError(f"Ring buffer slot {self.index} has already been released.")
+        return self._data
+
+    def release(self) -> None:
+        """Unlock the buffer so that the driver can reuse it."""
+        if self._data is None:
+            return
+        self._data = None
+        self._ring._release(self)
+
+
+class RingBuffer:
+    """
+    Zero-copy access to the image buffers of the DLL's internal ring buffer.
+
+    Every slot handed out by `acquire` or `last` is locked, so that consumers can fall
+    behind the acquisition by up to `size - 1` frames without copying and without
+    torn images. Slots are unlocked when they are released, and all outstanding slots
+    are released when the ring buffer is closed or its `with` block is left.
+    """
+
+    def __init__(self, ic: ImageControl, grabber: HGRABBER, size: int) -> None:
+        if size < 1:
+            raise ValueError("Ring buffer size must be at least 1.")
+        self._ic = ic
+        self._grabber = grabber
+        self._ic.set_ring_buffer_size(grabber, size)
+        self.size = size
+        self._lock = threading.Lock()
+        self._lock_counts: dict[int, int] = {}
+        self._slots: set[BufferSlot] = set()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def locked_indices(self) -> list[int]:
+        """Indices of the ring buffer slots that are currently locked."""
+        with self._lock:
+            return sorted(self._lock_counts)
+
+    def acquire(self, index: int) -> BufferSlot:
+        """Lock the buffer at `index` and return a view of it."""
+        if not 0 <= index < self.size:
+            raise IndexError(f"Ring buffer index {index} out of range.")
+        return self._wrap(self._ic.get_mem_buffer(self._grabber, index), owned=True)
+
+    def last(self) -> BufferSlot:
+        """Lock the most recently acquired buffer and return a view of it."""
+        return self._wrap(self._ic.get_mem_buffer_last_acq(self._grabber), owned=True)
+
+    def wrap(self, buffer: HMEMBUFFER, index: Optional[int] = None) -> BufferSlot:
+        """
+        Lock an image buffer handle passed to a frame ready callback and return a view
+        of it. The handle itself stays owned by the DLL.
+        """
+        return self._wrap(buffer, index)
+
+    def _wrap(
+        self, buffer: HMEMBUFFER, index: Optional[int] = None, owned: bool = False
+    ) -> BufferSlot:
+        try:
+            self._ic.mem_buffer_lock(buffer, True)
+            try:
+                if index is None:
+                    index = self._ic.mem_buffer_get_index(buffer)
+                image_format = _describe(self._ic, self._grabber, buffer)
+                data = image_format.view(self._ic.mem_buffer_get_data_ptr(buffer))
+            except Exception:
+                self._ic.mem_buffer_lock(buffer, False)
+                raise
+        except Exception:
+            if owned:
+                self._ic.release_mem_buffer(buffer)
+            raise
+        slot = BufferSlot(self, buffer, index, data, owned)
+        with self._lock:
+            self._lock_counts[index] = self._lock_counts.get(index, 0) + 1
+            self._slots.add(slot)
+        return slot
+
+    def _release(self, slot: BufferSlot) -> None:
+        with self._lock:
+            self._slots.discard(slot)
+            count = self._lock_counts.pop(slot.index) - 1
+            if count:
+                self._lock_counts[slot.index] = count
+        if not count:
+            self._ic.mem_buffer_lock(slot._buffer, False)
+        # handles passed to callbacks are released by the DLL
+        if slot._owned:
+            self._ic.release_mem_buffer(slot._buffer)
+
+    def close(self) -> None:
+        """Release all outstanding slots."""
+        with self._lock:
+            slots = list(self._slots)
+        for slot in slots:
+            slot.release()
+
+
+class BufferFrame:
+    """
+    A frame delivered by the extended frame ready callback.
+
+    The image data is a zero-copy view of the DLL's image buffer and is only valid
+    during the callback. Use `copy` or `lock` to keep it for longer.
+    """
+
+    __slots__ = ("buffer", "frame_number", "index", "image_format", "_ic", "_data")
+
+    def __init__(
+        self,
+        ic: ImageControl,
+        buffer: HMEMBUFFER,
+        frame_number: int,
+        index: int,
+        image_format: ImageFormat,
+    ) -> None:
+        self._ic = ic
+        self.buffer = buffer
+        self.frame_number = frame_number
+        self.index = index
+        self.image_format = image_format
+        self._data = None
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self.image_format.shape
+
+    @property
+    def data(self) -> np.ndarray:
+        if self._data is None:
+            ptr = self._ic.mem_buffer_get_data_ptr(self.buffer)
+            self._data = self.image_format.view(ptr)
+        return self._data
+
+    def copy(self) -> np.ndarray:
+        return self.data.copy()
+
+    def lock(self, ring: RingBuffer) -> BufferSlot:
+        """Lock the ring buffer slot of the frame, so that it outlives the callback."""
+        return ring.wrap(self.buffer, self.index)
+
+
+class BufferCallback:
+    """
+    Adapter from the DLL's extended frame ready callback to `callback(frame, data)`.
+
+    Ring index, width, height and bits per pixel are queried once per image buffer and
+    cached, so that the per-frame cost is a single data pointer lookup. The cache is
+    cleared whenever the cached image format of the grabber has been invalidated,
+    e.g. by a new video format, ROI or frame filter, and by `invalidate`.
+    """
+
+    def __init__(
+        self, ic: ImageControl, callback: Callable[[BufferFrame, Any], None]
+    ) -> None:
+        self._ic = ic
+        self._callback = callback
+        self._buffers: dict[int, tuple[int, ImageFormat]] = {}
+        # the image format of the grabber the cached geometry belongs to
+        self._image_format: Optional[ImageFormat] = None
+        self.c_callback: FRAMEREADYCALLBACKEX = ic.create_frame_ready_callback_ex(
+            self._on_frame_ready
+        )
+
+    def invalidate(self) -> None:
+        self._image_format = None
+        self._buffers.clear()
+
+    def _on_frame_ready(
+        self, grabber: HGRABBER, buffer: HMEMBUFFER, frame_number: int, data: Any
+    ) -> None:
+        # a new object once the cached image format has been invalidated
+        grabber_format = self._ic.get_image_format(grabber)
+        if grabber_format is not self._image_format:
+            self._buffers.clear()
+            self._image_format = grabber_format
+        key = ctypes.addressof(buffer.contents)
+        try:
+            index, image_format = self._buffers[key]
+        except KeyError:
+            index = self._ic.mem_buffer_get_index(buffer)
+            image_format = _describe(self._ic, grabber, buffer)
+            self._buffers[key] = index, image_format
+        self._callback(
+            BufferFrame(self._ic, buffer, frame_number, index, image_format), data
+        )
@@ -1,26 +1,197 @@
+import inspect
+import threading
+import time
 from ctypes import Structure
-from typing import Any, Self
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional, Self, Union
 
 import numpy as np
 
+from .acquisition import Acquisition
+from .buffers import BufferCallback, BufferFrame, RingBuffer
 from .enums import CameraProperty, VideoProperty
+from .formats import ImageFormat
+from .frames import FrameMetadataLog
+from .properties import (
+    ApplyReport,
+    DeviceState,
+    PropertyHandle,
+    PropertySettings,
+    PropertyTree,
+    apply_properties,
+    capture_state,
+    discover_properties,
+    same_value,
+)
 from .structs import HGRABBER
 from .wrapper import FRAMEREADYCALLBACK, FilePath, ImageControl
 
-ic = ImageControl()
+
+class _LazyImageControl:
+    """
+    The `ImageControl` shared by all cameras, created on first use.
+
+    Importing this module therefore neither loads nor initializes the library.
+    Creating the instance is thread-safe, methods are then looked up only once.
+    `instance` returns the `ImageControl` itself, e.g. for objects that keep it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._instance: Optional[ImageControl] = None
+
+    @property
+    def instance(self) -> ImageControl:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = ImageControl()
+                instance = self._instance
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        attribute = getattr(self.instance, name)
+        if inspect.ismethod(attribute):
+            setattr(self, name, attribute)
+        return attribute
+
+
+ic = _LazyImageControl()
+
+
+class PropertyCache:
+    """
+    Opt-in cache of the property values, auto modes and ranges of a camera.
+
+    Ranges are cached permanently per image format. Values and auto modes are cached
+    when read and updated when written through the settings, and expire after `ttl`
+    seconds, or never if `ttl` is None. Auto modes expire after `auto_ttl` seconds at
+    the latest, since they can be switched outside of the settings. Values of
+    properties in auto mode change on their own and are always read from the device.
+    Written values are cached as they were requested, even if the device rounds them.
+
+    Enable it with `Camera.enable_property_cache`.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, auto_ttl: float = 0.1) -> None:
+        self.ttl = ttl
+        self.auto_ttl = auto_ttl
+        self.hits = 0
+        self.misses = 0
+        # reads that were not cached because the property is in auto mode
+        self.bypassed = 0
+        self._entries: dict[Hashable, tuple[Any, float]] = {}
+        self._ranges: dict[Hashable, Any] = {}
+
+    def get(self, key: Hashable, query: Callable[..., Any], *args: Any) -> Any:
+        """Return the cached value of `key`, or call `query(*args)` to cache it."""
+        return self._get(key, self.ttl, query, args)
+
+    def get_auto(self, key: Hashable, query: Callable[..., Any], *args: Any) -> Any:
+        """Like `get`, for an auto mode, which expires after `auto_ttl` at most."""
+        ttl = self.auto_ttl if self.ttl is None else min(self.ttl, self.auto_ttl)
+        return self._get(key, ttl, query, args)
+
+    def _get(
+        self,
+        key: Hashable,
+        ttl: Optional[float],
+        query: Callable[..., Any],
+        args: tuple[Any, ...],
+    ) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None and (ttl is None or time.monotonic() - entry[1] < ttl):
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        value = query(*args)
+        self._entries[key] = (value, time.monotonic())
+        return value
+
+    def get_range(
+        self, grabber: HGRABBER, key: Hashable, query: Callable[..., Any], *args: Any
+    ) -> Any:
+        """Like `get`, but cached permanently for the current image format."""
+        image_format = ic.get_image_format(grabber)
+        key = (
+            key,
+            image_format.width,
+            image_format.height,
+            image_format.bits_per_pixel,
+            image_format.color_format,
+        )
+        try:
+            value = self._ranges[key]
+        except KeyError:
+            self.misses += 1
+            value = self._ranges[key] = query(*args)
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (value, time.monotonic())
+
+    def discard(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def refresh(self) -> None:
+        """Drop all cached values and auto modes, they are read again on next access."""
+        self._entries.clear()
+
+    def clear(self) -> None:
+        """Drop all cached values, auto modes and ranges, and reset the counters."""
+        self._entries.clear()
+        self._ranges.clear()
+        self.hits = self.misses = self.bypassed = 0
 
 
 class CameraSetting:
-    def __init__(self, grabber, property: CameraProperty):
+    def __init__(
+        self,
+        grabber,
+        property: CameraProperty,
+        cache: Optional[PropertyCache] = None,
+    ):
         self._grabber = grabber
         self._property = property
-        self.is_available = ic.is_camera_property_available(grabber, property)
-        self.auto_available = ic.is_camera_property_auto_available(grabber, property)
+        self._availability = ic.property_availability(grabber)
+        self._cache = cache
+
+    @property
+    def is_available(self) -> bool:
+        try:
+            return self._availability[self._property][0]
+        except KeyError:
+            return ic.get_property_availability(self._grabber, self._property)[0]
+
+    @property
+    def auto_available(self) -> bool:
+        try:
+            return self._availability[self._property][1]
+        except KeyError:
+            return ic.get_property_availability(self._grabber, self._property)[1]
+
+    def _is_auto(self) -> bool:
+        if self.auto_available and self.auto:
+            self._cache.bypassed += 1
+            return True
+        return False
 
     @property
     def value(self) -> int:
         if self.is_available:
-            return ic.get_camera_property(self._grabber, self._property)
+            if self._cache is None or self._is_auto():
+                return ic.get_camera_property(self._grabber, self._property)
+            return self._cache.get(
+                (self._property, "value"),
+                ic.get_camera_property,
+                self._grabber,
+                self._property,
+            )
         else:
             raise RuntimeError("Camera property not available.")
 
@@ -29,20 +200,37 @@ class CameraSetting:
         if self.is_available:
             self.auto = False
             ic.set_camera_property(self._grabber, self._property, value)
+            if self._cache is not None:
+                self._cache.set((self._property, "value"), value)
         else:
             raise RuntimeError("Camera property not available.")
 
     @property
     def setting_range(self) -> tuple[int, int]:
         if self.is_available:
-            return ic.camera_property_get_range(self._grabber, self._property)
+            if self._cache is None:
+                return ic.camera_property_get_range(self._grabber, self._property)
+            return self._cache.get_range(
+                self._grabber,
+                (self._property, "range"),
+                ic.camera_property_get_range,
+                self._grabber,
+                self._property,
+            )
         else:
             raise RuntimeError("Camera property not available.")
 
     @property
     def auto(self) -> bool:
         if self.auto_available:
-            return ic.get_auto_camera_property(self._grabber, self._property)
+            if self._cache is None:
+                return ic.get_auto_camera_property(self._grabber, self._property)
+            return self._cache.get_auto(
+                (self._property, "auto"),
+                ic.get_auto_camera_property,
+                self._grabber,
+                self._property,
+            )
         else:
             raise RuntimeError("Auto setting for property is not available.")
 
@@ -50,6 +238,11 @@ class CameraSetting:
     def auto(self, enable: bool) -> None:
         if self.auto_available:
             ic.enable_auto_camera_property(self._grabber, self._property, enable)
+            if self._cache is not None:
+                self._cache.set((self._property, "auto"), enable)
+                if enable:
+                    self._cache.discard((self._property, "value"))
+                    self._cache.discard((self._property, "setting"))
         else:
             raise RuntimeError("Auto setting for property is not available.")
 
@@ -58,7 +251,11 @@ class Exposure(CameraSetting):
     @property
     def setting(self) -> int:
         if self.is_available:
-            return ic.get_exp_reg_val(self._grabber)
+            if self._cache is None or self._is_auto():
+                return ic.get_exp_reg_val(self._grabber)
+            return self._cache.get(
+                (self._property, "setting"), ic.get_exp_reg_val, self._grabber
+            )
         else:
             raise RuntimeError("Camera property not available.")
 
@@ -67,29 +264,76 @@ class Exposure(CameraSetting):
         if self.is_available:
             self.auto = False
             ic.set_exp_reg_val(self._grabber, value)
+            if self._cache is not None:
+                # the absolute value follows the register
+                self._cache.set((self._property, "setting"), value)
+                self._cache.discard((self._property, "value"))
         else:
             raise RuntimeError("Camera property not available.")
 
     @property
     def value(self) -> float:
-        return ic.get_property_absolute_value(self._grabber, "Exposure", "Value")
+        if self._cache is None or self._is_auto():
+            return ic.get_property_absolute_value(self._grabber, "Exposure", "Value")
+        return self._cache.get(
+            (self._property, "value"),
+            ic.get_property_absolute_value,
+            self._grabber,
+            "Exposure",
+            "Value",
+        )
 
     @value.setter
     def value(self, value: float) -> None:
         ic.set_property_absolute_value(self._grabber, "Exposure", "Value", value)
+        if self._cache is not None:
+            self._cache.set((self._property, "value"), value)
+            self._cache.discard((self._property, "setting"))
 
 
 class VideoSetting:
-    def __init__(self, grabber, property: VideoProperty):
+    def __init__(
+        self,
+        grabber,
+        property: VideoProperty,
+        cache: Optional[PropertyCache] = None,
+    ):
         self._grabber = grabber
         self._property = property
-        self.is_available = ic.is_video_property_available(grabber, property)
-        self.auto_available = ic.is_video_property_auto_available(grabber, property)
+        self._availability = ic.property_availability(grabber)
+        self._cache = cache
+
+    @property
+    def is_available(self) -> bool:
+        try:
+            return self._availability[self._property][0]
+        except KeyError:
+            return ic.get_property_availability(self._grabber, self._property)[0]
+
+    @property
+    def auto_available(self) -> bool:
+        try:
+            return self._availability[self._property][1]
+        except KeyError:
+            return ic.get_property_availability(self._grabber, self._property)[1]
+
+    def _is_auto(self) -> bool:
+        if self.auto_available and self.auto:
+            self._cache.bypassed += 1
+            return True
+        return False
 
     @property
     def setting(self) -> int:
         if self.is_available:
-            return ic.get_video_property(self._grabber, self._property)
+            if self._cache is None or self._is_auto():
+                return ic.get_video_property(self._grabber, self._property)
+            return self._cache.get(
+                (self._property, "setting"),
+                ic.get_video_property,
+                self._grabber,
+                self._property,
+            )
         else:
             raise RuntimeError("Video property not available.")
 
@@ -98,13 +342,22 @@ class VideoSetting:
         if self.is_available:
             self.auto = False
             ic.set_video_property(self._grabber, self._property, value)
+            if self._cache is not None:
+                self._cache.set((self._property, "setting"), value)
         else:
             raise RuntimeError("Video property not available.")
 
     @property
     def auto(self) -> bool:
         if self.auto_available:
-            return ic.get_auto_video_property(self._grabber, self._property)
+            if self._cache is None:
+                return ic.get_auto_video_property(self._grabber, self._property)
+            return self._cache.get_auto(
+                (self._property, "auto"),
+                ic.get_auto_video_property,
+                self._grabber,
+                self._property,
+            )
         else:
             raise RuntimeError("Auto setting for property is not available.")
 
@@ -112,41 +365,91 @@ class VideoSetting:
     def auto(self, enable: bool) -> None:
         if self.auto_available:
             ic.enable_auto_video_property(self._grabber, self._property, enable)
+            if self._cache is not None:
+                self._cache.set((self._property, "auto"), enable)
+                if enable:
+                    self._cache.discard((self._property, "setting"))
         else:
             raise RuntimeError("Auto setting for property is not available.")
 
     @property
     def setting_range(self) -> tuple[int, int]:
         if self.is_available:
-            return ic.video_property_get_range(self._grabber, self._property)
+            if self._cache is None:
+                return ic.video_property_get_range(self._grabber, self._property)
+            return self._cache.get_range(
+                self._grabber,
+                (self._property, "range"),
+                ic.video_property_get_range,
+                self._grabber,
+                self._property,
+            )
         else:
             raise RuntimeError("Video property not available.")
 
 
-class Camera:
-    def __init__(self, grabber: HGRABBER) -> None:
-        self._grabber = grabber
+class _Setting:
+    """
+    A camera or video setting of `Camera`, created on first access.
+
+    No DLL calls are made when a camera is created, the availability of a property is
+    only queried when it is first used.
+    """
+
+    def __init__(
+        self,
+        setting_type: type[Union[CameraSetting, VideoSetting]],
+        property: Union[CameraProperty, VideoProperty],
+    ) -> None:
+        self._setting_type = setting_type
+        self._property = property
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._name = name
 
-        self.pan = CameraSetting(self._grabber, CameraProperty.PAN)
-        self.tilt = CameraSetting(self._grabber, CameraProperty.TILT)
-        self.roll = CameraSetting(self._grabber, CameraProperty.ROLL)
-        self.zoom = CameraSetting(self._grabber, CameraProperty.ZOOM)
-        # NOTE: Exposure is a special case with different commands
-        self.exposure = Exposure(self._grabber, CameraProperty.EXPOSURE)
-        self.iris = CameraSetting(self._grabber, CameraProperty.IRIS)
-        self.focus = CameraSetting(self._grabber, CameraProperty.FOCUS)
-        self.brightness = VideoSetting(self._grabber, VideoProperty.BRIGHTNESS)
-        self.contrast = VideoSetting(self._grabber, VideoProperty.CONTRAST)
-        self.hue = VideoSetting(self._grabber, VideoProperty.HUE)
-        self.saturation = VideoSetting(self._grabber, VideoProperty.SATURATION)
-        self.sharpness = VideoSetting(self._grabber, VideoProperty.SHARPNESS)
-        self.gamma = VideoSetting(self._grabber, VideoProperty.GAMMA)
-        self.color_enable = VideoSetting(self._grabber, VideoProperty.COLORENABLE)
-        self.white_balance = VideoSetting(self._grabber, VideoProperty.WHITEBALANCE)
-        self.black_light_compensation = VideoSetting(
-            self._grabber, VideoProperty.BLACKLIGHTCOMPENSATION
+    def __get__(self, camera: Optional["Camera"], owner: type):
+        if camera is None:
+            return self
+        setting = self._setting_type(
+            camera._grabber, self._property, camera._property_cache
         )
-        self.gain = VideoSetting(self._grabber, VideoProperty.GAIN)
+        # the instance attribute takes precedence over this descriptor from now on
+        camera.__dict__[self._name] = setting
+        return setting
+
+
+class Camera(Acquisition):
+    pan = _Setting(CameraSetting, CameraProperty.PAN)
+    tilt = _Setting(CameraSetting, CameraProperty.TILT)
+    roll = _Setting(CameraSetting, CameraProperty.ROLL)
+    zoom = _Setting(CameraSetting, CameraProperty.ZOOM)
+    # NOTE: Exposure is a special case with different commands
+    exposure = _Setting(Exposure, CameraProperty.EXPOSURE)
+    iris = _Setting(CameraSetting, CameraProperty.IRIS)
+    focus = _Setting(CameraSetting, CameraProperty.FOCUS)
+    brightness = _Setting(VideoSetting, VideoProperty.BRIGHTNESS)
+    contrast = _Setting(VideoSetting, VideoProperty.CONTRAST)
+    hue = _Setting(VideoSetting, VideoProperty.HUE)
+    saturation = _Setting(VideoSetting, VideoProperty.SATURATION)
+    sharpness = _Setting(VideoSetting, VideoProperty.SHARPNESS)
+    gamma = _Setting(VideoSetting, VideoProperty.GAMMA)
+    color_enable = _Setting(VideoSetting, VideoProperty.COLORENABLE)
+    white_balance = _Setting(VideoSetting, VideoProperty.WHITEBALANCE)
+    black_light_compensation = _Setting(
+        VideoSetting, VideoProperty.BLACKLIGHTCOMPENSATION
+    )
+    gain = _Setting(VideoSetting, VideoProperty.GAIN)
+
+    def __init__(self, grabber: HGRABBER) -> None:
+        self._grabber = grabber
+        self._buffer_callback: Optional[BufferCallback] = None
+        self._frame_ready_callback: Optional[FRAMEREADYCALLBACK] = None
+        self._frame_handler: Optional[Callable[[np.ndarray, int], None]] = None
+        self.frame_log = FrameMetadataLog()
+        self._property_cache: Optional[PropertyCache] = None
+        # the DLL cannot report the video format, it is known once it has been set
+        self._video_format: Optional[str] = None
+        self._property_tree: Optional[PropertyTree] = None
 
     def __enter__(self) -> Self:
         return self
@@ -165,7 +468,119 @@ class Camera:
     def frame_rate(self, value: float) -> None:
         ic.set_frame_rate(self._grabber, value)
 
+    @property
+    def property_cache(self) -> Optional[PropertyCache]:
+        return self._property_cache
+
+    def enable_property_cache(
+        self, ttl: Optional[float] = None, auto_ttl: float = 0.1
+    ) -> PropertyCache:
+        """
+        Cache property values and ranges, see `PropertyCache`.
+
+        Settings obtained from the camera before are not affected.
+        """
+        self._property_cache = PropertyCache(ttl, auto_ttl)
+        self._drop_settings()
+        return self._property_cache
+
+    def disable_property_cache(self) -> None:
+        self._property_cache = None
+        self._drop_settings()
+
+    def _drop_settings(self) -> None:
+        # settings are created again, with the current cache, on next access
+        for name, attribute in vars(Camera).items():
+            if isinstance(attribute, _Setting):
+                self.__dict__.pop(name, None)
+
+    def apply(self, settings: PropertySettings) -> ApplyReport:
+        """
+        Set named properties, e.g. `{"Exposure": {"Auto": False, "Value": 0.01}}`.
+
+        Only values that differ from the current ones are written, automatic modes
+        are switched off first. If a write fails, the properties are rolled back and
+        `ApplyError` is raised. See `tisgrabber.properties`.
+        """
+        try:
+            return apply_properties(ic, self._grabber, settings)
+        finally:
+            self._refresh_property_cache()
+
+    def property_handle(
+        self, item: str, element: str, type_: type = float
+    ) -> PropertyHandle:
+        """
+        Return fast access to a named property, e.g. `("Exposure", "Value")`.
+
+        The handle bypasses the property cache, which is refreshed after every write
+        through the handle.
+        """
+        return PropertyHandle(
+            ic,
+            self._grabber,
+            item,
+            element,
+            type_,
+            on_write=self._refresh_property_cache,
+        )
+
+    def _refresh_property_cache(self) -> None:
+        if self._property_cache is not None:
+            self._property_cache.refresh()
+
+    @property
+    def property_tree(self) -> Optional[PropertyTree]:
+        return self._property_tree
+
+    def discover_properties(
+        self, firmware: str = "", cache: Union[str, Path, bool] = True
+    ) -> PropertyTree:
+        """
+        Enumerate the named properties of the device, see `discover_properties`.
+
+        Snapshots then capture all elements of the tree instead of a fixed catalogue.
+        """
+        self._property_tree = discover_properties(ic, self._grabber, firmware, cache)
+        return self._property_tree
+
+    def snapshot(self) -> DeviceState:
+        """
+        Capture the available named properties, the frame rate and the video format.
+
+        The video format is only known if it was set with `set_video_format`.
+        """
+        if self._property_tree is None:
+            return capture_state(ic, self._grabber, self._video_format)
+        return capture_state(
+            ic,
+            self._grabber,
+            self._video_format,
+            self._property_tree.state_elements(),
+        )
+
+    def restore(self, state: DeviceState) -> ApplyReport:
+        """Re-apply a snapshot, writing only what differs from the current state."""
+        if state.video_format is not None and state.video_format != self._video_format:
+            self.set_video_format(state.video_format)
+        if state.frame_rate is not None and not same_value(
+            ic.get_frame_rate(self._grabber), state.frame_rate
+        ):
+            ic.set_frame_rate(self._grabber, state.frame_rate)
+        return self.apply(state.properties)
+
+    def set_video_format(self, format: str) -> None:
+        ic.set_video_format(self._grabber, format)
+        self._video_format = format
+        self._refresh_property_cache()
+        if self._buffer_callback is not None:
+            self._buffer_callback.invalidate()
+
     def start_live(self) -> None:
+        if self._buffer_callback is not None:
+            # the sink, and with it the image buffers, is recreated when starting
+            self._buffer_callback.invalidate()
+        self.frame_log.restart()
         ic.start_live(self._grabber)
 
     def stop_live(self) -> None:
@@ -174,17 +589,33 @@ class Camera:
     def snap_image(self, timeout=1000) -> None:
         ic.snap_image(self._grabber, timeout=timeout)
 
-    def get_image_data(self) -> np.ndarray:
-        return ic.get_image_data(self._grabber)
+    def get_image_data(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        return ic.get_image_data(self._grabber, out=out)
+
+    def ring_buffer(self, size: int = 5) -> RingBuffer:
+        """
+        Resize the DLL's ring buffer and return zero-copy access to its image buffers.
+
+        Live mode must be stopped when calling this.
+        """
+        return RingBuffer(ic, self._grabber, size)
 
     def save_device_state_to_file(self, filename: FilePath) -> None:
         ic.save_device_state_to_file(self._grabber, filename)
 
+    def load_device_state_from_file(self, filename: FilePath) -> None:
+        ic.load_device_state_from_file(self._grabber, filename)
+        self._refresh_property_cache()
+
     def get_image_description(self) -> tuple[int, int, int, int]:
         return ic.get_image_description(self._grabber)
 
+    def get_image_format(self) -> ImageFormat:
+        return ic.get_image_format(self._grabber)
+
     def show_property_dialog(self) -> None:
         ic.show_property_dialog(self._grabber)
+        self._refresh_property_cache()
 
     def set_window_handle(self, handle: Any) -> None:
         ic.set_hwnd(self._grabber, handle)
@@ -195,6 +626,49 @@ class Camera:
     def set_frame_ready_callback(self, callback: FRAMEREADYCALLBACK, data: Structure):
         """Set a callback function that is called when a new frame is ready."""
         ic.set_frame_ready_callback(self._grabber, callback, data)
+        # replaces the callback of `set_frame_handler`
+        self._frame_ready_callback = None
+
+    def set_frame_handler(
+        self, handler: Optional[Callable[[np.ndarray, int], None]]
+    ) -> None:
+        """
+        Call `handler(image, frame_number)` on the DLL's thread for every new frame.
+
+        `image` is a view of the driver's buffer that is only valid during the call.
+        The metadata of every frame is recorded in `frame_log`. None detaches the
+        handler. Handlers are swapped without replacing the callback of the DLL, so
+        that a callback running on the DLL's thread is never garbage collected.
+        """
+        self._frame_handler = handler
+        if self._frame_ready_callback is not None:
+            return
+        frame_log = self.frame_log
+
+        def on_frame_ready(grabber, ptr, frame_number, data):
+            timestamp_ns = time.perf_counter_ns()
+            image_format = ic.get_image_format(grabber)
+            frame_log.record(frame_number, timestamp_ns, image_format)
+            handler = self._frame_handler
+            if handler is not None:
+                handler(image_format.view(ptr), frame_number)
+
+        # NOTE: keep a reference, otherwise the ctypes callback is garbage collected
+        self._frame_ready_callback = ic.create_frame_ready_callback(on_frame_ready)
+        ic.set_frame_ready_callback(self._grabber, self._frame_ready_callback, None)
+
+    def set_frame_ready_callback_ex(
+        self, callback: Callable[[BufferFrame, Any], None], data: Any = None
+    ) -> None:
+        """
+        Set a callback function `callback(frame, data)` that is called with a
+        `BufferFrame` when a new frame is ready.
+        """
+        # NOTE: keep a reference, otherwise the ctypes callback is garbage collected
+        self._buffer_callback = BufferCallback(ic, callback)
+        ic.set_frame_ready_callback_ex(
+            self._grabber, self._buffer_callback.c_callback, data
+        )
 
     def enable_trigger(self, enable: bool) -> None:
         ic.enable_trigger(self._grabber, enable)
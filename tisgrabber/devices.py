@@ -0,0 +1,207 @@
+"""
+Cached device inventory with hot-plug events.
+
+`DeviceMonitor` enumerates the devices in one background thread at a fixed interval,
+so that callers read its immutable `Inventory` instead of enumerating the devices
+with the library themselves, and are told about added and removed devices.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional, Self
+
+from . import cam
+from .enums import DeviceChange
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DeviceInfo:
+    name: str
+    unique_name: str
+    serial: str
+
+
+@dataclass(frozen=True)
+class Inventory:
+    """
+    The devices found by one enumeration.
+
+    `generation` counts the enumerations that changed the inventory, `timestamp` is
+    the `time.monotonic` of the enumeration.
+    """
+
+    devices: tuple[DeviceInfo, ...] = ()
+    generation: int = 0
+    timestamp: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def __iter__(self) -> Iterator[DeviceInfo]:
+        return iter(self.devices)
+
+    def __contains__(self, unique_name: object) -> bool:
+        return any(device.unique_name == unique_name for device in self.devices)
+
+    def get(self, unique_name: str) -> Optional[DeviceInfo]:
+        return next((d for d in self.devices if d.unique_name == unique_name), None)
+
+    @property
+    def unique_names(self) -> list[str]:
+        return [device.unique_name for device in self.devices]
+
+
+@dataclass(frozen=True)
+class DeviceEvent:
+    change: DeviceChange
+    device: DeviceInfo
+    # the inventory including the change
+    inventory: Inventory
+
+
+def _serial(name: str, unique_name: str) -> str:
+    # unique names are the device name followed by the serial number
+    if unique_name.startswith(name):
+        return unique_name[len(name) :].strip()
+    return unique_name.rpartition(" ")[2]
+
+
+def enumerate_devices(ic: Any) -> tuple[DeviceInfo, ...]:
+    """Enumerate the connected devices with the library."""
+    devices = []
+    for index in range(ic.get_device_count()):
+        name = ic.get_device(index)
+        unique_name = ic.get_unique_name_from_list(index)
+        if not name or not unique_name:
+            # unplugged while enumerating
+            continue
+        devices.append(DeviceInfo(name, unique_name, _serial(name, unique_name)))
+    return tuple(devices)
+
+
+class DeviceMonitor:
+    """
+    Keeps an inventory of the connected devices up to date.
+
+    The devices are enumerated when the monitor is started and then every `interval`
+    seconds in a background thread. Subscribers are called from that thread with a
+    `DeviceEvent` for every added and removed device. Exceptions raised by subscribers
+    or by an enumeration are logged and do not stop the monitor; failed enumerations
+    are counted in `errors`.
+
+    :param ic: The `ImageControl` to enumerate devices with, by default the one shared
+        by all cameras.
+    """
+
+    def __init__(self, ic: Any = None, interval: float = 1.0) -> None:
+        self._ic = cam.ic if ic is None else ic
+        self.interval = interval
+        self._inventory = Inventory()
+        self._subscribers: list[Callable[[DeviceEvent], None]] = []
+        # serializes enumerations and the events, subscribers may call `refresh`
+        self._refresh_lock = threading.RLock()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.errors = 0
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def inventory(self) -> Inventory:
+        return self._inventory
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def subscribe(self, callback: Callable[[DeviceEvent], None]) -> Callable[[], None]:
+        """Call `callback` on every change and return a function that unsubscribes."""
+        with self._condition:
+            self._subscribers = [*self._subscribers, callback]
+
+        def unsubscribe() -> None:
+            with self._condition:
+                self._subscribers = [s for s in self._subscribers if s is not callback]
+
+        return unsubscribe
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self.refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="tisgrabber-devices", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        if thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                # keep the last inventory, the next enumeration may succeed
+                self.errors += 1
+                logger.warning("Enumerating the devices failed.", exc_info=True)
+
+    def refresh(self) -> Inventory:
+        """Enumerate the devices now and notify the subscribers of any change."""
+        with self._refresh_lock:
+            devices = enumerate_devices(self._ic)
+            previous = self._inventory
+            if devices == previous.devices:
+                self._inventory = Inventory(
+                    devices, previous.generation, time.monotonic()
+                )
+                return self._inventory
+            inventory = Inventory(devices, previous.generation + 1, time.monotonic())
+            with self._condition:
+                self._inventory = inventory
+                self._condition.notify_all()
+            current = set(devices)
+            events = [
+                DeviceEvent(DeviceChange.REMOVED, device, inventory)
+                for device in previous.devices
+                if device not in current
+            ] + [
+                DeviceEvent(DeviceChange.ADDED, device, inventory)
+                for device in devices
+                if device not in previous.devices
+            ]
+            for event in events:
+                for callback in self._subscribers:
+                    try:
+                        callback(event)
+                    except Exception:
+                        logger.exception("Device event subscriber %r failed.", callback)
+            return inventory
+
+    def wait_for(self, unique_name: str, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until a device is in the inventory, e.g. to reconnect after it was lost.
+
+        The monitor has to be running. Return whether the device appeared within
+        `timeout` seconds.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: unique_name in self._inventory, timeout
+            )
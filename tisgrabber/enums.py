@@ -43,3 +43,18 @@ class VideoProperty(Enum):
     WHITEBALANCE = 7
     BLACKLIGHTCOMPENSATION = 8
     GAIN = 9
+
+
+class DropPolicy(Enum):
+    """What a full frame queue does with a new frame."""
+
+    DROP_OLDEST = 0
+    DROP_NEWEST = 1
+    BLOCK = 2
+
+
+class DeviceChange(Enum):
+    """What happened to a device in a `DeviceEvent`."""
+
+    ADDED = 0
+    REMOVED = 1
@@ -73,6 +73,23 @@ class NoPropertySetError(ICError):
     pass
 
 
+class ApplyError(ICError):
+    """
+    Exception raised when applying properties failed. The properties written before
+    the error were restored, the outcome is available as `report`.
+    """
+
+    def __init__(self, message: str, report) -> None:
+        super().__init__(message)
+        self.report = report
+
+
+class QueueClosedError(ICError):
+    """Exception raised when getting a frame from a closed and drained queue."""
+
+    pass
+
+
 def check_device_handle_error_code(err: int) -> None:
     if err == IC_SUCCESS:
         return
@@ -0,0 +1,128 @@
+import ctypes
+from typing import Optional
+
+import numpy as np
+
+from .enums import SinkFormat
+
+# dtype and channels of the NumPy view for each sink format
+_LAYOUTS = {
+    SinkFormat.Y800.value: (np.dtype(np.uint8), 1),
+    SinkFormat.RGB24.value: (np.dtype(np.uint8), 3),
+    SinkFormat.RGB32.value: (np.dtype(np.uint8), 4),
+    # packed U Y0 V Y1: (chroma, luma) per pixel, chroma alternates between U and V
+    SinkFormat.UYVY.value: (np.dtype(np.uint8), 2),
+    SinkFormat.Y16.value: (np.dtype("<u2"), 1),
+}
+
+# ITU-R BT.601 luma weights in BGR order
+_BGR_TO_GRAY = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+
+def bgr_to_rgb(image: np.ndarray) -> np.ndarray:
+    """Return an RGB view of a BGR or BGRA image without copying."""
+    return image[..., 2::-1]
+
+
+def bgr_to_gray(image: np.ndarray) -> np.ndarray:
+    gray = image[..., :3] @ _BGR_TO_GRAY
+    return gray.round().astype(image.dtype)
+
+
+def uyvy_to_gray(image: np.ndarray) -> np.ndarray:
+    """Return the luma of a packed UYVY image of shape (h, w, 2) without copying."""
+    return image[..., 1]
+
+
+def uyvy_to_rgb(image: np.ndarray) -> np.ndarray:
+    """Convert a packed UYVY image of shape (h, w, 2) to RGB (ITU-R BT.601)."""
+    y = 1.164 * (image[..., 1].astype(np.float32) - 16.0)
+    u = np.repeat(image[:, 0::2, 0].astype(np.float32) - 128.0, 2, axis=1)
+    v = np.repeat(image[:, 1::2, 0].astype(np.float32) - 128.0, 2, axis=1)
+    rgb = np.empty(image.shape[:2] + (3,), dtype=np.float32)
+    rgb[..., 0] = y + 1.596 * v
+    rgb[..., 1] = y - 0.392 * u - 0.813 * v
+    rgb[..., 2] = y + 2.017 * u
+    return np.clip(rgb, 0, 255, out=rgb).round().astype(np.uint8)
+
+
+class ImageFormat:
+    """
+    Geometry and pixel layout of the images delivered by a sink.
+
+    Holds a prebuilt ctypes array type matching the image size, so that turning an
+    image pointer into a NumPy view does not have to create new types on every frame.
+    Views are typed according to the sink format: uint16 for Y16, four channels (BGRA)
+    for RGB32 and two interleaved bytes per pixel for UYVY. Unknown formats are
+    returned as bytes.
+    """
+
+    __slots__ = (
+        "width",
+        "height",
+        "bits_per_pixel",
+        "color_format",
+        "dtype",
+        "shape",
+        "nbytes",
+        "_array_type",
+    )
+
+    def __init__(
+        self, width: int, height: int, bits_per_pixel: int, color_format: int
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.bits_per_pixel = bits_per_pixel
+        self.color_format = color_format
+        self.dtype, channels = _LAYOUTS.get(
+            color_format, (np.dtype(np.uint8), bits_per_pixel // 8)
+        )
+        self.shape = (height, width, channels)
+        self.nbytes = width * height * bits_per_pixel // 8
+        self._array_type = ctypes.c_ubyte * self.nbytes
+
+    def __repr__(self) -> str:
+        return (
+            f"ImageFormat(width={self.width}, height={self.height}, "
+            f"bits_per_pixel={self.bits_per_pixel}, color_format={self.color_format})"
+        )
+
+    @property
+    def sink_format(self) -> Optional[SinkFormat]:
+        try:
+            return SinkFormat(self.color_format)
+        except ValueError:
+            return None
+
+    def view(self, ptr) -> np.ndarray:
+        """Return a zero-copy view of the image data at `ptr`."""
+        buffer = self._array_type.from_address(ctypes.addressof(ptr.contents))
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=buffer)
+
+    def to_rgb(self, image: np.ndarray) -> np.ndarray:
+        """
+        Return `image` as RGB. This is a view for RGB24, RGB32 and monochrome images.
+        """
+        sink_format = self.sink_format
+        if sink_format in (SinkFormat.RGB24, SinkFormat.RGB32):
+            return bgr_to_rgb(image)
+        if sink_format == SinkFormat.UYVY:
+            return uyvy_to_rgb(image)
+        if sink_format in (SinkFormat.Y800, SinkFormat.Y16):
+            return np.broadcast_to(image, image.shape[:2] + (3,))
+        raise ValueError(f"Cannot convert color format {self.color_format} to RGB.")
+
+    def to_gray(self, image: np.ndarray) -> np.ndarray:
+        """
+        Return `image` as a 2D monochrome image. This is a view for Y800, Y16 and UYVY
+        images.
+        """
+        sink_format = self.sink_format
+        if sink_format in (SinkFormat.Y800, SinkFormat.Y16):
+            return image[..., 0]
+        if sink_format == SinkFormat.UYVY:
+            return uyvy_to_gray(image)
+        if sink_format in (SinkFormat.RGB24, SinkFormat.RGB32):
+            return bgr_to_gray(image)
+        raise ValueError(f"Cannot convert color format {self.color_format} to gray.")
@@ -0,0 +1,393 @@
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Self
+
+import numpy as np
+
+from .enums import DropPolicy
+from .exceptions import QueueClosedError
+from .formats import ImageFormat
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Usage statistics of a `FramePool`."""
+
+    capacity: int
+    free: int
+    hits: int
+    misses: int
+    outstanding: int
+
+
+class FrameLease:
+    """
+    An array leased from a `FramePool`.
+
+    The array is handed back to the pool by `release` or when leaving the `with`
+    block and must not be used afterwards.
+    """
+
+    __slots__ = ("_pool", "_array")
+
+    def __init__(self, pool: "FramePool", array: np.ndarray) -> None:
+        self._pool = pool
+        self._array = array
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if dtype is None:
+            return self.array
+        return self.array.astype(dtype, copy=False)
+
+    @property
+    def released(self) -> bool:
+        return self._array is None
+
+    @property
+    def array(self) -> np.ndarray:
+        if self._array is None:
+            raise ValueError("Frame lease has already been released.")
+        return self._array
+
+    def release(self) -> None:
+        if self._array is None:
+            return
+        array, self._array = self._array, None
+        self._pool._release(array)
+
+
+class FramePool:
+    """
+    A pool of preallocated arrays for keeping frames beyond the next acquisition.
+
+    Copying a frame into a leased array avoids allocating a new multi-megabyte array
+    per frame. If all arrays are leased, a new one is allocated (counted as a miss);
+    arrays returned to a full pool are dropped.
+    """
+
+    def __init__(self, shape: tuple[int, ...], dtype=np.uint8, capacity: int = 8):
+        if capacity < 1:
+            raise ValueError("Frame pool capacity must be at least 1.")
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._free = [self._allocate() for _ in range(capacity)]
+        self._hits = 0
+        self._misses = 0
+        self._outstanding = 0
+
+    @classmethod
+    def from_format(cls, image_format: ImageFormat, capacity: int = 8) -> Self:
+        return cls(image_format.shape, image_format.dtype, capacity)
+
+    def _allocate(self) -> np.ndarray:
+        return np.empty(self.shape, dtype=self.dtype)
+
+    @property
+    def stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(
+                capacity=self.capacity,
+                free=len(self._free),
+                hits=self._hits,
+                misses=self._misses,
+                outstanding=self._outstanding,
+            )
+
+    def acquire(self) -> FrameLease:
+        """Lease an array from the pool. Its content is undefined."""
+        with self._lock:
+            self._outstanding += 1
+            if self._free:
+                self._hits += 1
+                return FrameLease(self, self._free.pop())
+            self._misses += 1
+        return FrameLease(self, self._allocate())
+
+    def copy(self, image: np.ndarray) -> FrameLease:
+        """Lease an array from the pool and copy `image` into it."""
+        lease = self.acquire()
+        try:
+            np.copyto(lease.array, image)
+        except Exception:
+            lease.release()
+            raise
+        return lease
+
+    def _release(self, array: np.ndarray) -> None:
+        with self._lock:
+            self._outstanding -= 1
+            if len(self._free) < self.capacity:
+                self._free.append(array)
+
+
+class Frame:
+    """A frame copied out of the driver's buffer into a leased array."""
+
+    __slots__ = ("frame_number", "_lease")
+
+    def __init__(self, frame_number: int, lease: FrameLease) -> None:
+        self.frame_number = frame_number
+        self._lease = lease
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        return self._lease.__array__(dtype, copy)
+
+    @property
+    def array(self) -> np.ndarray:
+        return self._lease.array
+
+    def release(self) -> None:
+        """Hand the array back to its pool."""
+        self._lease.release()
+
+
+@dataclass(frozen=True)
+class QueueStats:
+    """Counters of a `FrameQueue`."""
+
+    capacity: int
+    size: int
+    enqueued: int
+    dropped: int
+    high_water_mark: int
+
+
+class FrameQueue:
+    """
+    Bounded queue between the DLL's callback thread and Python consumers.
+
+    `put` is meant to be called from the frame ready callback. It only copies the
+    frame into an array leased from the pool and enqueues it. When the queue is full,
+    the policy decides whether the oldest queued frame or the new frame is dropped,
+    or whether the callback blocks for up to `timeout` seconds before dropping the
+    new frame. Consumers must release the frames they get.
+    """
+
+    def __init__(
+        self,
+        pool: FramePool,
+        capacity: int = 8,
+        policy: DropPolicy = DropPolicy.DROP_OLDEST,
+        timeout: Optional[float] = None,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("Frame queue capacity must be at least 1.")
+        self.pool = pool
+        self.capacity = capacity
+        self.policy = policy
+        self.timeout = timeout
+        self._frames: deque[Frame] = deque()
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+        self._not_full = threading.Condition(self._mutex)
+        self._closed = False
+        self._enqueued = 0
+        self._dropped = 0
+        self._high_water_mark = 0
+
+    def __len__(self) -> int:
+        with self._mutex:
+            return len(self._frames)
+
+    def __iter__(self):
+        """Get frames until the queue is closed and drained."""
+        while True:
+            try:
+                yield self.get()
+            except QueueClosedError:
+                return
+
+    @property
+    def stats(self) -> QueueStats:
+        with self._mutex:
+            return QueueStats(
+                capacity=self.capacity,
+                size=len(self._frames),
+                enqueued=self._enqueued,
+                dropped=self._dropped,
+                high_water_mark=self._high_water_mark,
+            )
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _make_room(self) -> bool:
+        # called with the mutex held
+        if len(self._frames) < self.capacity:
+            return True
+        if self.policy == DropPolicy.DROP_OLDEST:
+            self._frames.popleft().release()
+            self._dropped += 1
+            return True
+        if self.policy == DropPolicy.BLOCK:
+            if self._not_full.wait_for(
+                lambda: len(self._frames) < self.capacity or self._closed,
+                self.timeout,
+            ):
+                return not self._closed
+        self._dropped += 1
+        return False
+
+    def put(self, image: np.ndarray, frame_number: int) -> bool:
+        """Copy `image` into the queue. Return False if the frame was dropped."""
+        with self._mutex:
+            if self._closed or not self._make_room():
+                return False
+        frame = Frame(frame_number, self.pool.copy(image))
+        with self._mutex:
+            # another producer may have filled the queue while copying
+            if len(self._frames) >= self.capacity and not self._make_room():
+                frame.release()
+                return False
+            self._frames.append(frame)
+            self._enqueued += 1
+            self._high_water_mark = max(self._high_water_mark, len(self._frames))
+            self._not_empty.notify()
+        return True
+
+    def get(self, timeout: Optional[float] = None) -> Frame:
+        """
+        Remove and return the oldest frame.
+
+        Raises `TimeoutError` if no frame arrives within `timeout` seconds and
+        `QueueClosedError` if the queue is closed and empty.
+        """
+        with self._mutex:
+            if not self._not_empty.wait_for(
+                lambda: self._frames or self._closed, timeout
+            ):
+                raise TimeoutError("No frame received in time.")
+            if not self._frames:
+                raise QueueClosedError("Frame queue is closed.")
+            frame = self._frames.popleft()
+            self._not_full.notify()
+            return frame
+
+    def close(self) -> None:
+        """Stop accepting frames and wake up waiting consumers and producers."""
+        with self._mutex:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def clear(self) -> None:
+        """Release all queued frames."""
+        with self._mutex:
+            while self._frames:
+                self._frames.popleft().release()
+            self._not_full.notify_all()
+
+
+@dataclass(frozen=True)
+class Burst:
+    """
+    A sequence of frames captured into one contiguous `(n, h, w, c)` array.
+
+    `timestamps_ns` holds the `time.perf_counter_ns` value at callback entry and
+    `frame_numbers` the frame number reported by the driver for each image.
+    """
+
+    images: np.ndarray
+    frame_numbers: np.ndarray
+    timestamps_ns: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.images)
+
+
+FRAME_METADATA_DTYPE = np.dtype(
+    [
+        ("frame_number", np.uint32),
+        ("timestamp_ns", np.int64),
+        ("width", np.int32),
+        ("height", np.int32),
+        ("bits_per_pixel", np.int16),
+        ("color_format", np.int16),
+    ]
+)
+
+
+class FrameMetadataLog:
+    """
+    Per-frame metadata records in a preallocated structured NumPy ring array.
+
+    Each record holds the driver frame number, the `time.perf_counter_ns` value at
+    callback entry and the sink format and size (see `FRAME_METADATA_DTYPE`). Gaps in
+    the frame numbers are counted as dropped frames. Only the most recent `capacity`
+    records are kept.
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        if capacity < 1:
+            raise ValueError("Frame metadata log capacity must be at least 1.")
+        self.capacity = capacity
+        self._records = np.zeros(capacity, dtype=FRAME_METADATA_DTYPE)
+        self._lock = threading.Lock()
+        self._count = 0
+        self._last_frame_number: Optional[int] = None
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        """Number of records currently held."""
+        return min(self._count, self.capacity)
+
+    @property
+    def total(self) -> int:
+        """Number of frames recorded since creation."""
+        return self._count
+
+    def record(
+        self, frame_number: int, timestamp_ns: int, image_format: ImageFormat
+    ) -> None:
+        with self._lock:
+            if self._last_frame_number is not None:
+                # frame numbers are unsigned long and wrap around
+                gap = (frame_number - self._last_frame_number - 1) % 2**32
+                if gap < 2**31:
+                    self.dropped += gap
+            self._last_frame_number = frame_number
+            self._records[self._count % self.capacity] = (
+                frame_number,
+                timestamp_ns,
+                image_format.width,
+                image_format.height,
+                image_format.bits_per_pixel,
+                image_format.color_format,
+            )
+            self._count += 1
+
+    def restart(self) -> None:
+        """Forget the last frame number, e.g. because the driver restarts counting."""
+        with self._lock:
+            self._last_frame_number = None
+
+    def records(self, last: Optional[int] = None) -> np.ndarray:
+        """Return a copy of the held records (or of the `last` ones), oldest first."""
+        with self._lock:
+            n = len(self) if last is None else min(last, len(self))
+            indices = np.arange(self._count - n, self._count) % self.capacity
+            return self._records[indices]
+
+    def find(self, frame_number: int) -> Optional[np.void]:
+        """Return the most recent record with `frame_number`, if still held."""
+        records = self.records()
+        matches = np.flatnonzero(records["frame_number"] == frame_number)
+        if not len(matches):
+            return None
+        return records[matches[-1]]
@@ -0,0 +1,386 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping, Optional, Self, Sequence, Union
+
+import numpy as np
+
+from . import cam as _cam
+from .cam import Camera
+from .exceptions import IC_SUCCESS, ICError
+from .frames import Frame, FramePool
+from .properties import DeviceState, PropertySettings
+
+# phases of `open_all`, in order
+PHASES = ("open", "configure", "first_frame")
+
+
+@dataclass(frozen=True)
+class FrameSet:
+    """
+    One frame per camera of a `CameraGroup`, acquired by a common software trigger.
+
+    Times are `time.perf_counter_ns` values. `skew_ns` is the spread of the trigger
+    calls across the cameras, `latency_ns` the time from the first trigger until the
+    last frame arrived (or until the timeout, if frames are missing).
+    """
+
+    index: int
+    frames: tuple[Optional[Frame], ...]
+    trigger_ns: tuple[int, ...]
+    arrival_ns: tuple[Optional[int], ...]
+
+    @property
+    def missing(self) -> list[int]:
+        """Indices of the cameras that did not deliver a frame in time."""
+        return [i for i, frame in enumerate(self.frames) if frame is None]
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing
+
+    @property
+    def skew_ns(self) -> int:
+        return max(self.trigger_ns) - min(self.trigger_ns)
+
+    @property
+    def latency_ns(self) -> Optional[int]:
+        arrivals = [t for t in self.arrival_ns if t is not None]
+        if not arrivals:
+            return None
+        return max(arrivals) - min(self.trigger_ns)
+
+    def release(self) -> None:
+        """Hand all frames back to their pools."""
+        for frame in self.frames:
+            if frame is not None:
+                frame.release()
+
+
+class CameraGroup:
+    """
+    Synchronized software-triggered acquisition with several cameras.
+
+    Trigger mode is enabled on all members and `trigger` fires the software trigger
+    of all cameras from parallel threads released by a common barrier, to keep the
+    skew between cameras small. It then collects one frame per camera into a
+    `FrameSet`. The frames of a camera are matched to its triggers in order, the n-th
+    frame since live mode was started answers the n-th trigger. A frame answering an
+    earlier trigger, e.g. one whose frame set timed out, is discarded and counted as
+    late, so that it cannot be paired with the frames of a later trigger. If a camera
+    loses a triggered frame, restart live mode to match frames and triggers again.
+    The frame pools are sized when live mode is started, and from the frames
+    themselves if their format changes.
+    """
+
+    def __init__(self, cameras: Sequence[Camera], pool_capacity: int = 4) -> None:
+        if not cameras:
+            raise ValueError("A camera group needs at least one camera.")
+        self.cameras = list(cameras)
+        self.pool_capacity = pool_capacity
+        self._pools: list[Optional[FramePool]] = [None] * len(self.cameras)
+        self._executor = ThreadPoolExecutor(
+            len(self.cameras), thread_name_prefix="tisgrabber-trigger"
+        )
+        self._condition = threading.Condition()
+        self._armed = False
+        self._frames: list[Optional[Frame]] = [None] * len(self.cameras)
+        self._arrivals: list[Optional[int]] = [None] * len(self.cameras)
+        # per camera: triggers fired and frames received since live mode started,
+        # and the trigger whose frame belongs to the current frame set
+        self._fired = [0] * len(self.cameras)
+        self._received = [0] * len(self.cameras)
+        self._expected: list[Optional[int]] = [None] * len(self.cameras)
+        self._count = 0
+        self.late = 0
+        for index, cam in enumerate(self.cameras):
+            cam.enable_trigger(True)
+            cam.set_frame_handler(self._make_handler(index))
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.cameras)
+
+    def _make_handler(self, index: int):
+        def on_frame(image: np.ndarray, frame_number: int) -> None:
+            arrival = time.perf_counter_ns()
+            with self._condition:
+                # the trigger this frame answers
+                answered = self._received[index]
+                self._received[index] += 1
+                if not self._accepts(index, answered):
+                    self.late += 1
+                    return
+            pool = self._pools[index]
+            if pool is None or pool.shape != image.shape or pool.dtype != image.dtype:
+                # only this camera's callback thread replaces its pool
+                pool = self._pools[index] = FramePool(
+                    image.shape, image.dtype, self.pool_capacity
+                )
+            frame = Frame(frame_number, pool.copy(image))
+            with self._condition:
+                if not self._accepts(index, answered):
+                    self.late += 1
+                    frame.release()
+                    return
+                self._frames[index] = frame
+                self._arrivals[index] = arrival
+                self._condition.notify_all()
+
+        return on_frame
+
+    def _accepts(self, index: int, answered: int) -> bool:
+        # called with the condition held
+        return (
+            self._armed
+            and self._frames[index] is None
+            and self._expected[index] == answered
+        )
+
+    def start_live(self) -> None:
+        with self._condition:
+            self._fired = [0] * len(self.cameras)
+            self._received = [0] * len(self.cameras)
+        for index, cam in enumerate(self.cameras):
+            cam.start_live()
+            # the image format is only final once live mode is running
+            self._pools[index] = cam.frame_pool(self.pool_capacity)
+
+    def stop_live(self) -> None:
+        for cam in self.cameras:
+            cam.stop_live()
+
+    def trigger(self, timeout: float = 1.0) -> FrameSet:
+        """
+        Trigger all cameras and wait up to `timeout` seconds for one frame of each.
+
+        Live mode has to be running. Missing frames are None in the frame set.
+        """
+        n = len(self.cameras)
+        barrier = threading.Barrier(n)
+
+        def fire(index: int, cam: Camera) -> int:
+            barrier.wait(timeout)
+            with self._condition:
+                self._expected[index] = self._fired[index]
+                self._fired[index] += 1
+            trigger_ns = time.perf_counter_ns()
+            try:
+                cam.software_trigger()
+            except BaseException:
+                with self._condition:
+                    self._fired[index] -= 1
+                    self._expected[index] = None
+                raise
+            return trigger_ns
+
+        with self._condition:
+            self._frames = [None] * n
+            self._arrivals = [None] * n
+            self._expected = [None] * n
+            self._armed = True
+        try:
+            futures = [
+                self._executor.submit(fire, index, cam)
+                for index, cam in enumerate(self.cameras)
+            ]
+            trigger_ns = tuple(future.result() for future in futures)
+        except BaseException:
+            with self._condition:
+                self._armed = False
+                for frame in self._frames:
+                    if frame is not None:
+                        frame.release()
+            raise
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._condition.wait_for(
+                lambda: all(frame is not None for frame in self._frames),
+                max(deadline - time.monotonic(), 0.0),
+            )
+            self._armed = False
+            frames, arrivals = tuple(self._frames), tuple(self._arrivals)
+            index = self._count
+            self._count += 1
+        return FrameSet(index, frames, trigger_ns, arrivals)
+
+    def close(self) -> None:
+        """
+        Detach the group from the cameras, disable their trigger mode and stop the
+        trigger threads.
+        """
+        self._executor.shutdown()
+        for cam in self.cameras:
+            cam.set_frame_handler(None)
+            cam.enable_trigger(False)
+
+
+@dataclass(frozen=True)
+class OpenResult:
+    """
+    Outcome of opening one device with `open_all`.
+
+    `phases` holds the `time.perf_counter` start and end of every phase that was run,
+    including the one that failed.
+    """
+
+    unique_name: str
+    camera: Optional[Camera]
+    error: Optional[BaseException]
+    phases: Mapping[str, tuple[float, float]]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def timings(self) -> dict[str, float]:
+        """Seconds per phase."""
+        return {phase: end - start for phase, (start, end) in self.phases.items()}
+
+
+@dataclass(frozen=True)
+class OpenReport:
+    """The results of `open_all`, in the order of the unique names."""
+
+    results: tuple[OpenResult, ...]
+    workers: int
+    elapsed: float
+
+    @property
+    def cameras(self) -> list[Camera]:
+        """The cameras that were opened and prepared successfully."""
+        return [result.camera for result in self.results if result.camera is not None]
+
+    @property
+    def errors(self) -> dict[str, BaseException]:
+        return {r.unique_name: r.error for r in self.results if r.error is not None}
+
+    def total(self, phase: str) -> float:
+        """Seconds spent in a phase, summed over all devices."""
+        return sum(result.timings.get(phase, 0.0) for result in self.results)
+
+    def wall_time(self, phase: str) -> float:
+        """Seconds during which at least one device was in a phase."""
+        spans = sorted(r.phases[phase] for r in self.results if phase in r.phases)
+        wall_time = 0.0
+        covered = float("-inf")
+        for start, end in spans:
+            start = max(start, covered)
+            if end > start:
+                wall_time += end - start
+                covered = end
+        return wall_time
+
+    def concurrency(self, phase: str) -> float:
+        """
+        How many devices were in a phase at the same time on average.
+
+        About 1 means that the library serializes the phase, values close to the
+        number of workers mean that it benefits from opening devices concurrently.
+        """
+        wall_time = self.wall_time(phase)
+        return self.total(phase) / wall_time if wall_time else 0.0
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Total, wall time and concurrency of every phase that was run."""
+        return {
+            phase: {
+                "total": self.total(phase),
+                "wall_time": self.wall_time(phase),
+                "concurrency": self.concurrency(phase),
+            }
+            for phase in PHASES
+            if any(phase in result.phases for result in self.results)
+        }
+
+    def release(self) -> None:
+        """Release all opened cameras."""
+        for camera in self.cameras:
+            camera.release_grabber()
+
+
+def _configure(
+    camera: Camera,
+    config: Union[DeviceState, PropertySettings, Callable[[Camera], Any]],
+) -> None:
+    if isinstance(config, DeviceState):
+        camera.restore(config)
+    elif callable(config):
+        config(camera)
+    else:
+        camera.apply(config)
+
+
+def _open(
+    unique_name: str,
+    config: Union[DeviceState, PropertySettings, Callable[[Camera], Any], None],
+    start_live: bool,
+    timeout: int,
+) -> OpenResult:
+    ic = _cam.ic
+    phases: dict[str, tuple[float, float]] = {}
+    grabber = None
+    camera = None
+    phase = "open"
+    start = time.perf_counter()
+    try:
+        grabber = ic.create_grabber()
+        if ic.open_dev_by_unique_name(grabber, unique_name) != IC_SUCCESS:
+            raise ICError(f"Failed to open device {unique_name}.")
+        camera = Camera(grabber)
+        phases[phase] = (start, time.perf_counter())
+        if config is not None:
+            phase, start = "configure", time.perf_counter()
+            _configure(camera, config)
+            phases[phase] = (start, time.perf_counter())
+        if start_live:
+            phase, start = "first_frame", time.perf_counter()
+            camera.start_live()
+            # waits for the next frame, i.e. the first one
+            camera.snap_image(timeout=timeout)
+            phases[phase] = (start, time.perf_counter())
+    except Exception as e:
+        phases[phase] = (start, time.perf_counter())
+        if grabber is not None:
+            if start_live and ic.is_dev_valid(grabber):
+                ic.stop_live(grabber)
+            ic.release_grabber(grabber)
+        return OpenResult(unique_name, None, e, phases)
+    return OpenResult(unique_name, camera, None, phases)
+
+
+def open_all(
+    unique_names: Sequence[str],
+    config: Union[DeviceState, PropertySettings, Callable[[Camera], Any], None] = None,
+    workers: Optional[int] = None,
+    start_live: bool = False,
+    timeout: int = 1000,
+) -> OpenReport:
+    """
+    Open, configure and optionally start many devices concurrently.
+
+    Every device is opened, configured with `config` and, with `start_live`, put into
+    live mode until its first frame arrived, within `timeout` milliseconds. `config`
+    is a `DeviceState` that is restored, properties that are applied, or a function
+    called with the camera. A device that fails is released and its error reported,
+    the others are not affected.
+
+    :param workers: Devices handled at the same time, by default all of them. Pass 1
+        to compare against opening the devices one after another.
+    """
+    workers = workers or max(len(unique_names), 1)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers, thread_name_prefix="tisgrabber-open") as executor:
+        futures = [
+            executor.submit(_open, unique_name, config, start_live, timeout)
+            for unique_name in unique_names
+        ]
+        results = tuple(future.result() for future in futures)
+    return OpenReport(results, workers, time.perf_counter() - start)
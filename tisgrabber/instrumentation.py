@@ -0,0 +1,169 @@
+"""
+Per-call instrumentation of the tisgrabber library.
+
+`InstrumentedLibrary` wraps a loaded library and records for every `IC_*` function
+the number of calls, the total and maximum latency and the frequency of error codes,
+in total and per grabber. Error codes are only recorded for `STATUS_FUNCTIONS`, the
+functions returning IC_SUCCESS or an error code. It is installed with
+`ImageControl.enable_instrumentation` and removed again with
+`disable_instrumentation`, so that the library is called directly and without any
+overhead while instrumentation is disabled.
+"""
+
+import ctypes
+import functools
+import json
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Union
+
+from .exceptions import IC_SUCCESS
+from .structs import HGRABBER
+from .tisgrabber import STATUS_FUNCTIONS
+
+_GRABBER_POINTER = ctypes.POINTER(HGRABBER)
+
+
+@dataclass
+class CallStats:
+    """Calls of one library function, with latencies in seconds."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    # error code, or exception name, -> number of calls
+    errors: Counter[Union[int, str]] = field(default_factory=Counter)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, elapsed: float, error: Union[int, str, None]) -> None:
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        if error is not None:
+            self.errors[error] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "max": self.max,
+            "errors": {str(error): count for error, count in self.errors.items()},
+        }
+
+
+def _grabber_key(args: tuple) -> Optional[int]:
+    if args and isinstance(args[0], _GRABBER_POINTER):
+        try:
+            return ctypes.addressof(args[0].contents)
+        except ValueError:
+            # NULL pointer
+            return None
+    return None
+
+
+class InstrumentedLibrary:
+    """
+    Proxy of a loaded library that records every call of its `IC_*` functions.
+
+    Other attributes, e.g. the callback types, are passed through. The statistics are
+    exported with `snapshot` as a dict, or with `to_json`.
+    """
+
+    def __init__(self, library: Any) -> None:
+        self.library = library
+        self._lock = threading.Lock()
+        self._functions: dict[str, CallStats] = {}
+        self._grabbers: dict[int, dict[str, CallStats]] = {}
+        self._start = time.perf_counter()
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.library, name)
+        if not name.startswith("IC_") or not callable(attribute):
+            return attribute
+        wrapped = self._wrap(name, attribute)
+        # cache the wrapper, later lookups do not reach `__getattr__`
+        setattr(self, name, wrapped)
+        return wrapped
+
+    def _wrap(self, name: str, function: Callable) -> Callable:
+        # other functions return e.g. counts, which are no errors even if 0
+        status = name in STATUS_FUNCTIONS
+
+        @functools.wraps(function)
+        def call(*args):
+            start = time.perf_counter()
+            try:
+                result = function(*args)
+            except Exception as e:
+                self._record(name, args, time.perf_counter() - start, type(e).__name__)
+                raise
+            error = result if status and result != IC_SUCCESS else None
+            self._record(name, args, time.perf_counter() - start, error)
+            return result
+
+        return call
+
+    def _record(
+        self, name: str, args: tuple, elapsed: float, error: Union[int, str, None]
+    ) -> None:
+        grabber = _grabber_key(args)
+        with self._lock:
+            stats = self._functions.get(name)
+            if stats is None:
+                stats = self._functions[name] = CallStats()
+            stats.add(elapsed, error)
+            if grabber is not None:
+                functions = self._grabbers.setdefault(grabber, {})
+                stats = functions.get(name)
+                if stats is None:
+                    stats = functions[name] = CallStats()
+                stats.add(elapsed, error)
+
+    def stats(self, name: str, grabber: Any = None) -> CallStats:
+        """Return a copy of the statistics of `name`, for one grabber or in total."""
+        with self._lock:
+            if grabber is None:
+                functions = self._functions
+            else:
+                functions = self._grabbers.get(_grabber_key((grabber,)), {})
+            stats = functions.get(name, CallStats())
+            return CallStats(stats.count, stats.total, stats.max, Counter(stats.errors))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._functions.clear()
+            self._grabbers.clear()
+            self._start = time.perf_counter()
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Return the statistics as a dict.
+
+        Functions are sorted by total latency. Grabbers are identified by the hex
+        address of their handle.
+        """
+
+        def by_total(functions: dict[str, CallStats]) -> dict[str, dict[str, Any]]:
+            ordered = sorted(functions.items(), key=lambda item: -item[1].total)
+            return {name: stats.as_dict() for name, stats in ordered}
+
+        with self._lock:
+            return {
+                "elapsed": time.perf_counter() - self._start,
+                "calls": sum(stats.count for stats in self._functions.values()),
+                "functions": by_total(self._functions),
+                "grabbers": {
+                    hex(grabber): by_total(functions)
+                    for grabber, functions in self._grabbers.items()
+                },
+            }
+
+    def to_json(self, **kwargs: Any) -> str:
+        return json.dumps(self.snapshot(), **kwargs)
@@ -0,0 +1,707 @@
+"""
+Batched access to the named properties of a device, e.g. `("Exposure", "Value")`.
+
+Properties are given as `{item: {element: value}}`, like the `vcdpropertyitems` of a
+device state file. The type of a value selects the interface it is read and written
+with: `bool` for switches such as "Auto", `float` for absolute values and `int` for
+plain values.
+
+`DeviceState` is an in-memory snapshot of these properties, which can be written to
+and read from device state files like `examples/device.xml`. `discover_properties`
+enumerates the items, elements and interfaces a device supports and caches them on
+disk per model.
+"""
+
+import ctypes
+import json
+import math
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Mapping, Optional, Self, Union
+
+from .exceptions import (
+    IC_ERROR,
+    IC_SUCCESS,
+    ApplyError,
+    ICError,
+    PropertyElementNotAvailableError,
+    PropertyElementWrongInterfaceError,
+    PropertyItemNotAvailableError,
+    check_property_error_code,
+)
+from .structs import HGRABBER
+
+PropertyValue = Union[bool, int, float]
+PropertySettings = Mapping[str, Mapping[str, PropertyValue]]
+
+# the elements captured in a `DeviceState` with a value of their type
+STATE_ELEMENTS: dict[str, tuple[tuple[str, PropertyValue], ...]] = {
+    "Pan": (("Auto", False), ("Value", 0)),
+    "Tilt": (("Auto", False), ("Value", 0)),
+    "Roll": (("Auto", False), ("Value", 0)),
+    "Zoom": (("Auto", False), ("Value", 0)),
+    "Exposure": (("Auto", False), ("Value", 0.0), ("Auto Reference", 0)),
+    "Iris": (("Auto", False), ("Value", 0)),
+    "Focus": (
+        ("Auto", False),
+        ("Value", 0),
+        ("Auto Max Value", 0),
+        ("Auto Min Value", 0),
+        ("Enable Region of Interest", False),
+    ),
+    "Brightness": (("Auto", False), ("Value", 0)),
+    "Contrast": (("Auto", False), ("Value", 0)),
+    "Hue": (("Auto", False), ("Value", 0)),
+    "Saturation": (("Auto", False), ("Value", 0)),
+    "Sharpness": (("Auto", False), ("Value", 0)),
+    "Gamma": (("Auto", False), ("Value", 0)),
+    "ColorEnable": (("Value", 0),),
+    "WhiteBalance": (("Auto", False), ("Value", 0)),
+    "BacklightCompensation": (("Value", 0),),
+    "Gain": (("Auto", False), ("Value", 0)),
+    "Trigger": (("Enable", False),),
+    "Denoise": (("Value", 0),),
+    "GPIO": (("GP Out", 0),),
+    "Highlight reduction": (("Enable", False),),
+    "Tone Mapping": (("Auto", False), ("Enable", False)),
+}
+
+# GUIDs of the device state files, as far as they are known
+ITEM_GUIDS = {
+    "Brightness": "{284C0E06-010B-45BF-8291-09D90A459B28}",
+    "Contrast": "{284C0E07-010B-45BF-8291-09D90A459B28}",
+    "Sharpness": "{284C0E0A-010B-45BF-8291-09D90A459B28}",
+    "Gamma": "{284C0E0B-010B-45BF-8291-09D90A459B28}",
+    "Gain": "{284C0E0F-010B-45BF-8291-09D90A459B28}",
+    "Exposure": "{90D5702E-E43B-4366-AAEB-7A7A10B448B4}",
+    "Focus": "{90D57030-E43B-4366-AAEB-7A7A10B448B4}",
+    "Trigger": "{90D57031-E43B-4366-AAEB-7A7A10B448B4}",
+    "Denoise": "{C3C9944A-E6F6-4E25-A0BE-53C066AB65D8}",
+    "GPIO": "{86D89D69-9880-4618-9BF6-DED5E8383449}",
+    "Highlight reduction": "{546541AD-C815-4D82-AFA9-9D59AF9F399E}",
+    "Tone Mapping": "{3D505AC4-1A28-428B-83E5-85AA8EB441C1}",
+}
+ELEMENT_GUIDS = {
+    "Value": "{B57D3000-0AC6-4819-A609-272A33140ACA}",
+    # the main element of switches is the value element
+    "Enable": "{B57D3000-0AC6-4819-A609-272A33140ACA}",
+    "Auto": "{B57D3001-0AC6-4819-A609-272A33140ACA}",
+    "Auto Reference": "{6519038C-1AD8-4E91-9021-66D64090CC85}",
+    "Auto Max Value": "{6519038F-1AD8-4E91-9021-66D64090CC85}",
+    "Auto Min Value": "{65190391-1AD8-4E91-9021-66D64090CC85}",
+    "Enable Region of Interest": "{8CA6642E-D3E5-4ED8-95A1-B13D7131B465}",
+    "GP Out": "{7D006621-761D-4B88-9C5F-8B906857A501}",
+}
+# interface GUID -> type of the value
+INTERFACE_TYPES = {
+    "{99B44940-BFE1-4083-ADA1-BE703F4B8E03}": int,
+    "{99B44940-BFE1-4083-ADA1-BE703F4B8E04}": bool,
+    "{99B44940-BFE1-4083-ADA1-BE703F4B8E08}": float,
+}
+INTERFACE_GUIDS = {type_: guid for guid, type_ in INTERFACE_TYPES.items()}
+
+
+def read_property(
+    ic: Any, grabber: HGRABBER, item: str, element: str, like: PropertyValue
+) -> PropertyValue:
+    """Read a property element with the interface matching the type of `like`."""
+    if isinstance(like, bool):
+        return ic.get_property_switch(grabber, item, element)
+    if isinstance(like, float):
+        return ic.get_property_absolute_value(grabber, item, element)
+    if isinstance(like, int):
+        return ic.get_property_value(grabber, item, element)
+    raise TypeError(f"Unsupported value {like!r} for property {item}/{element}.")
+
+
+def write_property(
+    ic: Any, grabber: HGRABBER, item: str, element: str, value: PropertyValue
+) -> None:
+    """Write a property element with the interface matching the type of `value`."""
+    if isinstance(value, bool):
+        ic.set_property_switch(grabber, item, element, value)
+    elif isinstance(value, float):
+        ic.set_property_absolute_value(grabber, item, element, value)
+    elif isinstance(value, int):
+        ic.set_property_value(grabber, item, element, value)
+    else:
+        raise TypeError(f"Unsupported value {value!r} for property {item}/{element}.")
+
+
+def same_value(current: PropertyValue, requested: PropertyValue) -> bool:
+    if isinstance(requested, float):
+        # absolute values pass through a single precision float in the DLL
+        return math.isclose(current, requested, rel_tol=1e-6, abs_tol=1e-12)
+    return current == requested
+
+
+def _write_order(change: tuple[str, str, PropertyValue]) -> int:
+    # switching automatic modes off has to precede writing the values they control,
+    # switching them on has to follow, otherwise the device overrides the values
+    value = change[2]
+    if isinstance(value, bool):
+        return 2 if value else 0
+    return 1
+
+
+@dataclass(frozen=True)
+class ApplyReport:
+    """
+    Outcome of applying properties with `apply_properties`.
+
+    `skipped` requested values were already set, so that many writes to the DLL were
+    avoided. `elapsed` is the time in seconds for reading, writing and, after an
+    error, rolling back.
+    """
+
+    requested: int
+    written: tuple[tuple[str, str], ...]
+    skipped: int
+    elapsed: float
+    rolled_back: bool = False
+    error: Optional[BaseException] = None
+
+    @property
+    def reads(self) -> int:
+        """Library calls reading the current values, one per requested value."""
+        return self.requested
+
+    @property
+    def writes(self) -> int:
+        """Library calls writing values, not counting a rollback."""
+        return len(self.written)
+
+    @property
+    def calls_avoided(self) -> int:
+        """
+        Net library calls saved compared to writing every requested value.
+
+        These are the skipped writes minus the reads needed to find them, so the
+        number is never positive. Comparing the values pays off where writes take
+        longer than reads, which shows in `elapsed`.
+        """
+        return self.skipped - self.reads
+
+
+def apply_properties(
+    ic: Any, grabber: HGRABBER, settings: PropertySettings
+) -> ApplyReport:
+    """
+    Write only those properties that differ from the current state of the device.
+
+    The current values are read once, automatic modes are switched off before and on
+    after the values are written. If a write fails, the properties written so far are
+    restored to the values read before, and `ApplyError` is raised.
+    """
+    start = time.perf_counter()
+    requested = [
+        (item, element, value)
+        for item, elements in settings.items()
+        for element, value in elements.items()
+    ]
+    changes = []
+    previous = {}
+    for item, element, value in requested:
+        current = read_property(ic, grabber, item, element, value)
+        if not same_value(current, value):
+            changes.append((item, element, value))
+            previous[item, element] = current
+    changes.sort(key=_write_order)
+
+    written: list[tuple[str, str]] = []
+    for item, element, value in changes:
+        try:
+            write_property(ic, grabber, item, element, value)
+        except ICError as e:
+            for restore in reversed(written):
+                try:
+                    write_property(ic, grabber, *restore, previous[restore])
+                except ICError:
+                    # restore as much as possible
+                    pass
+            report = ApplyReport(
+                requested=len(requested),
+                written=tuple(written),
+                skipped=len(requested) - len(changes),
+                elapsed=time.perf_counter() - start,
+                rolled_back=True,
+                error=e,
+            )
+            raise ApplyError(
+                f"Failed to set {item}/{element} to {value!r}: {e}", report
+            ) from e
+        written.append((item, element))
+    return ApplyReport(
+        requested=len(requested),
+        written=tuple(written),
+        skipped=len(requested) - len(changes),
+        elapsed=time.perf_counter() - start,
+    )
+
+
+# type of the value -> ctypes type, getter, setter and range function of the library
+_INTERFACES = {
+    bool: (ctypes.c_int, "IC_GetPropertySwitch", "IC_SetPropertySwitch", None),
+    int: (
+        ctypes.c_long,
+        "IC_GetPropertyValue",
+        "IC_SetPropertyValue",
+        "IC_GetPropertyValueRange",
+    ),
+    float: (
+        ctypes.c_float,
+        "IC_GetPropertyAbsoluteValue",
+        "IC_SetPropertyAbsoluteValue",
+        "IC_GetPropertyAbsoluteValueRange",
+    ),
+}
+
+
+class PropertyHandle:
+    """
+    Fast access to one named property element, e.g. `("Exposure", "Value")`.
+
+    Unlike the string API of `ImageControl`, the names are encoded once, the output
+    parameters are allocated once and the library functions are looked up once, which
+    makes a difference in tight control loops. `type_` selects the interface as for
+    `apply_properties`: `float` for absolute values, `int` for plain values and `bool`
+    for switches. A handle is not thread-safe, since it reuses its buffers.
+    `on_write` is called after every successful write.
+    """
+
+    def __init__(
+        self,
+        ic: Any,
+        grabber: HGRABBER,
+        item: str,
+        element: str,
+        type_: type[PropertyValue] = float,
+        on_write: Optional[Callable[[], None]] = None,
+    ) -> None:
+        if type_ not in _INTERFACES:
+            raise TypeError(
+                f"Unsupported type {type_!r} for property {item}/{element}."
+            )
+        self.item = item
+        self.element = element
+        self.type = type_
+        # the shared `ImageControl` of `tisgrabber.cam` is created lazily, the handle
+        # keeps the instance itself to not go through the proxy on every access
+        self._ic = getattr(ic, "instance", ic)
+        self._grabber = grabber
+        self._on_write = on_write
+        self._item = item.encode("utf-8")
+        self._element = element.encode("utf-8")
+        c_type = _INTERFACES[type_][0]
+        self._value = c_type()
+        self._min = c_type()
+        self._max = c_type()
+        self._value_ref = ctypes.byref(self._value)
+        self._min_ref = ctypes.byref(self._min)
+        self._max_ref = ctypes.byref(self._max)
+        self._bind()
+
+    def _bind(self) -> None:
+        # bound to the library currently used by `ImageControl`, which changes when
+        # instrumentation is enabled or disabled
+        self._library = library = self._ic._ic
+        _, get, set_, range_ = _INTERFACES[self.type]
+        self._get = getattr(library, get)
+        self._set = getattr(library, set_)
+        self._range = None if range_ is None else getattr(library, range_)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}({self.item!r}, {self.element!r}, "
+            f"{self.type.__name__})"
+        )
+
+    @property
+    def value(self) -> PropertyValue:
+        if self._ic._ic is not self._library:
+            self._bind()
+        err = self._get(self._grabber, self._item, self._element, self._value_ref)
+        if err != IC_SUCCESS:
+            check_property_error_code(err)
+        if self.type is bool:
+            return bool(self._value.value)
+        return self._value.value
+
+    @value.setter
+    def value(self, value: PropertyValue) -> None:
+        if self._ic._ic is not self._library:
+            self._bind()
+        if self.type is bool:
+            value = int(value)
+        err = self._set(self._grabber, self._item, self._element, value)
+        if err != IC_SUCCESS:
+            check_property_error_code(err)
+            if err == IC_ERROR:
+                raise ICError(f"Failed to set property {self.item}/{self.element}.")
+        if self._on_write is not None:
+            self._on_write()
+
+    @property
+    def range(self) -> tuple[PropertyValue, PropertyValue]:
+        if self._ic._ic is not self._library:
+            self._bind()
+        if self._range is None:
+            raise TypeError(f"Property {self.item}/{self.element} has no range.")
+        err = self._range(
+            self._grabber, self._item, self._element, self._min_ref, self._max_ref
+        )
+        if err != IC_SUCCESS:
+            check_property_error_code(err)
+        return (self._min.value, self._max.value)
+
+
+def _parse_value(text: str, type_: Optional[type]) -> PropertyValue:
+    if type_ is None:
+        # unknown interface
+        type_ = float if any(c in text for c in ".eE") else int
+    if type_ is bool:
+        return bool(int(text))
+    return type_(text)
+
+
+def _format_value(value: PropertyValue) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+@dataclass(frozen=True)
+class DeviceState:
+    """
+    Snapshot of the video format, frame rate and named properties of a device.
+
+    Create one with `Camera.snapshot` and re-apply it with `Camera.restore`, or save
+    and load it as a device state file. `video_format` is None if it is not known,
+    which is the case for snapshots of cameras whose format was not set explicitly.
+    Elements that occur more than once in an item of a device state file are only
+    read the first time, just like the DLL resolves them by name.
+    """
+
+    properties: Mapping[str, Mapping[str, PropertyValue]]
+    video_format: Optional[str] = None
+    frame_rate: Optional[float] = None
+    name: Optional[str] = None
+    unique_name: Optional[str] = None
+    # (item, element) -> (item GUID, element GUID) of a parsed file
+    guids: Mapping[tuple[str, str], tuple[Optional[str], Optional[str]]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+    def __len__(self) -> int:
+        return sum(len(elements) for elements in self.properties.values())
+
+    def diff(self, other: "DeviceState") -> dict[str, dict[str, PropertyValue]]:
+        """Return the properties of this state that are missing or differ in `other`."""
+        changes: dict[str, dict[str, PropertyValue]] = {}
+        for item, elements in self.properties.items():
+            others = other.properties.get(item, {})
+            for element, value in elements.items():
+                if element not in others or not same_value(others[element], value):
+                    changes.setdefault(item, {})[element] = value
+        return changes
+
+    def to_xml(self) -> str:
+        """Serialize the state in the schema of the device state files."""
+        root = ET.Element("device_state", libver="3.4", filemajor="1", fileminor="0")
+        device = ET.SubElement(root, "device")
+        if self.name is not None:
+            device.set("name", self.name)
+            device.set("base_name", self.name)
+        if self.unique_name is not None:
+            device.set("unique_name", self.unique_name)
+        if self.video_format is not None:
+            ET.SubElement(device, "videoformat").text = self.video_format
+        if self.frame_rate is not None:
+            ET.SubElement(device, "fps").text = repr(float(self.frame_rate))
+        items = ET.SubElement(device, "vcdpropertyitems")
+        for item, elements in self.properties.items():
+            item_node = ET.SubElement(items, "item")
+            for element, value in elements.items():
+                item_guid, element_guid = self.guids.get(
+                    (item, element), (ITEM_GUIDS.get(item), ELEMENT_GUIDS.get(element))
+                )
+                if item_guid is not None:
+                    item_node.set("guid", item_guid)
+                item_node.set("name", item)
+                element_node = ET.SubElement(item_node, "element")
+                if element_guid is not None:
+                    element_node.set("guid", element_guid)
+                element_node.set("name", element)
+                itf = ET.SubElement(element_node, "itf")
+                itf.set("guid", INTERFACE_GUIDS[type(value)])
+                itf.set("value", _format_value(value))
+        ET.indent(root, space="    ")
+        return ET.tostring(root, encoding="unicode") + "\n"
+
+    @classmethod
+    def from_xml(cls, text: str) -> Self:
+        """Parse a device state file."""
+        device = ET.fromstring(text).find("device")
+        if device is None:
+            raise ValueError("Not a device state: no device element found.")
+        properties: dict[str, dict[str, PropertyValue]] = {}
+        guids = {}
+        for item_node in device.iterfind("vcdpropertyitems/item"):
+            item = item_node.get("name")
+            elements = properties.setdefault(item, {})
+            for element_node in item_node.iterfind("element"):
+                element = element_node.get("name")
+                itf = element_node.find("itf")
+                if element in elements or itf is None or itf.get("value") is None:
+                    continue
+                type_ = INTERFACE_TYPES.get(itf.get("guid", "").upper())
+                elements[element] = _parse_value(itf.get("value"), type_)
+                guids[item, element] = (item_node.get("guid"), element_node.get("guid"))
+        fps = device.findtext("fps")
+        return cls(
+            properties=properties,
+            video_format=device.findtext("videoformat"),
+            frame_rate=float(fps) if fps else None,
+            name=device.get("name"),
+            unique_name=device.get("unique_name"),
+            guids=guids,
+        )
+
+    def save(self, path: Union[str, Path]) -> None:
+        Path(path).write_text(self.to_xml(), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Self:
+        return cls.from_xml(Path(path).read_text(encoding="utf-8"))
+
+
+def capture_state(
+    ic: Any,
+    grabber: HGRABBER,
+    video_format: Optional[str] = None,
+    elements: Mapping[str, tuple[tuple[str, PropertyValue], ...]] = STATE_ELEMENTS,
+) -> DeviceState:
+    """
+    Read the available properties of `elements`, e.g. of `PropertyTree.state_elements`.
+    """
+    properties: dict[str, dict[str, PropertyValue]] = {}
+    for item, item_elements in elements.items():
+        if not ic.is_property_available(grabber, item):
+            continue
+        values = {}
+        for element, like in item_elements:
+            try:
+                values[element] = read_property(ic, grabber, item, element, like)
+            except (
+                PropertyItemNotAvailableError,
+                PropertyElementNotAvailableError,
+                PropertyElementWrongInterfaceError,
+            ):
+                continue
+        if values:
+            properties[item] = values
+    return DeviceState(
+        properties=properties,
+        video_format=video_format,
+        frame_rate=ic.get_frame_rate(grabber),
+        name=ic.get_device_name(grabber),
+        unique_name=ic.get_unique_name(grabber),
+    )
+
+
+# environment variable overriding the directory of `discover_properties`'s cache
+CACHE_VARIABLE = "TISGRABBER_CACHE"
+# version of the cache files, files of other versions are ignored
+CACHE_VERSION = 2
+
+
+@dataclass(frozen=True)
+class PropertyElement:
+    """The interfaces of a property element, e.g. "Range" or "AbsoluteValues"."""
+
+    interfaces: tuple[str, ...]
+    # of the "Range" and "AbsoluteValues" interfaces
+    range: Optional[tuple[int, int]] = None
+    absolute_range: Optional[tuple[float, float]] = None
+    map_strings: tuple[str, ...] = ()
+
+    @property
+    def type(self) -> Optional[type]:
+        """Type of the values, see `read_property`, None for buttons and map strings."""
+        if "AbsoluteValues" in self.interfaces:
+            return float
+        if "Switch" in self.interfaces:
+            return bool
+        if "Range" in self.interfaces:
+            return int
+        return None
+
+
+@dataclass(frozen=True)
+class PropertyTree:
+    """The property items and elements of a device model, see `discover_properties`."""
+
+    model: str
+    firmware: str
+    items: Mapping[str, Mapping[str, PropertyElement]]
+
+    def __contains__(self, key: Union[str, tuple[str, str]]) -> bool:
+        """Whether an item, or an `(item, element)`, is available."""
+        if isinstance(key, tuple):
+            item, element = key
+            return element in self.items.get(item, {})
+        return key in self.items
+
+    def state_elements(self) -> dict[str, tuple[tuple[str, PropertyValue], ...]]:
+        """The elements with a value, in the form of `STATE_ELEMENTS`."""
+        like = {bool: False, int: 0, float: 0.0}
+        elements = {}
+        for item, item_elements in self.items.items():
+            values = tuple(
+                (name, like[element.type])
+                for name, element in item_elements.items()
+                if element.type is not None
+            )
+            if values:
+                elements[item] = values
+        return elements
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": CACHE_VERSION,
+            "model": self.model,
+            "firmware": self.firmware,
+            "items": {
+                item: {
+                    name: {
+                        "interfaces": list(element.interfaces),
+                        "range": element.range,
+                        "absolute_range": element.absolute_range,
+                        "map_strings": list(element.map_strings),
+                    }
+                    for name, element in elements.items()
+                }
+                for item, elements in self.items.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> Self:
+        if data.get("version") != CACHE_VERSION:
+            raise ValueError(
+                f"Unsupported property tree version {data.get('version')}."
+            )
+
+        def pair(value: Optional[list]) -> Optional[tuple]:
+            return None if value is None else tuple(value)
+
+        return cls(
+            model=data["model"],
+            firmware=data["firmware"],
+            items={
+                item: {
+                    name: PropertyElement(
+                        interfaces=tuple(element["interfaces"]),
+                        range=pair(element["range"]),
+                        absolute_range=pair(element["absolute_range"]),
+                        map_strings=tuple(element["map_strings"]),
+                    )
+                    for name, element in elements.items()
+                }
+                for item, elements in data["items"].items()
+            },
+        )
+
+
+def default_cache_dir() -> Path:
+    directory = os.environ.get(CACHE_VARIABLE)
+    if directory:
+        return Path(directory)
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+    return (Path(base) if base else Path.home() / ".cache") / "tisgrabber"
+
+
+def _cache_path(directory: Path, model: str, firmware: str) -> Path:
+    name = re.sub(r"[^\w.-]+", "_", f"{model} {firmware}".strip())
+    return directory / f"properties-{name}.json"
+
+
+def _enumerate_properties(ic: Any, grabber: HGRABBER) -> dict:
+    def query(function, *args):
+        try:
+            return function(grabber, *args)
+        except ICError:
+            return None
+
+    items = {}
+    for item in ic.enum_properties(grabber):
+        elements = {}
+        for name in ic.enum_property_elements(grabber, item):
+            interfaces = tuple(ic.enum_property_element_interfaces(grabber, item, name))
+            elements[name] = PropertyElement(
+                interfaces=interfaces,
+                range=(
+                    query(ic.get_property_value_range, item, name)
+                    if "Range" in interfaces
+                    else None
+                ),
+                absolute_range=(
+                    query(ic.get_property_absolute_value_range, item, name)
+                    if "AbsoluteValues" in interfaces
+                    else None
+                ),
+                map_strings=tuple(
+                    (query(ic.get_property_map_strings, item, name) or ())
+                    if "Mapstrings" in interfaces
+                    else ()
+                ),
+            )
+        items[item] = elements
+    return items
+
+
+def discover_properties(
+    ic: Any,
+    grabber: HGRABBER,
+    firmware: str = "",
+    cache: Union[str, Path, bool] = True,
+) -> PropertyTree:
+    """
+    Enumerate the property items and elements of a device with their interfaces,
+    ranges and map strings.
+
+    The tree is cached as JSON per device model, in the directory `cache` or, if it is
+    True, in `default_cache_dir()`, so that the next device of the same model is not
+    enumerated again. The library does not report the firmware of a device, pass it
+    as `firmware` to keep trees of different firmware apart.
+    """
+    model = ic.get_device_name(grabber)
+    path = None
+    if cache is not False:
+        directory = default_cache_dir() if cache is True else Path(cache)
+        path = _cache_path(directory, model, firmware)
+        try:
+            tree = PropertyTree.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, KeyError, TypeError):
+            # missing, outdated or corrupt
+            pass
+        else:
+            if tree.model == model and tree.firmware == firmware:
+                return tree
+
+    tree = PropertyTree(model, firmware, _enumerate_properties(ic, grabber))
+    if path is not None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # write atomically, other processes may read the file at the same time
+            temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            temporary.write_text(json.dumps(tree.to_dict(), indent=2), encoding="utf-8")
+            os.replace(temporary, path)
+        except OSError:
+            # the tree is still returned, it is only enumerated again next time
+            pass
+    return tree
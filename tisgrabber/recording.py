@@ -0,0 +1,255 @@
+"""
+Memory-mapped raw recording of frames.
+
+A recording consists of a fixed-size header, a per-frame index and the frame data,
+all preallocated in a single file that is memory-mapped while recording. Appending a
+frame is a memory copy into the page cache without any per-frame system call.
+
+Layout::
+
+    [header, HEADER_SIZE bytes][index, capacity * INDEX_DTYPE][frames, count * stride]
+"""
+
+import mmap
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional, Self, Union
+
+import numpy as np
+
+from .formats import ImageFormat
+from .wrapper import FilePath
+
+MAGIC = b"TISRAW"
+VERSION = 1
+HEADER_SIZE = 4096
+# frames start at page and cache line boundaries
+DATA_ALIGNMENT = 4096
+FRAME_ALIGNMENT = 64
+
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("width", "<u4"),
+        ("height", "<u4"),
+        ("bits_per_pixel", "<u4"),
+        ("color_format", "<i4"),
+        ("channels", "<u4"),
+        ("dtype", "S8"),
+        ("frame_nbytes", "<u8"),
+        ("frame_stride", "<u8"),
+        ("capacity", "<u8"),
+        ("count", "<u8"),
+        ("index_offset", "<u8"),
+        ("data_offset", "<u8"),
+    ]
+)
+
+INDEX_DTYPE = np.dtype(
+    [
+        ("offset", "<u8"),
+        ("frame_number", "<u4"),
+        ("timestamp_ns", "<i8"),
+    ]
+)
+
+
+def _align(value: int, alignment: int) -> int:
+    return -(-value // alignment) * alignment
+
+
+class RawRecorder:
+    """
+    Append frames to a preallocated, memory-mapped raw recording.
+
+    `write` has the signature of a frame handler, so that a recorder can be installed
+    directly with `Camera.set_frame_handler(recorder.write)`. Frames beyond
+    `capacity` are dropped and counted. Closing the recorder trims the file to the
+    frames actually written; it may happen while `write` is called on the frame
+    callback thread, later frames are dropped.
+
+    :param on_close: Called first when closing, e.g. to detach the frame handler.
+    """
+
+    def __init__(
+        self,
+        path: FilePath,
+        image_format: ImageFormat,
+        capacity: int,
+        on_close: Optional[Callable[[], None]] = None,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("Recording capacity must be at least 1.")
+        self.path = Path(path)
+        self.image_format = image_format
+        self.capacity = capacity
+        self.dropped = 0
+        self._on_close = on_close
+        # serializes `write` and `close`
+        self._lock = threading.Lock()
+
+        frame_nbytes = int(np.prod(image_format.shape)) * image_format.dtype.itemsize
+        self._stride = _align(frame_nbytes, FRAME_ALIGNMENT)
+        index_offset = HEADER_SIZE
+        self._data_offset = _align(
+            index_offset + capacity * INDEX_DTYPE.itemsize, DATA_ALIGNMENT
+        )
+        self._file = open(self.path, "w+b")
+        self._file.truncate(self._data_offset + capacity * self._stride)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        buffer = np.frombuffer(self._mmap, dtype=np.uint8)
+        self._header = buffer[: HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+        self._header[0] = (
+            MAGIC,
+            VERSION,
+            image_format.width,
+            image_format.height,
+            image_format.bits_per_pixel,
+            image_format.color_format,
+            image_format.shape[2],
+            image_format.dtype.str.encode(),
+            frame_nbytes,
+            self._stride,
+            capacity,
+            0,
+            index_offset,
+            self._data_offset,
+        )
+        self._index = buffer[
+            index_offset : index_offset + capacity * INDEX_DTYPE.itemsize
+        ].view(INDEX_DTYPE)
+        self._frames = _frame_view(buffer, self._header[0], capacity)
+        self._count = 0
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def closed(self) -> bool:
+        return self._mmap is None
+
+    def write(
+        self, image: np.ndarray, frame_number: int, timestamp_ns: Optional[int] = None
+    ) -> bool:
+        """Append a frame. Return False if the recording is full or closed."""
+        if timestamp_ns is None:
+            timestamp_ns = time.perf_counter_ns()
+        with self._lock:
+            i = self._count
+            if i >= self.capacity or self._mmap is None:
+                self.dropped += 1
+                return False
+            self._frames[i] = image
+            self._index[i] = (
+                self._data_offset + i * self._stride,
+                frame_number,
+                timestamp_ns,
+            )
+            self._count = i + 1
+            self._header["count"] = self._count
+            return True
+
+    def flush(self) -> None:
+        """Write the mapped pages back to disk."""
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.flush()
+
+    def close(self) -> None:
+        if self._on_close is not None:
+            on_close, self._on_close = self._on_close, None
+            on_close()
+        with self._lock:
+            if self._mmap is None:
+                return
+            self._mmap.flush()
+            # all views have to be gone before the map can be closed
+            self._frames = self._index = self._header = None
+            self._mmap.close()
+            self._mmap = None
+            self._file.truncate(self._data_offset + self._count * self._stride)
+            self._file.close()
+
+
+def _frame_view(buffer: np.ndarray, header: np.void, count: int) -> np.ndarray:
+    dtype = np.dtype(header["dtype"].decode())
+    shape = (int(header["height"]), int(header["width"]), int(header["channels"]))
+    strides = (
+        int(header["frame_stride"]),
+        shape[1] * shape[2] * dtype.itemsize,
+        shape[2] * dtype.itemsize,
+        dtype.itemsize,
+    )
+    return np.ndarray(
+        (count,) + shape,
+        dtype=dtype,
+        buffer=buffer,
+        offset=int(header["data_offset"]),
+        strides=strides,
+    )
+
+
+class RawReader:
+    """
+    Random access to a raw recording.
+
+    Indexing returns zero-copy views into the memory-mapped file, for single frames as
+    well as for slices. `index` holds offset, frame number and timestamp per frame.
+    """
+
+    def __init__(self, path: FilePath) -> None:
+        self.path = Path(path)
+        self._mmap = np.memmap(self.path, dtype=np.uint8, mode="r")
+        header = self._mmap[: HEADER_DTYPE.itemsize].view(HEADER_DTYPE)[0]
+        if header["magic"] != MAGIC:
+            raise ValueError(f"{self.path} is not a raw recording.")
+        if header["version"] != VERSION:
+            raise ValueError(f"Unsupported raw recording version {header['version']}.")
+        self.header = header
+        count = int(header["count"])
+        index_offset = int(header["index_offset"])
+        self.index = self._mmap[
+            index_offset : index_offset + count * INDEX_DTYPE.itemsize
+        ].view(INDEX_DTYPE)
+        self.frames = _frame_view(self._mmap, header, count)
+        self.image_format = ImageFormat(
+            int(header["width"]),
+            int(header["height"]),
+            int(header["bits_per_pixel"]),
+            int(header["color_format"]),
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __getitem__(self, key: Union[int, slice]) -> np.ndarray:
+        return self.frames[key]
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    @property
+    def frame_numbers(self) -> np.ndarray:
+        return self.index["frame_number"]
+
+    @property
+    def timestamps_ns(self) -> np.ndarray:
+        return self.index["timestamp_ns"]
+
+    def close(self) -> None:
+        self.frames = self.index = None
+        self._mmap = None
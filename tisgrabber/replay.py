@@ -0,0 +1,392 @@
+"""
+Replay of recorded frames through the `Camera` API, without a camera or the DLL.
+
+A `ReplayCamera` plays back a directory of images, an `.npy` stack or a raw
+recording. Frames are delivered from a background thread at a fixed frame rate, or
+as fast as possible, and reach the frame ready callback the same way as frames of the
+DLL: with a pointer to a single image buffer that is overwritten by the next frame.
+"""
+
+import ctypes
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, Self, Union
+
+import numpy as np
+
+from .acquisition import Acquisition
+from .enums import SinkFormat
+from .exceptions import ICError, NotAvailableError, NotInLivemodeError
+from .formats import ImageFormat
+from .frames import FrameMetadataLog
+from .recording import RawReader
+from .wrapper import FRAMEREADYCALLBACK, FilePath
+from .writer import FORMATS
+
+# (dtype, channels) -> sink format of the replayed images
+_SINK_FORMATS = {
+    (np.dtype(np.uint8), 1): SinkFormat.Y800,
+    (np.dtype(np.uint8), 2): SinkFormat.UYVY,
+    (np.dtype(np.uint8), 3): SinkFormat.RGB24,
+    (np.dtype(np.uint8), 4): SinkFormat.RGB32,
+    (np.dtype("<u2"), 1): SinkFormat.Y16,
+}
+
+ReplaySource = Union[FilePath, np.ndarray, RawReader]
+
+
+def _from_pil_array(image: np.ndarray) -> np.ndarray:
+    # Pillow delivers RGB(A), sinks deliver BGR(A)
+    if image.ndim == 2:
+        return image[..., np.newaxis]
+    if image.shape[2] == 3:
+        return image[..., ::-1]
+    if image.shape[2] == 4:
+        return image[..., [2, 1, 0, 3]]
+    return image
+
+
+def read_image(path: FilePath) -> np.ndarray:
+    """Read an image file as an `(h, w, c)` array in the channel order of a sink."""
+    path = Path(path)
+    if path.suffix.lower() == ".npy":
+        return np.load(path, allow_pickle=False)
+    try:
+        from PIL import Image
+    except ImportError as e:
+        raise ImportError(
+            f"Reading {path.suffix} images requires Pillow. Install it with "
+            "`pip install py-tisgrabber[imaging]`."
+        ) from e
+    with Image.open(path) as image:
+        if image.mode in ("I;16", "I;16L", "I;16B"):
+            array = np.asarray(image, dtype="<u2")
+        elif image.mode in ("L", "RGB", "RGBA"):
+            array = np.asarray(image)
+        else:
+            array = np.asarray(image.convert("RGB"))
+    return _from_pil_array(array)
+
+
+def load_frames(source: ReplaySource) -> tuple[np.ndarray, ImageFormat]:
+    """
+    Load the frames of a directory of images, an `.npy` stack or a raw recording.
+
+    Return the frames as an `(n, h, w, c)` array and their image format. `.npy` stacks
+    and raw recordings are memory-mapped, image files are decoded up front so that
+    decoding does not limit the replay rate.
+    """
+    if isinstance(source, RawReader):
+        return source.frames, source.image_format
+    if isinstance(source, np.ndarray):
+        frames = source
+    else:
+        path = Path(source)
+        if path.is_dir():
+            files = sorted(p for p in path.iterdir() if p.suffix.lower() in FORMATS)
+            if not files:
+                raise ValueError(f"No images found in {path}.")
+            images = [read_image(file) for file in files]
+            if len({(image.shape, image.dtype) for image in images}) > 1:
+                raise ValueError(f"The images in {path} differ in size or type.")
+            frames = np.stack(images)
+        elif path.suffix.lower() == ".npy":
+            frames = np.load(path, mmap_mode="r", allow_pickle=False)
+        else:
+            reader = RawReader(path)
+            return reader.frames, reader.image_format
+    if frames.ndim == 3:
+        frames = frames[..., np.newaxis]
+    if frames.ndim != 4:
+        raise ValueError(f"Expected frames of shape (n, h, w, c), got {frames.shape}.")
+    n, height, width, channels = frames.shape
+    try:
+        sink_format = _SINK_FORMATS[(frames.dtype, channels)]
+    except KeyError:
+        raise ValueError(
+            f"Cannot replay {channels}-channel frames of type {frames.dtype}."
+        )
+    bits_per_pixel = frames.dtype.itemsize * channels * 8
+    return frames, ImageFormat(width, height, bits_per_pixel, sink_format.value)
+
+
+class ReplaySetting:
+    """In-memory stand-in for the camera and video settings of a `Camera`."""
+
+    def __init__(
+        self,
+        value: Union[int, float] = 0,
+        setting_range: tuple[int, int] = (0, 100),
+        auto_available: bool = True,
+    ) -> None:
+        self.is_available = True
+        self.auto_available = auto_available
+        self.setting_range = setting_range
+        self._value = value
+        self._auto = False
+
+    @property
+    def value(self) -> Union[int, float]:
+        return self._value
+
+    @value.setter
+    def value(self, value: Union[int, float]) -> None:
+        if self.auto_available:
+            self.auto = False
+        self._value = value
+
+    # video settings and the exposure register are accessed as `setting`
+    setting = value
+
+    @property
+    def auto(self) -> bool:
+        if self.auto_available:
+            return self._auto
+        else:
+            raise RuntimeError("Auto setting for property is not available.")
+
+    @auto.setter
+    def auto(self, enable: bool) -> None:
+        if self.auto_available:
+            self._auto = enable
+        else:
+            raise RuntimeError("Auto setting for property is not available.")
+
+
+class ReplayCamera(Acquisition):
+    """
+    A camera replaying recorded frames, for testing processing pipelines offline.
+
+    It has the same interface as `Camera`. In live mode, a background thread copies
+    the next frame into the image buffer and calls the frame ready callback at
+    `frame_rate` frames per second, or as fast as the callback returns if the frame
+    rate is None. If the callback is too slow for the frame rate, frames are skipped
+    like with a real camera rather than delivered late. At the end of the frames,
+    playback starts over if `loop` is True and stops otherwise.
+
+    :param source: Directory of images, `.npy` file, raw recording or an array of
+        shape `(n, h, w, c)`. Color images are expected in BGR(A) order, like the
+        images of a sink; image files are converted from RGB(A).
+    """
+
+    def __init__(
+        self,
+        source: ReplaySource,
+        frame_rate: Optional[float] = 30.0,
+        loop: bool = True,
+    ) -> None:
+        self.frames, self._image_format = load_frames(source)
+        if not len(self.frames):
+            raise ValueError("There are no frames to replay.")
+        self.frame_rate = frame_rate
+        self.loop = loop
+        self.frame_log = FrameMetadataLog()
+        # the single image buffer that is overwritten by every new frame
+        self._image = np.zeros(self._image_format.shape, self._image_format.dtype)
+        self._image_ptr = ctypes.cast(
+            self._image.ctypes.data, ctypes.POINTER(ctypes.c_ubyte)
+        )
+        self._has_image = False
+        self._callback: Optional[FRAMEREADYCALLBACK] = None
+        self._callback_data: Any = None
+        self._frame_handler: Optional[Callable[[np.ndarray, int], None]] = None
+        # the callback of `set_frame_handler`
+        self._handler_callback = self._on_frame_ready
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._trigger_enabled = False
+        self._triggers = threading.Semaphore(0)
+        self._position = 0
+        self._frame_number = 0
+        self.skipped = 0
+
+        self.pan = ReplaySetting()
+        self.tilt = ReplaySetting()
+        self.roll = ReplaySetting()
+        self.zoom = ReplaySetting()
+        self.exposure = ReplaySetting()
+        self.iris = ReplaySetting()
+        self.focus = ReplaySetting()
+        self.brightness = ReplaySetting()
+        self.contrast = ReplaySetting()
+        self.hue = ReplaySetting()
+        self.saturation = ReplaySetting()
+        self.sharpness = ReplaySetting()
+        self.gamma = ReplaySetting()
+        self.color_enable = ReplaySetting()
+        self.white_balance = ReplaySetting()
+        self.black_light_compensation = ReplaySetting()
+        self.gain = ReplaySetting()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release_grabber()
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def release_grabber(self) -> None:
+        self.stop_live()
+
+    @property
+    def is_live(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def rewind(self, position: int = 0) -> None:
+        """Continue playback at frame `position`."""
+        self._position = position
+
+    def start_live(self) -> None:
+        if self.is_live:
+            return
+        self.frame_log.restart()
+        self._frame_number = 0
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="tisgrabber-replay", daemon=True
+        )
+        self._thread.start()
+
+    def stop_live(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        if thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self) -> None:
+        next_time = time.perf_counter()
+        while not self._stop.is_set():
+            if self._trigger_enabled:
+                # wake up regularly to notice when live mode is stopped
+                if not self._triggers.acquire(timeout=0.05):
+                    continue
+            elif self.frame_rate:
+                period = 1.0 / self.frame_rate
+                delay = next_time - time.perf_counter()
+                if delay > 0 and self._stop.wait(delay):
+                    break
+                next_time += period
+                behind = time.perf_counter() - next_time
+                if behind > 0:
+                    missed = int(behind // period) + 1
+                    self.skipped += missed
+                    self._position += missed
+                    next_time += missed * period
+            if not self._deliver():
+                break
+
+    def _deliver(self) -> bool:
+        index = self._position
+        if index >= len(self.frames):
+            if not self.loop:
+                return False
+            index %= len(self.frames)
+        np.copyto(self._image, self.frames[index])
+        self._position = index + 1
+        with self._condition:
+            frame_number = self._frame_number
+            self._frame_number += 1
+            self._has_image = True
+            self._condition.notify_all()
+        callback = self._callback
+        if callback is not None:
+            callback(None, self._image_ptr, frame_number, self._callback_data)
+        return True
+
+    def snap_image(self, timeout=1000) -> None:
+        """Wait up to `timeout` milliseconds for the next frame."""
+        if not self.is_live:
+            raise NotInLivemodeError("The camera is not in live mode.")
+        with self._condition:
+            frame_number = self._frame_number
+            if not self._condition.wait_for(
+                lambda: self._frame_number != frame_number, timeout / 1000
+            ):
+                raise ICError("An error occurred while snapping the image.")
+
+    def get_image_data(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Return a view of the current image, which is overwritten by the next frame.
+
+        :param out: If given, the image is copied into this array, which is returned.
+        """
+        if not self._has_image:
+            raise ICError("No image data available. Snap an image first.")
+        if out is None:
+            return self._image
+        np.copyto(out, self._image)
+        return out
+
+    def get_image_description(self) -> tuple[int, int, int, int]:
+        image_format = self._image_format
+        return (
+            image_format.width,
+            image_format.height,
+            image_format.bits_per_pixel,
+            image_format.color_format,
+        )
+
+    def get_image_format(self) -> ImageFormat:
+        return self._image_format
+
+    def set_continuous_mode(self, enable: bool) -> None:
+        pass
+
+    def set_window_handle(self, handle: Any) -> None:
+        pass
+
+    def set_frame_ready_callback(self, callback: FRAMEREADYCALLBACK, data: Any):
+        """
+        Set a callback function that is called when a new frame is ready.
+
+        It is called as `callback(None, ptr, frame_number, data)` from the replay
+        thread, with `ptr` pointing to the image buffer.
+        """
+        self._callback_data = data
+        self._callback = callback
+
+    def set_frame_handler(
+        self, handler: Optional[Callable[[np.ndarray, int], None]]
+    ) -> None:
+        """
+        Call `handler(image, frame_number)` on the replay thread for every new frame.
+
+        `image` is a view of the image buffer that is only valid during the call.
+        The metadata of every frame is recorded in `frame_log`. None detaches the
+        handler.
+        """
+        self._frame_handler = handler
+        if self._callback is not self._handler_callback:
+            self.set_frame_ready_callback(self._handler_callback, None)
+
+    def _on_frame_ready(self, grabber, ptr, frame_number, data) -> None:
+        self.frame_log.record(frame_number, time.perf_counter_ns(), self._image_format)
+        handler = self._frame_handler
+        if handler is not None:
+            handler(self._image, frame_number)
+
+    def enable_trigger(self, enable: bool) -> None:
+        self._trigger_enabled = enable
+        # forget triggers that have not been handled
+        while self._triggers.acquire(blocking=False):
+            pass
+
+    def software_trigger(self) -> None:
+        self._triggers.release()
+
+    def _not_available(self, *args, **kwargs):
+        raise NotAvailableError("Not supported when replaying frames.")
+
+    set_video_format = _not_available
+    set_roi = _not_available
+    ring_buffer = _not_available
+    set_frame_ready_callback_ex = _not_available
+    save_device_state_to_file = _not_available
+    load_device_state_from_file = _not_available
+    show_property_dialog = _not_available
@@ -0,0 +1,1580 @@
+"""
+Pure-Python simulation of the tisgrabber library.
+
+`SimulatedLibrary` implements the functions declared by `declare_functions` on top of
+simulated devices, so that the wrapper can be used, tested and benchmarked without a
+camera or Windows, e.g. with `ImageControl("simulated")` or by setting the environment
+variable `TISGRABBER_BACKEND=simulated`.
+
+Devices have camera, video and named (item/element) properties with ranges and auto
+flags, video formats, a frame rate and software trigger. In live mode, a thread per
+grabber renders a synthetic moving gradient into the ring buffer at the frame rate
+and calls the frame ready callbacks, like the DLL does. Every library call can be
+delayed by a configurable latency to model the cost of the driver.
+"""
+
+import copy
+import ctypes
+import functools
+import re
+import threading
+import time
+import traceback
+import weakref
+import xml.etree.ElementTree as ET
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, MutableMapping, Optional, Sequence
+
+import numpy as np
+
+from .enums import CameraProperty, ImageFileType, SinkFormat, VideoProperty
+from .exceptions import (
+    IC_ERROR,
+    IC_INDEX_OUT_OF_RANGE,
+    IC_NO_DEVICE,
+    IC_NO_HANDLE,
+    IC_NOT_AVAILABLE,
+    IC_NOT_IN_LIVEMODE,
+    IC_PROPERTY_ELEMENT_NOT_AVAILABLE,
+    IC_PROPERTY_ELEMENT_WRONG_INTERFACE,
+    IC_PROPERTY_ITEM_NOT_AVAILABLE,
+    IC_SUCCESS,
+)
+from .structs import FILTERPARAMETER, HCODEC, HFRAMEFILTER, HGRABBER, HMEMBUFFER
+from .tisgrabber import (
+    DEVICELOSTCALLBACK,
+    ENUMCB,
+    ENUMCODECCB,
+    FRAMEREADYCALLBACK,
+    FRAMEREADYCALLBACKEX,
+)
+
+VIDEO_FORMAT = re.compile(r"(\w+) \((\d+)x(\d+)\)")
+
+# pixel format of a video format name -> default sink format
+_SINK_FORMATS = {
+    "Y800": SinkFormat.Y800,
+    "RGB24": SinkFormat.RGB24,
+    "RGB32": SinkFormat.RGB32,
+    "UYVY": SinkFormat.UYVY,
+    "Y16": SinkFormat.Y16,
+}
+
+# sink format -> (dtype, channels, bits per pixel)
+_LAYOUTS = {
+    SinkFormat.Y800: (np.uint8, 1, 8),
+    SinkFormat.RGB24: (np.uint8, 3, 24),
+    SinkFormat.RGB32: (np.uint8, 4, 32),
+    SinkFormat.UYVY: (np.uint8, 2, 16),
+    SinkFormat.Y16: (np.dtype("<u2"), 1, 16),
+}
+
+CAMERA_ITEMS = {
+    CameraProperty.PAN: "Pan",
+    CameraProperty.TILT: "Tilt",
+    CameraProperty.ROLL: "Roll",
+    CameraProperty.ZOOM: "Zoom",
+    CameraProperty.EXPOSURE: "Exposure",
+    CameraProperty.IRIS: "Iris",
+    CameraProperty.FOCUS: "Focus",
+}
+
+VIDEO_ITEMS = {
+    VideoProperty.BRIGHTNESS: "Brightness",
+    VideoProperty.CONTRAST: "Contrast",
+    VideoProperty.HUE: "Hue",
+    VideoProperty.SATURATION: "Saturation",
+    VideoProperty.SHARPNESS: "Sharpness",
+    VideoProperty.GAMMA: "Gamma",
+    VideoProperty.COLORENABLE: "ColorEnable",
+    VideoProperty.WHITEBALANCE: "WhiteBalance",
+    VideoProperty.BLACKLIGHTCOMPENSATION: "BacklightCompensation",
+    VideoProperty.GAIN: "Gain",
+}
+
+FRAME_FILTERS = {
+    "ROI": {"Top": 0, "Left": 0, "Height": 0, "Width": 0},
+    "Rotate Flip": {"Rotation Angle": 0, "Flip H": False, "Flip V": False},
+}
+
+CODECS = ("MJPEG Compressor", "Y800 Uncompressed")
+
+# (item, element) -> strings of a map strings element, its value is the index
+MAP_STRINGS = {("Trigger", "Polarity"): ("Falling Edge", "Rising Edge")}
+
+# kind of a named property element -> its interfaces, see `IC_enumPropertyElements`
+_INTERFACES = {
+    "value": ("Range",),
+    "auto": ("Switch",),
+    "switch": ("Switch",),
+    "button": ("Button",),
+    "mapstrings": ("Mapstrings",),
+}
+
+
+@dataclass
+class SimulatedProperty:
+    """A property value with its range and, if it has one, the automatic mode."""
+
+    value: float
+    minimum: float
+    maximum: float
+    auto: Optional[bool] = None
+
+    def set(self, value: float) -> int:
+        if not self.minimum <= value <= self.maximum:
+            return IC_ERROR
+        self.value = value
+        return IC_SUCCESS
+
+
+def default_camera_properties() -> dict[CameraProperty, SimulatedProperty]:
+    return {
+        CameraProperty.ZOOM: SimulatedProperty(0, 0, 100),
+        CameraProperty.EXPOSURE: SimulatedProperty(-5, -13, 1, auto=False),
+        CameraProperty.IRIS: SimulatedProperty(0, 0, 100),
+        CameraProperty.FOCUS: SimulatedProperty(0, 0, 1000, auto=False),
+    }
+
+
+def default_video_properties() -> dict[VideoProperty, SimulatedProperty]:
+    return {
+        VideoProperty.BRIGHTNESS: SimulatedProperty(0, 0, 255),
+        VideoProperty.CONTRAST: SimulatedProperty(0, -10, 30),
+        VideoProperty.SATURATION: SimulatedProperty(64, 0, 255),
+        VideoProperty.SHARPNESS: SimulatedProperty(0, 0, 14),
+        VideoProperty.GAMMA: SimulatedProperty(100, 1, 500),
+        VideoProperty.WHITEBALANCE: SimulatedProperty(64, 0, 255, auto=True),
+        VideoProperty.GAIN: SimulatedProperty(16, 0, 480, auto=False),
+    }
+
+
+@dataclass
+class SimulatedDevice:
+    """A device that can be opened with the simulated library."""
+
+    name: str = "DFK 33UX264"
+    serial: str = "10000001"
+    video_formats: tuple[str, ...] = (
+        "RGB24 (640x480)",
+        "RGB32 (640x480)",
+        "Y800 (640x480)",
+        "Y16 (640x480)",
+        "UYVY (640x480)",
+        "RGB24 (1280x960)",
+    )
+    frame_rate: float = 30.0
+    exposure: SimulatedProperty = field(
+        default_factory=lambda: SimulatedProperty(0.0333, 1e-4, 30.0)
+    )
+    camera_properties: dict[CameraProperty, SimulatedProperty] = field(
+        default_factory=default_camera_properties
+    )
+    video_properties: dict[VideoProperty, SimulatedProperty] = field(
+        default_factory=default_video_properties
+    )
+    trigger_available: bool = True
+
+    @property
+    def unique_name(self) -> str:
+        return f"{self.name} {self.serial}"
+
+
+def _out(arg: Any) -> Any:
+    # output arguments are passed as `byref(obj)` or as the ctypes object itself
+    return getattr(arg, "_obj", arg)
+
+
+def _value(arg: Any) -> Any:
+    return getattr(arg, "value", arg)
+
+
+def _text(arg: Any) -> Optional[str]:
+    arg = _value(arg)
+    return arg.decode("utf-8") if isinstance(arg, bytes) else arg
+
+
+def _write_text(buffer: Any, text: str, size: Optional[int] = None) -> None:
+    data = text.encode("utf-8")
+    size = ctypes.sizeof(buffer) if size is None else size
+    ctypes.memmove(buffer, data[: size - 1] + b"\0", min(len(data) + 1, size))
+
+
+def _busy_wait(seconds: float) -> None:
+    # sleeping is far too coarse for microsecond latencies
+    deadline = time.perf_counter() + seconds
+    if seconds > 2e-3:
+        time.sleep(seconds - 1e-3)
+    while time.perf_counter() < deadline:
+        pass
+
+
+class _Buffer:
+    """An image buffer of the simulated ring buffer."""
+
+    def __init__(self, index: int, shape: tuple[int, ...], dtype: Any) -> None:
+        self.index = index
+        self.array = np.zeros(shape, dtype=dtype)
+        self.handle = HMEMBUFFER()
+        self.pointer = ctypes.pointer(self.handle)
+        self.data = ctypes.cast(self.array.ctypes.data, ctypes.POINTER(ctypes.c_ubyte))
+        self.locked = False
+
+
+class _Filter:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.parameters = dict(FRAME_FILTERS[name])
+        self.descriptions = (FILTERPARAMETER * len(self.parameters))(
+            *(
+                FILTERPARAMETER(key.encode("utf-8"), 1 if isinstance(v, bool) else 0)
+                for key, v in self.parameters.items()
+            )
+        )
+
+
+class _Grabber:
+    """State of a grabber handle and of the device opened with it."""
+
+    def __init__(self, buffers: MutableMapping[int, _Buffer]) -> None:
+        # image buffers of all grabbers by address of their handle
+        self._registry = buffers
+        self.handle = HGRABBER()
+        self.pointer = ctypes.pointer(self.handle)
+        self.device: Optional[SimulatedDevice] = None
+        self.valid = False
+        self.live = False
+        self.video_format = ""
+        self.sink_format: Optional[SinkFormat] = None
+        self.frame_rate = 0.0
+        self.continuous = True
+        self.trigger = SimulatedProperty(0, 0, 1)
+        self.color_enhancement = 0
+        self.ring_buffer_size = 5
+        self.buffers: list[_Buffer] = []
+        self.last: Optional[_Buffer] = None
+        self.description = (0, 0, 0, 0)
+        self.pattern: Optional[np.ndarray] = None
+        self.filters: list[_Filter] = []
+        self.frame_number = 0
+        self.dropped = 0
+        self.snaps = 0
+        self.frame_ready: tuple[Optional[Callable], Any] = (None, None)
+        self.frame_ready_ex: tuple[Optional[Callable], Any] = (None, None)
+        self.device_lost: tuple[Optional[Callable], Any] = (None, None)
+        self.condition = threading.Condition()
+        self.triggers = threading.Semaphore(0)
+        self.stop = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.camera_properties: dict[CameraProperty, SimulatedProperty] = {}
+        self.video_properties: dict[VideoProperty, SimulatedProperty] = {}
+        self.exposure = SimulatedProperty(0, 0, 0)
+        self.items: dict[str, dict[str, tuple[str, Any]]] = {}
+
+    def open(self, device: SimulatedDevice) -> None:
+        self.close()
+        self.device = device
+        self.valid = True
+        self.video_format = device.video_formats[0]
+        self.sink_format = None
+        self.frame_rate = device.frame_rate
+        self.reset_properties()
+
+    def close(self) -> None:
+        self.stop_live()
+        self.device = None
+        self.valid = False
+        self.discard_sink()
+        self.items = {}
+
+    def discard_sink(self) -> None:
+        # the image buffers are recreated with the new format when starting live mode
+        self.buffers = []
+        self.last = None
+
+    def reset_properties(self) -> None:
+        device = self.device
+        self.camera_properties = copy.deepcopy(device.camera_properties)
+        self.video_properties = copy.deepcopy(device.video_properties)
+        self.exposure = copy.deepcopy(device.exposure)
+        self.trigger = SimulatedProperty(0, 0, 1)
+        self.items = {}
+        properties = [
+            (CAMERA_ITEMS[key], prop) for key, prop in self.camera_properties.items()
+        ] + [(VIDEO_ITEMS[key], prop) for key, prop in self.video_properties.items()]
+        for name, prop in properties:
+            elements = self.items.setdefault(name, {})
+            elements["Value"] = ("value", prop)
+            if prop.auto is not None:
+                elements["Auto"] = ("auto", prop)
+        if CameraProperty.EXPOSURE in self.camera_properties:
+            # the absolute exposure time in seconds
+            self.items["Exposure"]["Value"] = ("value", self.exposure)
+        if CameraProperty.FOCUS in self.camera_properties:
+            self.items["Focus"]["One Push"] = ("button", lambda: IC_SUCCESS)
+        if device.trigger_available:
+            self.items["Trigger"] = {
+                "Enable": ("switch", self.trigger),
+                "Software Trigger": ("button", self.software_trigger),
+                "Polarity": ("mapstrings", SimulatedProperty(1, 0, 1)),
+            }
+
+    def video_size(self) -> tuple[str, int, int]:
+        match = VIDEO_FORMAT.match(self.video_format)
+        return match.group(1), int(match.group(2)), int(match.group(3))
+
+    def image_format(self) -> tuple[SinkFormat, int, int, int, int]:
+        """Sink format, width, height and offsets of the images."""
+        pixel_format, width, height = self.video_size()
+        sink_format = self.sink_format or _SINK_FORMATS.get(
+            pixel_format, SinkFormat.RGB24
+        )
+        top = left = 0
+        for filter in self.filters:
+            parameters = filter.parameters
+            if filter.name == "ROI" and parameters["Width"] and parameters["Height"]:
+                top, left = parameters["Top"], parameters["Left"]
+                width = min(parameters["Width"], width - left)
+                height = min(parameters["Height"], height - top)
+        return sink_format, width, height, top, left
+
+    def get_description(self) -> tuple[int, int, int, int]:
+        if self.live or self.buffers:
+            return self.description
+        sink_format, width, height, _, _ = self.image_format()
+        return width, height, _LAYOUTS[sink_format][2], sink_format.value
+
+    def create_sink(self) -> None:
+        sink_format, width, height, top, left = self.image_format()
+        dtype, channels, bits_per_pixel = _LAYOUTS[sink_format]
+        shape = (height, width, channels)
+        self.buffers = [_Buffer(i, shape, dtype) for i in range(self.ring_buffer_size)]
+        for buffer in self.buffers:
+            self._registry[ctypes.addressof(buffer.handle)] = buffer
+        self.last = None
+        self.description = (width, height, bits_per_pixel, sink_format.value)
+        # a diagonal gradient per channel, which moves by one step per frame
+        y, x = np.ogrid[top : top + height, left : left + width]
+        pattern = (y + x)[..., np.newaxis] + 64 * np.arange(channels)
+        self.pattern = (pattern % np.iinfo(dtype).max).astype(dtype)
+
+    def start_live(self) -> None:
+        if self.live:
+            return
+        self.create_sink()
+        self.frame_number = 0
+        self.live = True
+        self.stop.clear()
+        self.thread = threading.Thread(
+            target=self.run, name="tisgrabber-simulated", daemon=True
+        )
+        self.thread.start()
+
+    def stop_live(self) -> None:
+        thread, self.thread = self.thread, None
+        self.live = False
+        if thread is None:
+            return
+        self.stop.set()
+        with self.condition:
+            self.condition.notify_all()
+        if thread is not threading.current_thread():
+            thread.join()
+
+    def software_trigger(self) -> int:
+        if not self.trigger.value:
+            return IC_NOT_AVAILABLE
+        self.triggers.release()
+        return IC_SUCCESS
+
+    def run(self) -> None:
+        next_time = time.perf_counter()
+        while not self.stop.is_set():
+            if self.trigger.value:
+                # wake up regularly to notice when live mode is stopped
+                if not self.triggers.acquire(timeout=0.05):
+                    continue
+            else:
+                period = 1.0 / self.frame_rate if self.frame_rate > 0 else 0.0
+                delay = next_time - time.perf_counter()
+                if delay > 0 and self.stop.wait(delay):
+                    break
+                next_time += period
+                if next_time < time.perf_counter():
+                    # the callback took too long, skip the frames that were missed
+                    next_time = time.perf_counter() + period
+            self.acquire()
+
+    def acquire(self) -> None:
+        n = len(self.buffers)
+        start = 0 if self.last is None else self.last.index + 1
+        for i in range(n):
+            buffer = self.buffers[(start + i) % n]
+            if not buffer.locked:
+                break
+        else:
+            self.dropped += 1
+            return
+        maximum = np.iinfo(buffer.array.dtype).max
+        np.add(self.pattern, self.frame_number % maximum, out=buffer.array)
+        with self.condition:
+            frame_number = self.frame_number
+            self.frame_number += 1
+            self.last = buffer
+            deliver = self.continuous or self.snaps > 0
+            self.snaps = max(self.snaps - 1, 0)
+            self.condition.notify_all()
+        if not deliver:
+            return
+        callback, data = self.frame_ready
+        if callback is not None:
+            self.call(callback, self.pointer, buffer.data, frame_number, data)
+        callback, data = self.frame_ready_ex
+        if callback is not None:
+            self.call(callback, self.pointer, buffer.pointer, frame_number, data)
+
+    @staticmethod
+    def call(callback: Callable, *args) -> None:
+        # like the DLL, report exceptions of callbacks without stopping live mode
+        try:
+            callback(*args)
+        except Exception:
+            traceback.print_exc()
+
+    def snap(self, timeout: float) -> int:
+        if not self.live:
+            return IC_NOT_IN_LIVEMODE
+        with self.condition:
+            frame_number = self.frame_number
+            self.snaps += 1
+            if self.condition.wait_for(
+                lambda: self.frame_number != frame_number or not self.live, timeout
+            ):
+                return IC_SUCCESS if self.live else IC_ERROR
+            self.snaps = max(self.snaps - 1, 0)
+            return IC_ERROR
+
+
+def _simulate_calls(cls):
+    """Count the calls of all `IC_*` functions and delay them by their latency."""
+
+    def wrap(function: Callable) -> Callable:
+        name = function.__name__
+
+        @functools.wraps(function)
+        def call(self, *args):
+            self.calls[name] += 1
+            latency = self.latencies.get(name, self.latency)
+            if latency:
+                _busy_wait(latency)
+            return function(self, *args)
+
+        return call
+
+    for name, function in list(vars(cls).items()):
+        if name.startswith("IC_"):
+            setattr(cls, name, wrap(function))
+    return cls
+
+
+@_simulate_calls
+class SimulatedLibrary:
+    """
+    Drop-in replacement for the loaded tisgrabber DLL.
+
+    :param devices: The devices that can be opened. Defaults to a single color camera.
+    :param latency: Seconds every library call takes.
+    :param latencies: Seconds per function name, overriding `latency`, e.g.
+        `{"IC_SnapImage": 1e-3}`.
+    """
+
+    FRAMEREADYCALLBACK = FRAMEREADYCALLBACK
+    FRAMEREADYCALLBACKEX = FRAMEREADYCALLBACKEX
+    DEVICELOSTCALLBACK = DEVICELOSTCALLBACK
+    ENUMCODECCB = ENUMCODECCB
+    ENUMCB = ENUMCB
+
+    def __init__(
+        self,
+        devices: Optional[Sequence[SimulatedDevice]] = None,
+        latency: float = 0.0,
+        latencies: Optional[dict[str, float]] = None,
+    ) -> None:
+        self.devices = [SimulatedDevice()] if devices is None else list(devices)
+        self.latency = latency
+        self.latencies = {} if latencies is None else dict(latencies)
+        self.calls: Counter[str] = Counter()
+        self._lock = threading.RLock()
+        self._grabbers: dict[int, _Grabber] = {}
+        self._filters: dict[int, _Filter] = {}
+        self._buffers: MutableMapping[int, _Buffer] = weakref.WeakValueDictionary()
+        self._codecs: dict[int, tuple[str, Any]] = {}
+
+    # --- simulation control, not part of the DLL ---
+
+    def plug(self, device: SimulatedDevice) -> None:
+        """Make a new device available."""
+        with self._lock:
+            self.devices.append(device)
+
+    def unplug(self, unique_name: str) -> None:
+        """Remove a device and report it as lost to the grabbers that opened it."""
+        with self._lock:
+            self.devices = [d for d in self.devices if d.unique_name != unique_name]
+            grabbers = [
+                g
+                for g in self._grabbers.values()
+                if g.device is not None and g.device.unique_name == unique_name
+            ]
+        for grabber in grabbers:
+            grabber.stop_live()
+            grabber.valid = False
+            callback, data = grabber.device_lost
+            if callback is not None:
+                grabber.call(callback, grabber.pointer, data)
+
+    def _grabber(self, handle: Any) -> Optional[_Grabber]:
+        handle = _out(handle)
+        if isinstance(handle, ctypes.POINTER(ctypes.POINTER(HGRABBER))):
+            handle = handle.contents
+        try:
+            return self._grabbers.get(ctypes.addressof(handle.contents))
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    def _device_grabber(self, handle: Any) -> Optional[_Grabber]:
+        grabber = self._grabber(handle)
+        return grabber if grabber is not None and grabber.valid else None
+
+    def _buffer(self, handle: Any) -> Optional[_Buffer]:
+        try:
+            return self._buffers.get(ctypes.addressof(_out(handle).contents))
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    def _filter(self, handle: Any) -> Optional[_Filter]:
+        handle = _out(handle)
+        if isinstance(handle, ctypes.POINTER(HFRAMEFILTER)):
+            handle = handle.contents
+        try:
+            return self._filters.get(ctypes.addressof(handle))
+        except TypeError:
+            return None
+
+    def _element(self, handle: Any, item: Any, element: Any) -> tuple[int, Any]:
+        """Return an error code and the (kind, target) of a named property element."""
+        grabber = self._grabber(handle)
+        if grabber is None:
+            return IC_NO_HANDLE, None
+        if not grabber.valid:
+            return IC_NO_DEVICE, None
+        elements = grabber.items.get(_text(item))
+        if elements is None:
+            return IC_PROPERTY_ITEM_NOT_AVAILABLE, None
+        found = elements.get(_text(element))
+        if found is None:
+            return IC_PROPERTY_ELEMENT_NOT_AVAILABLE, None
+        return IC_SUCCESS, found
+
+    def _open(self, handle: Any, match: Callable[[SimulatedDevice], bool]) -> int:
+        grabber = self._grabber(handle)
+        if grabber is None:
+            return IC_NO_HANDLE
+        with self._lock:
+            device = next((d for d in self.devices if match(d)), None)
+        if device is None:
+            return IC_ERROR
+        grabber.open(device)
+        return IC_SUCCESS
+
+    # --- library and grabbers ---
+
+    def IC_InitLibrary(self, license_key) -> int:
+        return IC_SUCCESS
+
+    def IC_CloseLibrary(self) -> None:
+        for grabber in list(self._grabbers.values()):
+            grabber.close()
+
+    def IC_CreateGrabber(self):
+        grabber = _Grabber(self._buffers)
+        with self._lock:
+            self._grabbers[ctypes.addressof(grabber.handle)] = grabber
+        return grabber.pointer
+
+    def IC_ReleaseGrabber(self, handle) -> None:
+        grabber = self._grabber(handle)
+        if grabber is None:
+            return
+        grabber.close()
+        with self._lock:
+            self._grabbers.pop(ctypes.addressof(grabber.handle), None)
+
+    # --- devices ---
+
+    def IC_GetDeviceCount(self) -> int:
+        return len(self.devices)
+
+    def IC_GetDevice(self, index) -> Optional[bytes]:
+        index = _value(index)
+        if not 0 <= index < len(self.devices):
+            return None
+        return self.devices[index].name.encode("utf-8")
+
+    def IC_GetUniqueNamefromList(self, index) -> Optional[bytes]:
+        index = _value(index)
+        if not 0 <= index < len(self.devices):
+            return None
+        return self.devices[index].unique_name.encode("utf-8")
+
+    def IC_ListDevices(self, handle, names, size) -> int:
+        names = _out(names)
+        count = min(len(self.devices), len(names))
+        for i in range(count):
+            _write_text(names[i], self.devices[i].name)
+        return count
+
+    def IC_OpenVideoCaptureDevice(self, handle, name) -> int:
+        return self._open(handle, lambda device: device.name == _text(name))
+
+    def IC_OpenDevByDisplayName(self, handle, name) -> int:
+        return self._open(handle, lambda device: device.name == _text(name))
+
+    def IC_OpenDevByUniqueName(self, handle, unique_name) -> int:
+        return self._open(
+            handle, lambda device: device.unique_name == _text(unique_name)
+        )
+
+    def IC_CloseVideoCaptureDevice(self, handle) -> None:
+        grabber = self._grabber(handle)
+        if grabber is not None:
+            grabber.close()
+
+    def IC_ShowDeviceSelectionDialog(self, handle):
+        # without a dialog, the first device is selected
+        grabber = self._grabber(handle)
+        if grabber is None:
+            grabber = self._grabber(self.IC_CreateGrabber())
+        if self.devices:
+            grabber.open(self.devices[0])
+        return grabber.pointer
+
+    def IC_IsDevValid(self, handle) -> int:
+        return int(self._device_grabber(handle) is not None)
+
+    def IC_GetDeviceName(self, handle) -> Optional[bytes]:
+        grabber = self._device_grabber(handle)
+        return None if grabber is None else grabber.device.name.encode("utf-8")
+
+    def IC_GetDisplayName(self, handle, buffer, size) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_NO_DEVICE
+        _write_text(buffer, grabber.device.name, _value(size))
+        return IC_SUCCESS
+
+    def IC_GetUniqueName(self, handle, buffer, size) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_NO_DEVICE
+        _write_text(buffer, grabber.device.unique_name, _value(size))
+        return IC_SUCCESS
+
+    def IC_GetSerialNumber(self, handle, buffer) -> None:
+        grabber = self._device_grabber(handle)
+        if grabber is not None:
+            _write_text(buffer, grabber.device.serial)
+
+    def IC_ResetUSBCam(self, handle) -> int:
+        return IC_SUCCESS
+
+    # --- video formats ---
+
+    def IC_GetVideoFormatCount(self, handle) -> int:
+        grabber = self._device_grabber(handle)
+        return IC_NO_DEVICE if grabber is None else len(grabber.device.video_formats)
+
+    def IC_GetVideoFormat(self, handle, index) -> Optional[bytes]:
+        grabber = self._device_grabber(handle)
+        index = _value(index)
+        if grabber is None or not 0 <= index < len(grabber.device.video_formats):
+            return None
+        return grabber.device.video_formats[index].encode("utf-8")
+
+    def IC_ListVideoFormats(self, handle, names, size) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_NO_DEVICE
+        names = _out(names)
+        count = min(len(grabber.device.video_formats), len(names))
+        for i in range(count):
+            _write_text(names[i], grabber.device.video_formats[i])
+        return count
+
+    def IC_SetVideoFormat(self, handle, format) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None or grabber.live:
+            return IC_ERROR
+        format = _text(format)
+        if format not in grabber.device.video_formats:
+            return IC_ERROR
+        grabber.video_format = format
+        grabber.discard_sink()
+        return IC_SUCCESS
+
+    def IC_GetVideoFormatWidth(self, handle) -> int:
+        grabber = self._device_grabber(handle)
+        return 0 if grabber is None else grabber.video_size()[1]
+
+    def IC_GetVideoFormatHeight(self, handle) -> int:
+        grabber = self._device_grabber(handle)
+        return 0 if grabber is None else grabber.video_size()[2]
+
+    def IC_SetFormat(self, handle, format) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None or grabber.live:
+            return IC_ERROR
+        try:
+            grabber.sink_format = SinkFormat(_value(format))
+        except ValueError:
+            return IC_ERROR
+        grabber.discard_sink()
+        return IC_SUCCESS
+
+    def IC_GetFormat(self, handle) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_ERROR
+        return grabber.image_format()[0].value
+
+    def IC_SetVideoNorm(self, handle, norm) -> int:
+        return IC_ERROR
+
+    def IC_GetVideoNormCount(self, handle) -> int:
+        return 0
+
+    def IC_GetVideoNorm(self, handle, index) -> Optional[bytes]:
+        return None
+
+    def IC_SetInputChannel(self, handle, channel) -> int:
+        return IC_SUCCESS if _value(channel) == 0 else IC_ERROR
+
+    def IC_GetInputChannelCount(self, handle) -> int:
+        return 1
+
+    def IC_GetInputChannel(self, handle, index) -> Optional[bytes]:
+        return b"Default" if _value(index) == 0 else None
+
+    def IC_SetFrameRate(self, handle, frame_rate) -> int:
+        grabber = self._grabber(handle)
+        if grabber is None:
+            return IC_NO_HANDLE
+        if not grabber.valid:
+            return IC_NO_DEVICE
+        if grabber.live:
+            return IC_NOT_IN_LIVEMODE
+        frame_rate = _value(frame_rate)
+        if frame_rate <= 0:
+            return IC_ERROR
+        grabber.frame_rate = frame_rate
+        return IC_SUCCESS
+
+    def IC_GetFrameRate(self, handle) -> float:
+        grabber = self._device_grabber(handle)
+        return 0.0 if grabber is None else grabber.frame_rate
+
+    # --- live mode and images ---
+
+    def IC_StartLive(self, handle, show) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_ERROR
+        grabber.start_live()
+        return IC_SUCCESS
+
+    def IC_PrepareLive(self, handle, show) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_ERROR
+        grabber.create_sink()
+        return IC_SUCCESS
+
+    def IC_SuspendLive(self, handle) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_ERROR
+        grabber.stop_live()
+        return IC_SUCCESS
+
+    def IC_StopLive(self, handle) -> None:
+        grabber = self._grabber(handle)
+        if grabber is not None:
+            grabber.stop_live()
+
+    def IC_SignalDetected(self, handle) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_NO_DEVICE
+        return IC_SUCCESS if grabber.live else IC_NOT_IN_LIVEMODE
+
+    def IC_SetContinuousMode(self, handle, mode) -> int:
+        grabber = self._grabber(handle)
+        if grabber is None:
+            return IC_NO_HANDLE
+        if grabber.live:
+            return IC_NOT_IN_LIVEMODE
+        # 0 snaps continuously, 1 only on request
+        grabber.continuous = _value(mode) == 0
+        return IC_SUCCESS
+
+    def IC_SnapImage(self, handle, timeout) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_ERROR
+        return grabber.snap(_value(timeout) / 1000)
+
+    def IC_GetImageDescription(
+        self, handle, width, height, bits_per_pixel, color_format
+    ) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_ERROR
+        description = grabber.get_description()
+        for arg, value in zip(
+            (width, height, bits_per_pixel, color_format), description
+        ):
+            _out(arg).value = value
+        return IC_SUCCESS
+
+    def IC_GetImagePtr(self, handle):
+        grabber = self._device_grabber(handle)
+        if grabber is None or grabber.last is None:
+            return ctypes.POINTER(ctypes.c_void_p)()
+        return ctypes.cast(grabber.last.data, ctypes.POINTER(ctypes.c_void_p))
+
+    def IC_SaveImage(self, handle, filename, format, quality) -> int:
+        from .writer import encode_image
+
+        grabber = self._device_grabber(handle)
+        if grabber is None or grabber.last is None:
+            return IC_ERROR
+        file_type = ImageFileType(_value(format))
+        options = (
+            {"quality": _value(quality)} if file_type == ImageFileType.JPEG else {}
+        )
+        try:
+            encode_image(_text(filename), grabber.last.array, file_type.name, options)
+        except (ImportError, OSError):
+            return IC_ERROR
+        return IC_SUCCESS
+
+    # --- callbacks ---
+
+    def IC_SetFrameReadyCallback(self, handle, callback, data) -> int:
+        grabber = self._grabber(handle)
+        if grabber is None:
+            return IC_NO_HANDLE
+        grabber.frame_ready = (callback, data)
+        return IC_SUCCESS
+
+    def IC_SetFrameReadyCallbackEx(self, handle, callback, data) -> int:
+        grabber = self._grabber(handle)
+        if grabber is None:
+            return IC_NO_HANDLE
+        grabber.frame_ready_ex = (callback, data)
+        return IC_SUCCESS
+
+    def IC_SetCallbacks(
+        self, handle, frame_ready, frame_ready_data, device_lost, device_lost_data
+    ) -> int:
+        grabber = self._grabber(handle)
+        if grabber is None:
+            return IC_NO_HANDLE
+        grabber.frame_ready = (frame_ready, frame_ready_data)
+        grabber.device_lost = (device_lost, device_lost_data)
+        return IC_SUCCESS
+
+    # --- trigger ---
+
+    def IC_IsTriggerAvailable(self, handle) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_NO_DEVICE
+        return int(grabber.device.trigger_available)
+
+    def IC_EnableTrigger(self, handle, enable) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_NO_DEVICE
+        if not grabber.device.trigger_available:
+            return IC_NOT_AVAILABLE
+        grabber.trigger.value = int(bool(_value(enable)))
+        return IC_SUCCESS
+
+    def IC_SoftwareTrigger(self, handle) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_NO_DEVICE
+        return grabber.software_trigger()
+
+    def IC_GetTriggerModes(self, handle, modes, size) -> int:
+        modes = _out(modes)
+        count = min(2, len(modes))
+        for i, mode in enumerate(("Edge", "Level")[:count]):
+            _write_text(modes[i], mode)
+        return count
+
+    def IC_SetTriggerMode(self, handle, mode) -> int:
+        return IC_SUCCESS
+
+    def IC_SetTriggerPolarity(self, handle, polarity) -> int:
+        return IC_SUCCESS
+
+    # --- camera and video properties ---
+
+    def _camera_property(self, handle, prop) -> Optional[SimulatedProperty]:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return None
+        return grabber.camera_properties.get(CameraProperty(_value(prop)))
+
+    def _video_property(self, handle, prop) -> Optional[SimulatedProperty]:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return None
+        return grabber.video_properties.get(VideoProperty(_value(prop)))
+
+    def IC_IsCameraPropertyAvailable(self, handle, prop) -> int:
+        return int(self._camera_property(handle, prop) is not None)
+
+    def IC_IsCameraPropertyAutoAvailable(self, handle, prop) -> int:
+        found = self._camera_property(handle, prop)
+        # the DLL reports a missing automatic mode as IC_NO_DEVICE
+        return (
+            IC_SUCCESS if found is not None and found.auto is not None else IC_NO_DEVICE
+        )
+
+    def IC_CameraPropertyGetRange(self, handle, prop, minimum, maximum) -> int:
+        found = self._camera_property(handle, prop)
+        if found is None:
+            return IC_ERROR
+        _out(minimum).value = int(found.minimum)
+        _out(maximum).value = int(found.maximum)
+        return IC_SUCCESS
+
+    def IC_GetCameraProperty(self, handle, prop, value) -> int:
+        found = self._camera_property(handle, prop)
+        if found is None:
+            return IC_ERROR
+        _out(value).value = int(found.value)
+        return IC_SUCCESS
+
+    def IC_SetCameraProperty(self, handle, prop, value) -> int:
+        found = self._camera_property(handle, prop)
+        return IC_ERROR if found is None else found.set(_value(value))
+
+    def IC_EnableAutoCameraProperty(self, handle, prop, enable) -> int:
+        found = self._camera_property(handle, prop)
+        if found is None or found.auto is None:
+            return IC_ERROR
+        found.auto = bool(_value(enable))
+        return IC_SUCCESS
+
+    def IC_GetAutoCameraProperty(self, handle, prop, value) -> int:
+        found = self._camera_property(handle, prop)
+        if found is None or found.auto is None:
+            return IC_ERROR
+        _out(value).value = int(found.auto)
+        return IC_SUCCESS
+
+    def IC_IsVideoPropertyAvailable(self, handle, prop) -> int:
+        return int(self._video_property(handle, prop) is not None)
+
+    def IC_IsVideoPropertyAutoAvailable(self, handle, prop) -> int:
+        found = self._video_property(handle, prop)
+        return int(found is not None and found.auto is not None)
+
+    def IC_VideoPropertyGetRange(self, handle, prop, minimum, maximum) -> int:
+        found = self._video_property(handle, prop)
+        if found is None:
+            return IC_ERROR
+        _out(minimum).value = int(found.minimum)
+        _out(maximum).value = int(found.maximum)
+        return IC_SUCCESS
+
+    def IC_GetVideoProperty(self, handle, prop, value) -> int:
+        found = self._video_property(handle, prop)
+        if found is None:
+            return IC_ERROR
+        _out(value).value = int(found.value)
+        return IC_SUCCESS
+
+    def IC_SetVideoProperty(self, handle, prop, value) -> int:
+        found = self._video_property(handle, prop)
+        return IC_ERROR if found is None else found.set(_value(value))
+
+    def IC_EnableAutoVideoProperty(self, handle, prop, enable) -> int:
+        found = self._video_property(handle, prop)
+        if found is None or found.auto is None:
+            return IC_ERROR
+        found.auto = bool(_value(enable))
+        return IC_SUCCESS
+
+    def IC_GetAutoVideoProperty(self, handle, prop, value) -> int:
+        found = self._video_property(handle, prop)
+        if found is None or found.auto is None:
+            return IC_ERROR
+        _out(value).value = int(found.auto)
+        return IC_SUCCESS
+
+    def IC_ResetProperties(self, handle) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_NO_DEVICE
+        grabber.reset_properties()
+        return IC_SUCCESS
+
+    def IC_FocusOnePush(self, handle) -> int:
+        found = self._camera_property(handle, CameraProperty.FOCUS.value)
+        return IC_NOT_AVAILABLE if found is None else IC_SUCCESS
+
+    def IC_GetColorEnhancement(self, handle, value) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_NO_DEVICE
+        _out(value).value = grabber.color_enhancement
+        return IC_SUCCESS
+
+    def IC_SetColorEnhancement(self, handle, enable) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_NO_DEVICE
+        grabber.color_enhancement = int(bool(_value(enable)))
+        return IC_SUCCESS
+
+    # --- exposure ---
+
+    def _exposure(self, handle) -> Optional[SimulatedProperty]:
+        return self._camera_property(handle, CameraProperty.EXPOSURE.value)
+
+    def IC_GetExpRegValRange(self, handle, minimum, maximum) -> int:
+        return self.IC_CameraPropertyGetRange(
+            handle, CameraProperty.EXPOSURE.value, minimum, maximum
+        )
+
+    def IC_GetExpRegVal(self, handle, value) -> int:
+        return self.IC_GetCameraProperty(handle, CameraProperty.EXPOSURE.value, value)
+
+    def IC_SetExpRegVal(self, handle, value) -> int:
+        return self.IC_SetCameraProperty(handle, CameraProperty.EXPOSURE.value, value)
+
+    def IC_EnableExpRegValAuto(self, handle, enable) -> int:
+        return self.IC_EnableAutoCameraProperty(
+            handle, CameraProperty.EXPOSURE.value, enable
+        )
+
+    def IC_GetExpRegValAuto(self, handle, value) -> int:
+        return self.IC_GetAutoCameraProperty(
+            handle, CameraProperty.EXPOSURE.value, value
+        )
+
+    def IC_IsExpAbsValAvailable(self, handle) -> int:
+        return int(self._exposure(handle) is not None)
+
+    def IC_GetExpAbsValRange(self, handle, minimum, maximum) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None or self._exposure(handle) is None:
+            return IC_ERROR
+        _out(minimum).value = grabber.exposure.minimum
+        _out(maximum).value = grabber.exposure.maximum
+        return IC_SUCCESS
+
+    def IC_GetExpAbsVal(self, handle, value) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None or self._exposure(handle) is None:
+            return IC_ERROR
+        _out(value).value = grabber.exposure.value
+        return IC_SUCCESS
+
+    # --- named properties ---
+
+    def IC_IsPropertyAvailable(self, handle, item, element) -> int:
+        grabber = self._grabber(handle)
+        if grabber is None:
+            return IC_NO_HANDLE
+        if not grabber.valid:
+            return IC_NO_DEVICE
+        elements = grabber.items.get(_text(item))
+        if elements is None:
+            return IC_PROPERTY_ITEM_NOT_AVAILABLE
+        if _text(element) is not None and _text(element) not in elements:
+            return IC_PROPERTY_ELEMENT_NOT_AVAILABLE
+        return IC_SUCCESS
+
+    def IC_GetPropertyValueRange(self, handle, item, element, minimum, maximum) -> int:
+        err, found = self._element(handle, item, element)
+        if err != IC_SUCCESS:
+            return err
+        kind, prop = found
+        if kind != "value":
+            return IC_PROPERTY_ELEMENT_WRONG_INTERFACE
+        _out(minimum).value = int(prop.minimum)
+        _out(maximum).value = int(prop.maximum)
+        return IC_SUCCESS
+
+    def IC_GetPropertyValue(self, handle, item, element, value) -> int:
+        err, found = self._element(handle, item, element)
+        if err != IC_SUCCESS:
+            return err
+        kind, prop = found
+        if kind != "value":
+            return IC_PROPERTY_ELEMENT_WRONG_INTERFACE
+        _out(value).value = int(prop.value)
+        return IC_SUCCESS
+
+    def IC_SetPropertyValue(self, handle, item, element, value) -> int:
+        err, found = self._element(handle, item, element)
+        if err != IC_SUCCESS:
+            return err
+        kind, prop = found
+        if kind != "value":
+            return IC_PROPERTY_ELEMENT_WRONG_INTERFACE
+        return prop.set(int(_value(value)))
+
+    def IC_GetPropertyAbsoluteValueRange(
+        self, handle, item, element, minimum, maximum
+    ) -> int:
+        err, found = self._element(handle, item, element)
+        if err != IC_SUCCESS:
+            return err
+        kind, prop = found
+        if kind != "value":
+            return IC_PROPERTY_ELEMENT_WRONG_INTERFACE
+        _out(minimum).value = prop.minimum
+        _out(maximum).value = prop.maximum
+        return IC_SUCCESS
+
+    def IC_GetPropertyAbsoluteValue(self, handle, item, element, value) -> int:
+        err, found = self._element(handle, item, element)
+        if err != IC_SUCCESS:
+            return err
+        kind, prop = found
+        if kind != "value":
+            return IC_PROPERTY_ELEMENT_WRONG_INTERFACE
+        _out(value).value = prop.value
+        return IC_SUCCESS
+
+    def IC_SetPropertyAbsoluteValue(self, handle, item, element, value) -> int:
+        err, found = self._element(handle, item, element)
+        if err != IC_SUCCESS:
+            return err
+        kind, prop = found
+        if kind != "value":
+            return IC_PROPERTY_ELEMENT_WRONG_INTERFACE
+        return prop.set(float(_value(value)))
+
+    def IC_GetPropertySwitch(self, handle, item, element, on) -> int:
+        err, found = self._element(handle, item, element)
+        if err != IC_SUCCESS:
+            return err
+        kind, prop = found
+        if kind == "auto":
+            _out(on).value = int(prop.auto)
+        elif kind == "switch":
+            _out(on).value = int(prop.value)
+        else:
+            return IC_PROPERTY_ELEMENT_WRONG_INTERFACE
+        return IC_SUCCESS
+
+    def IC_SetPropertySwitch(self, handle, item, element, on) -> int:
+        err, found = self._element(handle, item, element)
+        if err != IC_SUCCESS:
+            return err
+        kind, prop = found
+        if kind == "auto":
+            prop.auto = bool(_value(on))
+        elif kind == "switch":
+            prop.value = int(bool(_value(on)))
+        else:
+            return IC_PROPERTY_ELEMENT_WRONG_INTERFACE
+        return IC_SUCCESS
+
+    def IC_PropertyOnePush(self, handle, item, element) -> int:
+        err, found = self._element(handle, item, element)
+        if err != IC_SUCCESS:
+            return err
+        kind, push = found
+        if kind != "button":
+            return IC_PROPERTY_ELEMENT_WRONG_INTERFACE
+        return push()
+
+    def IC_GetPropertyMapStrings(
+        self, handle, item, element, count, max_length, strings
+    ) -> int:
+        err, found = self._element(handle, item, element)
+        if err != IC_SUCCESS:
+            return err
+        if found[0] != "mapstrings":
+            return IC_PROPERTY_ELEMENT_WRONG_INTERFACE
+        names = MAP_STRINGS[_text(item), _text(element)]
+        _out(count).value = len(names)
+        _out(max_length).value = max(len(name.encode("utf-8")) for name in names)
+        if strings:
+            addresses = ctypes.cast(strings, ctypes.POINTER(ctypes.c_void_p))
+            for i, name in enumerate(names):
+                data = name.encode("utf-8") + b"\0"
+                ctypes.memmove(addresses[i], data, len(data))
+        return IC_SUCCESS
+
+    def IC_SetPropertyMapString(self, handle, item, element, string) -> int:
+        err, found = self._element(handle, item, element)
+        if err != IC_SUCCESS:
+            return err
+        kind, prop = found
+        if kind != "mapstrings":
+            return IC_PROPERTY_ELEMENT_WRONG_INTERFACE
+        names = MAP_STRINGS[_text(item), _text(element)]
+        if _text(string) not in names:
+            return IC_ERROR
+        return prop.set(names.index(_text(string)))
+
+    def IC_enumProperties(self, handle, callback, data) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_NO_DEVICE
+        for item in list(grabber.items):
+            if callback(item.encode("utf-8"), data):
+                break
+        return IC_SUCCESS
+
+    def IC_enumPropertyElements(self, handle, item, callback, data) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_NO_DEVICE
+        elements = grabber.items.get(_text(item))
+        if elements is None:
+            return IC_PROPERTY_ITEM_NOT_AVAILABLE
+        for element in list(elements):
+            if callback(element.encode("utf-8"), data):
+                break
+        return IC_SUCCESS
+
+    def IC_enumPropertyElementInterfaces(
+        self, handle, item, element, callback, data
+    ) -> int:
+        err, found = self._element(handle, item, element)
+        if err != IC_SUCCESS:
+            return err
+        kind, prop = found
+        interfaces = _INTERFACES[kind]
+        if prop is self._grabber(handle).exposure:
+            # only the exposure time has an absolute value in seconds
+            interfaces += ("AbsoluteValues",)
+        for interface in interfaces:
+            if callback(interface.encode("utf-8"), data):
+                break
+        return IC_SUCCESS
+
+    def IC_PrintItemAndElementNames(self, handle) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_NO_DEVICE
+        for item, elements in grabber.items.items():
+            print(item)
+            for element in elements:
+                print(f"    {element}")
+        return IC_SUCCESS
+
+    # --- device state files ---
+
+    def IC_SaveDeviceStateToFile(self, handle, filename) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None:
+            return IC_ERROR
+        device = grabber.device
+        root = ET.Element("device_state", libver="3.4", filemajor="1", fileminor="0")
+        node = ET.SubElement(
+            root,
+            "device",
+            name=device.name,
+            base_name=device.name,
+            unique_name=device.unique_name,
+        )
+        ET.SubElement(node, "videoformat").text = grabber.video_format
+        ET.SubElement(node, "fps").text = repr(float(grabber.frame_rate))
+        items = ET.SubElement(node, "vcdpropertyitems")
+        for item, elements in grabber.items.items():
+            item_node = ET.SubElement(items, "item", name=item)
+            for element, (kind, prop) in elements.items():
+                if kind == "button":
+                    continue
+                value = int(prop.auto) if kind == "auto" else prop.value
+                element_node = ET.SubElement(item_node, "element", name=element)
+                ET.SubElement(element_node, "itf", value=str(value))
+        ET.indent(root)
+        try:
+            ET.ElementTree(root).write(_text(filename))
+        except OSError:
+            return IC_ERROR
+        return IC_SUCCESS
+
+    def IC_LoadDeviceStateFromFile(self, handle, filename):
+        grabber = self._grabber(handle)
+        if grabber is None:
+            grabber = self._grabber(self.IC_CreateGrabber())
+        try:
+            node = ET.parse(_text(filename)).getroot().find("device")
+        except (OSError, ET.ParseError):
+            return grabber.pointer
+        if node is None:
+            return grabber.pointer
+        unique_name = node.get("unique_name")
+        if self._open(grabber.pointer, lambda d: d.unique_name == unique_name) < 1:
+            return grabber.pointer
+        video_format = node.findtext("videoformat")
+        if video_format in grabber.device.video_formats:
+            grabber.video_format = video_format
+        fps = node.findtext("fps")
+        if fps:
+            grabber.frame_rate = float(fps)
+        for item_node in node.iterfind("vcdpropertyitems/item"):
+            elements = grabber.items.get(item_node.get("name"), {})
+            for element_node in item_node.iterfind("element"):
+                kind, prop = elements.get(element_node.get("name"), ("", None))
+                value = element_node.find("itf").get("value")
+                if kind == "auto":
+                    prop.auto = bool(int(value))
+                elif kind in ("value", "switch", "mapstrings"):
+                    prop.set(float(value))
+        return grabber.pointer
+
+    # --- frame filters ---
+
+    def IC_GetAvailableFrameFilterCount(self) -> int:
+        return len(FRAME_FILTERS)
+
+    def IC_GetAvailableFrameFilters(self, names, count) -> int:
+        addresses = ctypes.cast(names, ctypes.POINTER(ctypes.c_void_p))
+        count = min(_value(count), len(FRAME_FILTERS))
+        for i, name in enumerate(list(FRAME_FILTERS)[:count]):
+            data = name.encode("utf-8") + b"\0"
+            ctypes.memmove(addresses[i], data, len(data))
+        return count
+
+    def IC_CreateFrameFilter(self, name, handle) -> int:
+        name = _text(name)
+        if name not in FRAME_FILTERS:
+            return IC_ERROR
+        filter = _Filter(name)
+        handle = _out(handle)
+        handle.bHasDialog = 0
+        handle.ParameterCount = len(filter.parameters)
+        handle.Parameters = ctypes.cast(
+            filter.descriptions, ctypes.POINTER(FILTERPARAMETER)
+        )
+        self._filters[ctypes.addressof(handle)] = filter
+        return IC_SUCCESS
+
+    def IC_DeleteFrameFilter(self, handle) -> None:
+        filter = self._filter(handle)
+        if filter is None:
+            return
+        for grabber in self._grabbers.values():
+            if filter in grabber.filters:
+                grabber.filters.remove(filter)
+        self._filters = {k: f for k, f in self._filters.items() if f is not filter}
+
+    def IC_AddFrameFilterToDevice(self, handle, filter_handle) -> int:
+        grabber = self._device_grabber(handle)
+        filter = self._filter(filter_handle)
+        if grabber is None or filter is None or grabber.live:
+            return IC_ERROR
+        grabber.filters.append(filter)
+        grabber.discard_sink()
+        return IC_SUCCESS
+
+    def IC_FrameFilterDeviceClear(self, handle) -> int:
+        grabber = self._device_grabber(handle)
+        if grabber is None or grabber.live:
+            return IC_ERROR
+        grabber.filters.clear()
+        grabber.discard_sink()
+        return IC_SUCCESS
+
+    def IC_FrameFilterShowDialog(self, handle) -> int:
+        return IC_ERROR
+
+    def IC_FrameFilterGetParameter(self, handle, name, data) -> int:
+        filter = self._filter(handle)
+        if filter is None or _text(name) not in filter.parameters:
+            return IC_ERROR
+        value = filter.parameters[_text(name)]
+        if isinstance(value, str):
+            _write_text(data, value)
+        else:
+            _out(data).value = value
+        return IC_SUCCESS
+
+    def _set_filter_parameter(self, handle, name, value, type) -> int:
+        filter = self._filter(handle)
+        name = _text(name)
+        if filter is None or name not in filter.parameters:
+            return IC_ERROR
+        if not isinstance(filter.parameters[name], type):
+            return IC_ERROR
+        filter.parameters[name] = type(value)
+        return IC_SUCCESS
+
+    def IC_FrameFilterSetParameterInt(self, handle, name, value) -> int:
+        return self._set_filter_parameter(handle, name, _value(value), int)
+
+    def IC_FrameFilterSetParameterFloat(self, handle, name, value) -> int:
+        return self._set_filter_parameter(handle, name, _value(value), float)
+
+    def IC_FrameFilterSetParameterBoolean(self, handle, name, value) -> int:
+        return self._set_filter_parameter(handle, name, _value(value), bool)
+
+    def IC_FrameFilterSetParameterString(self, handle, name, value) -> int:
+        return self._set_filter_parameter(handle, name, _text(value), str)
+
+    # --- codecs and AVI capture ---
+
+    def IC_enumCodecs(self, callback, data) -> int:
+        for name in CODECS:
+            callback(name.encode("utf-8"), data)
+        return IC_SUCCESS
+
+    def IC_Codec_Create(self, name):
+        name = _text(name)
+        if name not in CODECS:
+            return ctypes.POINTER(HCODEC)()
+        codec = ctypes.pointer(HCODEC())
+        self._codecs[ctypes.addressof(codec.contents)] = (name, codec)
+        return codec
+
+    def IC_Codec_Release(self, codec) -> None:
+        if codec:
+            self._codecs.pop(ctypes.addressof(codec.contents), None)
+
+    def IC_Codec_getName(self, codec, size, buffer) -> int:
+        name, _ = self._codecs.get(ctypes.addressof(codec.contents), (None, None))
+        if name is None:
+            return IC_ERROR
+        _write_text(buffer, name, _value(size))
+        return IC_SUCCESS
+
+    def IC_Codec_hasDialog(self, codec) -> int:
+        return 0
+
+    def IC_Codec_showDialog(self, codec) -> int:
+        return IC_ERROR
+
+    def IC_SetCodec(self, handle, codec) -> int:
+        return IC_SUCCESS if self._device_grabber(handle) is not None else IC_ERROR
+
+    def IC_SetAVIFileName(self, handle, filename) -> int:
+        return IC_SUCCESS if self._device_grabber(handle) is not None else IC_ERROR
+
+    def IC_enableAVICapturePause(self, handle, enable) -> int:
+        return IC_SUCCESS if self._device_grabber(handle) is not None else IC_ERROR
+
+    # --- ring buffer ---
+
+    def IC_SetRingBufferSize(self, handle, count) -> int:
+        grabber = self._grabber(handle)
+        if grabber is None:
+            return IC_NO_HANDLE
+        count = _value(count)
+        if grabber.live or count < 1:
+            return IC_ERROR
+        grabber.ring_buffer_size = count
+        grabber.discard_sink()
+        return IC_SUCCESS
+
+    def IC_GetRingBufferSize(self, handle, count) -> int:
+        grabber = self._grabber(handle)
+        if grabber is None:
+            return IC_NO_HANDLE
+        _out(count).value = grabber.ring_buffer_size
+        return IC_SUCCESS
+
+    def IC_GetMemBuffer(self, handle, index, buffer) -> int:
+        grabber = self._grabber(handle)
+        if grabber is None:
+            return IC_NO_HANDLE
+        index = _value(index)
+        if not 0 <= index < len(grabber.buffers):
+            return IC_ERROR if not grabber.buffers else IC_INDEX_OUT_OF_RANGE
+        _out(buffer).contents = grabber.buffers[index].handle
+        return IC_SUCCESS
+
+    def IC_GetMemBufferLastAcq(self, handle, buffer) -> int:
+        grabber = self._grabber(handle)
+        if grabber is None:
+            return IC_NO_HANDLE
+        if grabber.last is None:
+            return IC_ERROR
+        _out(buffer).contents = grabber.last.handle
+        return IC_SUCCESS
+
+    def IC_ReleaseMemBuffer(self, buffer) -> None:
+        pass
+
+    def IC_GetMemBufferDescription(self, buffer, width, height, bits_per_pixel) -> int:
+        found = self._buffer(buffer)
+        if found is None:
+            return IC_NO_HANDLE
+        height_, width_, channels = found.array.shape
+        _out(width).value = width_
+        _out(height).value = height_
+        _out(bits_per_pixel).value = channels * found.array.dtype.itemsize * 8
+        return IC_SUCCESS
+
+    def IC_MemBufferLock(self, buffer, lock) -> int:
+        found = self._buffer(buffer)
+        if found is None:
+            return IC_NO_HANDLE
+        found.locked = bool(_value(lock))
+        return IC_SUCCESS
+
+    def IC_MemBufferisLocked(self, buffer, locked) -> int:
+        found = self._buffer(buffer)
+        if found is None:
+            return IC_NO_HANDLE
+        _out(locked).value = int(found.locked)
+        return IC_SUCCESS
+
+    def IC_MemBufferGetIndex(self, buffer, index) -> int:
+        found = self._buffer(buffer)
+        if found is None:
+            return IC_NO_HANDLE
+        _out(index).value = found.index
+        return IC_SUCCESS
+
+    def IC_MemBufferGetDataPtr(self, buffer, data) -> int:
+        found = self._buffer(buffer)
+        if found is None:
+            return IC_NO_HANDLE
+        _out(data).contents = found.data.contents
+        return IC_SUCCESS
+
+    # --- windows and dialogs, which have no effect ---
+
+    def IC_SetHWnd(self, handle, hwnd) -> int:
+        return IC_SUCCESS
+
+    def IC_SetDefaultWindowPosition(self, handle, default) -> int:
+        return IC_SUCCESS
+
+    def IC_SetWindowPosition(self, handle, x, y, width, height) -> int:
+        return IC_SUCCESS
+
+    def IC_RemoveOverlay(self, handle, enable) -> None:
+        pass
+
+    def IC_ShowPropertyDialog(self, handle) -> int:
+        return IC_SUCCESS if self._device_grabber(handle) is not None else IC_NO_DEVICE
+
+    def IC_MsgBox(self, text, title) -> None:
+        pass
@@ -0,0 +1,84 @@
+import asyncio
+from typing import Optional
+
+import numpy as np
+
+from .exceptions import QueueClosedError
+from .frames import Frame, FramePool
+
+
+class FrameStream:
+    """
+    Bounded buffer handing frames from the DLL's callback thread to an asyncio loop.
+
+    `put` runs on the callback thread. It copies the frame into an array leased from
+    the pool and schedules its delivery with `loop.call_soon_threadsafe`. If the
+    consumer falls behind, the oldest buffered frame is dropped.
+
+    :param pool: If None, a pool is sized from the first frame, and resized whenever
+        the shape or dtype of the frames changes.
+    """
+
+    def __init__(
+        self,
+        pool: Optional[FramePool] = None,
+        capacity: int = 8,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
+        self.pool = pool
+        self._sized_pool = pool is None
+        self._capacity = capacity
+        self._loop = asyncio.get_running_loop() if loop is None else loop
+        self._frames: asyncio.Queue[Optional[Frame]] = asyncio.Queue(capacity)
+        self._closed = False
+        self.received = 0
+        self.dropped = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, image: np.ndarray, frame_number: int) -> None:
+        if self._closed:
+            return
+        pool = self.pool
+        if self._sized_pool and (
+            pool is None or pool.shape != image.shape or pool.dtype != image.dtype
+        ):
+            # leases of a previous pool are returned to it and dropped with it
+            pool = self.pool = FramePool(image.shape, image.dtype, self._capacity + 2)
+        frame = Frame(frame_number, pool.copy(image))
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, frame)
+        except RuntimeError:
+            # the event loop has been closed while live mode was still running
+            frame.release()
+
+    def _deliver(self, frame: Frame) -> None:
+        if self._closed:
+            frame.release()
+            return
+        self.received += 1
+        if self._frames.full():
+            self._frames.get_nowait().release()
+            self.dropped += 1
+        self._frames.put_nowait(frame)
+
+    async def get(self) -> Frame:
+        if self._closed and self._frames.empty():
+            raise QueueClosedError("Frame stream is closed.")
+        frame = await self._frames.get()
+        if frame is None:
+            raise QueueClosedError("Frame stream is closed.")
+        return frame
+
+    def close(self) -> None:
+        """Release all buffered frames and wake up a waiting consumer."""
+        if self._closed:
+            return
+        self._closed = True
+        while not self._frames.empty():
+            frame = self._frames.get_nowait()
+            if frame is not None:
+                frame.release()
+        self._frames.put_nowait(None)
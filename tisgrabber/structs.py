@@ -39,3 +39,12 @@ class HFRAMEFILTER(Structure):
         ("ParameterCount", c_int),
         ("Parameters", POINTER(FILTERPARAMETER)),
     ]
+
+
+class HMEMBUFFER(Structure):
+    """
+    This class is used to handle the pointer to an image buffer of the internal ring
+    buffer. A pointer to this class is used by tisgrabber DLL.
+    """
+
+    _fields_ = [("unused", c_int)]
@@ -1,5 +1,7 @@
+import os
 import platform
 from ctypes import (
+    CDLL,
     CFUNCTYPE,
     POINTER,
     c_char,
@@ -10,12 +12,137 @@ from ctypes import (
     c_ubyte,
     c_ulong,
     c_void_p,
-    cdll,
     py_object,
 )
+from functools import cache
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Optional
 
-from .structs import HCODEC, HFRAMEFILTER, HGRABBER
+from .structs import HCODEC, HFRAMEFILTER, HGRABBER, HMEMBUFFER
+
+# environment variable selecting the library loaded by `load_library`
+BACKEND_VARIABLE = "TISGRABBER_BACKEND"
+
+FRAMEREADYCALLBACK = CFUNCTYPE(
+    c_void_p,
+    POINTER(HGRABBER),
+    POINTER(c_ubyte),
+    c_ulong,
+    py_object,
+)
+
+FRAMEREADYCALLBACKEX = CFUNCTYPE(
+    c_void_p,
+    POINTER(HGRABBER),
+    POINTER(HMEMBUFFER),
+    c_ulong,
+    py_object,
+)
+
+DEVICELOSTCALLBACK = CFUNCTYPE(c_void_p, POINTER(HGRABBER), py_object)
+
+ENUMCODECCB = CFUNCTYPE(c_void_p, c_char_p, py_object)
+
+# return 0 to continue the enumeration
+ENUMCB = CFUNCTYPE(c_int, c_char_p, py_object)
+
+# functions returning IC_SUCCESS or an error code, as opposed to the ones returning
+# e.g. counts, sizes or whether something is available
+STATUS_FUNCTIONS = frozenset(
+    (
+        "IC_InitLibrary",
+        "IC_OpenVideoCaptureDevice",
+        "IC_SetFormat",
+        "IC_SetVideoFormat",
+        "IC_SetVideoNorm",
+        "IC_SetInputChannel",
+        "IC_StartLive",
+        "IC_PrepareLive",
+        "IC_SuspendLive",
+        "IC_SetCameraProperty",
+        "IC_CameraPropertyGetRange",
+        "IC_GetCameraProperty",
+        "IC_EnableAutoCameraProperty",
+        "IC_GetAutoCameraProperty",
+        "IC_VideoPropertyGetRange",
+        "IC_GetAutoVideoProperty",
+        "IC_GetVideoProperty",
+        "IC_SetVideoProperty",
+        "IC_EnableAutoVideoProperty",
+        "IC_GetImageDescription",
+        "IC_SnapImage",
+        "IC_SaveImage",
+        "IC_SetHWnd",
+        "IC_SaveDeviceStateToFile",
+        "IC_OpenDevByDisplayName",
+        "IC_GetDisplayName",
+        "IC_OpenDevByUniqueName",
+        "IC_GetUniqueName",
+        "IC_ShowPropertyDialog",
+        "IC_EnableTrigger",
+        "IC_SetFrameReadyCallback",
+        "IC_SetFrameReadyCallbackEx",
+        "IC_SetCallbacks",
+        "IC_SetContinuousMode",
+        "IC_SetTriggerMode",
+        "IC_SetTriggerPolarity",
+        "IC_GetExpRegValRange",
+        "IC_GetExpRegVal",
+        "IC_SetExpRegVal",
+        "IC_EnableExpRegValAuto",
+        "IC_GetExpRegValAuto",
+        "IC_GetExpAbsValRange",
+        "IC_GetExpAbsVal",
+        "IC_GetColorEnhancement",
+        "IC_SetColorEnhancement",
+        "IC_SoftwareTrigger",
+        "IC_SetFrameRate",
+        "IC_FocusOnePush",
+        "IC_ResetProperties",
+        "IC_ResetUSBCam",
+        "IC_SetDefaultWindowPosition",
+        "IC_SetWindowPosition",
+        "IC_PrintItemAndElementNames",
+        "IC_GetPropertyValueRange",
+        "IC_GetPropertyValue",
+        "IC_SetPropertyValue",
+        "IC_GetPropertyAbsoluteValueRange",
+        "IC_GetPropertyAbsoluteValue",
+        "IC_SetPropertyAbsoluteValue",
+        "IC_GetPropertySwitch",
+        "IC_SetPropertySwitch",
+        "IC_PropertyOnePush",
+        "IC_GetPropertyMapStrings",
+        "IC_SetPropertyMapString",
+        "IC_enumProperties",
+        "IC_enumPropertyElements",
+        "IC_enumPropertyElementInterfaces",
+        "IC_CreateFrameFilter",
+        "IC_AddFrameFilterToDevice",
+        "IC_FrameFilterShowDialog",
+        "IC_FrameFilterGetParameter",
+        "IC_FrameFilterSetParameterInt",
+        "IC_FrameFilterSetParameterFloat",
+        "IC_FrameFilterSetParameterBoolean",
+        "IC_FrameFilterSetParameterString",
+        "IC_FrameFilterDeviceClear",
+        "IC_Codec_getName",
+        "IC_Codec_showDialog",
+        "IC_SetCodec",
+        "IC_SetAVIFileName",
+        "IC_enableAVICapturePause",
+        "IC_SetRingBufferSize",
+        "IC_GetRingBufferSize",
+        "IC_GetMemBuffer",
+        "IC_GetMemBufferLastAcq",
+        "IC_GetMemBufferDescription",
+        "IC_MemBufferLock",
+        "IC_MemBufferisLocked",
+        "IC_MemBufferGetIndex",
+        "IC_MemBufferGetDataPtr",
+    )
+)
 
 
 def declare_functions(ic):
@@ -25,7 +152,7 @@ def declare_functions(ic):
     :param ic: The loaded tisgrabber*.dll
     """
     ic.IC_InitLibrary.restype = c_int
-    ic.IC_InitLibrary.argtypes = None
+    ic.IC_InitLibrary.argtypes = (c_char_p,)
 
     ic.IC_CreateGrabber.restype = POINTER(HGRABBER)
     ic.IC_CreateGrabber.argtypes = None
@@ -121,6 +248,9 @@ def declare_functions(ic):
     ic.IC_GetAutoVideoProperty.restype = c_int
     ic.IC_GetAutoVideoProperty.argtypes = (POINTER(HGRABBER), c_int, POINTER(c_int))
 
+    ic.IC_GetVideoProperty.restype = c_int
+    ic.IC_GetVideoProperty.argtypes = (POINTER(HGRABBER), c_int, POINTER(c_long))
+
     ic.IC_SetVideoProperty.restype = c_int
     ic.IC_SetVideoProperty.argtypes = (POINTER(HGRABBER), c_int, c_long)
 
@@ -143,7 +273,7 @@ def declare_functions(ic):
     ic.IC_SaveImage.argtypes = (POINTER(HGRABBER), c_char_p, c_int, c_long)
 
     ic.IC_GetImagePtr.restype = POINTER(c_void_p)
-    ic.argtypes = (POINTER(HGRABBER),)
+    ic.IC_GetImagePtr.argtypes = (POINTER(HGRABBER),)
 
     ic.IC_SetHWnd.restype = c_int
     ic.IC_SetHWnd.argtypes = (POINTER(HGRABBER), c_int)
@@ -204,7 +334,7 @@ def declare_functions(ic):
     ic.IC_OpenDevByUniqueName.restype = c_int
     ic.IC_OpenDevByUniqueName.argtypes = (POINTER(HGRABBER), c_char_p)
 
-    ic.IC_GetUniqueName = c_int
+    ic.IC_GetUniqueName.restype = c_int
     ic.IC_GetUniqueName.argtypes = (POINTER(HGRABBER), c_char_p, c_int)
 
     ic.IC_IsDevValid.restype = c_int
@@ -228,21 +358,21 @@ def declare_functions(ic):
     ic.IC_MsgBox.restype = None
     ic.IC_MsgBox.argtypes = (c_char_p, c_char_p)
 
-    ic.FRAMEREADYCALLBACK = CFUNCTYPE(
-        c_void_p,
-        POINTER(HGRABBER),
-        POINTER(c_ubyte),
-        c_ulong,
-        py_object,
-    )
-
-    ic.DEVICELOSTCALLBACK = CFUNCTYPE(c_void_p, POINTER(HGRABBER), py_object)
+    ic.FRAMEREADYCALLBACK = FRAMEREADYCALLBACK
+    ic.FRAMEREADYCALLBACKEX = FRAMEREADYCALLBACKEX
+    ic.DEVICELOSTCALLBACK = DEVICELOSTCALLBACK
 
     ic.IC_SetFrameReadyCallback.argtypes = (
         POINTER(HGRABBER),
         ic.FRAMEREADYCALLBACK,
         py_object,
     )
+    ic.IC_SetFrameReadyCallbackEx.restype = c_int
+    ic.IC_SetFrameReadyCallbackEx.argtypes = (
+        POINTER(HGRABBER),
+        ic.FRAMEREADYCALLBACKEX,
+        py_object,
+    )
     ic.IC_SetCallbacks.argtypes = (
         POINTER(HGRABBER),
         ic.FRAMEREADYCALLBACK,
@@ -337,6 +467,9 @@ def declare_functions(ic):
     ic.IC_SetWindowPosition.restype = c_int
     ic.IC_SetWindowPosition.argtypes = (POINTER(HGRABBER), c_int, c_int, c_int, c_int)
 
+    ic.IC_PrintItemAndElementNames.restype = c_int
+    ic.IC_PrintItemAndElementNames.argtypes = (POINTER(HGRABBER),)
+
     ic.IC_IsPropertyAvailable.restype = c_int
     ic.IC_IsPropertyAvailable.argtypes = (POINTER(HGRABBER), c_char_p, c_char_p)
 
@@ -358,9 +491,14 @@ def declare_functions(ic):
     )
 
     ic.IC_SetPropertyValue.restype = c_int
-    ic.IC_SetPropertyValue.argtypes = (POINTER(HGRABBER), c_char_p, c_int)
+    ic.IC_SetPropertyValue.argtypes = (
+        POINTER(HGRABBER),
+        c_char_p,
+        c_char_p,
+        c_int,
+    )
 
-    ic.IC_GetPropertyAbsoluteValueRang = c_int
+    ic.IC_GetPropertyAbsoluteValueRange.restype = c_int
     ic.IC_GetPropertyAbsoluteValueRange.argtypes = (
         POINTER(HGRABBER),
         c_char_p,
@@ -399,33 +537,52 @@ def declare_functions(ic):
     ic.IC_PropertyOnePush.restype = c_int
     ic.IC_PropertyOnePush.argtypes = (POINTER(HGRABBER), c_char_p, c_char_p)
 
-    # TODO
-    # ic.IC_GetPropertyMapStrings.restype = c_int
-    # ic.IC_GetPropertyMapStrings.argtypes = (
-    #   POINTER(HGRABBER),
-    #   c_char_p,
-    #   c_char_p,
-    #   c_int,
-    #   ?
-    # )
-    #
-    # ic.IC_SetPropertyMapString.restype = c_int
-    # ic.IC_SetPropertyMapString.argtypes = (
-    #   POINTER(HGRABBER),
-    #   c_char_p,
-    #   c_char_p,
-    #   c_char_p
-    # )
+    ic.IC_GetPropertyMapStrings.restype = c_int
+    ic.IC_GetPropertyMapStrings.argtypes = (
+        POINTER(HGRABBER),
+        c_char_p,
+        c_char_p,
+        POINTER(c_int),
+        POINTER(c_int),
+        POINTER(c_char_p),
+    )
+
+    ic.IC_SetPropertyMapString.restype = c_int
+    ic.IC_SetPropertyMapString.argtypes = (
+        POINTER(HGRABBER),
+        c_char_p,
+        c_char_p,
+        c_char_p,
+    )
+
+    ic.ENUMCB = ENUMCB
+    ic.IC_enumProperties.restype = c_int
+    ic.IC_enumProperties.argtypes = (POINTER(HGRABBER), ic.ENUMCB, py_object)
+
+    ic.IC_enumPropertyElements.restype = c_int
+    ic.IC_enumPropertyElements.argtypes = (
+        POINTER(HGRABBER),
+        c_char_p,
+        ic.ENUMCB,
+        py_object,
+    )
+
+    ic.IC_enumPropertyElementInterfaces.restype = c_int
+    ic.IC_enumPropertyElementInterfaces.argtypes = (
+        POINTER(HGRABBER),
+        c_char_p,
+        c_char_p,
+        ic.ENUMCB,
+        py_object,
+    )
 
     ic.IC_GetAvailableFrameFilterCount.restype = c_int
     ic.IC_GetAvailableFrameFilterCount.argtypes = None
 
     ic.IC_GetAvailableFrameFilters.restype = c_int
-    # NOTE: 22-framefilter.py did not work with these argtypes.
-    # ic.IC_GetAvailableFrameFilters.argtypes = (
-    #     POINTER(POINTER((c_char * 80) * 40)),
-    #     c_int,
-    # )
+    # NOTE: 22-framefilter.py did not work with POINTER(POINTER((c_char * 80) * 40)),
+    # the names are written to an array of string buffers
+    ic.IC_GetAvailableFrameFilters.argtypes = (POINTER(c_char_p), c_int)
 
     ic.IC_CreateFrameFilter.restype = c_int
     ic.IC_CreateFrameFilter.argtypes = (c_char_p, POINTER(HFRAMEFILTER))
@@ -469,7 +626,7 @@ def declare_functions(ic):
     ic.IC_FrameFilterDeviceClear.restype = c_int
     ic.IC_FrameFilterDeviceClear.argtypes = (POINTER(HGRABBER),)
 
-    ic.ENUMCODECCB = CFUNCTYPE(c_void_p, c_char_p, py_object)
+    ic.ENUMCODECCB = ENUMCODECCB
     ic.IC_enumCodecs.argtypes = (ic.ENUMCODECCB, py_object)
 
     ic.IC_Codec_Create.restype = POINTER(HCODEC)
@@ -495,13 +652,115 @@ def declare_functions(ic):
     ic.IC_enableAVICapturePause.restype = c_int
     ic.IC_enableAVICapturePause.argtypes = (POINTER(HGRABBER), c_int)
 
+    ic.IC_SetRingBufferSize.restype = c_int
+    ic.IC_SetRingBufferSize.argtypes = (POINTER(HGRABBER), c_int)
+
+    ic.IC_GetRingBufferSize.restype = c_int
+    ic.IC_GetRingBufferSize.argtypes = (POINTER(HGRABBER), POINTER(c_int))
+
+    ic.IC_GetMemBuffer.restype = c_int
+    ic.IC_GetMemBuffer.argtypes = (
+        POINTER(HGRABBER),
+        c_int,
+        POINTER(POINTER(HMEMBUFFER)),
+    )
+
+    ic.IC_GetMemBufferLastAcq.restype = c_int
+    ic.IC_GetMemBufferLastAcq.argtypes = (
+        POINTER(HGRABBER),
+        POINTER(POINTER(HMEMBUFFER)),
+    )
+
+    ic.IC_ReleaseMemBuffer.restype = None
+    ic.IC_ReleaseMemBuffer.argtypes = (POINTER(POINTER(HMEMBUFFER)),)
+
+    ic.IC_GetMemBufferDescription.restype = c_int
+    ic.IC_GetMemBufferDescription.argtypes = (
+        POINTER(HMEMBUFFER),
+        POINTER(c_int),
+        POINTER(c_int),
+        POINTER(c_int),
+    )
+
+    ic.IC_MemBufferLock.restype = c_int
+    ic.IC_MemBufferLock.argtypes = (POINTER(HMEMBUFFER), c_int)
+
+    ic.IC_MemBufferisLocked.restype = c_int
+    ic.IC_MemBufferisLocked.argtypes = (POINTER(HMEMBUFFER), POINTER(c_int))
+
+    ic.IC_MemBufferGetIndex.restype = c_int
+    ic.IC_MemBufferGetIndex.argtypes = (POINTER(HMEMBUFFER), POINTER(c_int))
+
+    ic.IC_MemBufferGetDataPtr.restype = c_int
+    ic.IC_MemBufferGetDataPtr.argtypes = (
+        POINTER(HMEMBUFFER),
+        POINTER(POINTER(c_ubyte)),
+    )
+
+
+class _Declarations:
+    """Records the prototypes assigned by `declare_functions` without applying them."""
+
+    def __init__(self) -> None:
+        self._prototypes: dict[str, SimpleNamespace] = {}
 
-def load_library():
+    def __getattr__(self, name: str) -> SimpleNamespace:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._prototypes.setdefault(name, SimpleNamespace())
+
+
+@cache
+def _declarations() -> _Declarations:
+    declarations = _Declarations()
+    declare_functions(declarations)
+    return declarations
+
+
+class _LazyLibrary(CDLL):
+    """
+    The DLL with the prototypes of `declare_functions`, which are only applied when a
+    function is first accessed instead of for all functions when loading.
+    """
+
+    def __init__(self, name: str) -> None:
+        declarations = _declarations()
+        self._prototypes = declarations._prototypes
+        super().__init__(name)
+        for attribute, value in vars(declarations).items():
+            if not attribute.startswith("_"):
+                setattr(self, attribute, value)
+
+    def __getattr__(self, name: str) -> Any:
+        # `CDLL.__getattr__` caches the function as attribute, so that this is only
+        # called on first access
+        function = super().__getattr__(name)
+        prototype = self._prototypes.get(name)
+        if prototype is not None:
+            for attribute, value in vars(prototype).items():
+                setattr(function, attribute, value)
+        return function
+
+
+def load_library(backend: Optional[str] = None):
+    """
+    Load the tisgrabber library.
+
+    :param backend: "dll" for the IC Imaging Control DLL shipped with this package or
+        "simulated" for a `SimulatedLibrary`. Defaults to the value of the environment
+        variable `TISGRABBER_BACKEND`, or "dll" if it is not set.
+    """
+    if backend is None:
+        backend = os.environ.get(BACKEND_VARIABLE, "dll")
+    if backend == "simulated":
+        from .simulated import SimulatedLibrary
+
+        return SimulatedLibrary()
+    if backend != "dll":
+        raise ValueError(f"Unknown tisgrabber backend '{backend}'.")
     lib_path = Path(__file__).parent / "dll"
     if platform.machine().endswith("64"):
         lib_path = lib_path / "x64" / "tisgrabber_x64.dll"
     else:
         lib_path = lib_path / "win32" / "tisgrabber.dll"
-    ic = cdll.LoadLibrary(str(lib_path))
-    declare_functions(ic)
-    return ic
+    return _LazyLibrary(str(lib_path))
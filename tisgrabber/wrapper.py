@@ -12,6 +12,9 @@ from .exceptions import (
     IC_NO_PROPERTYSET,
     IC_NOT_AVAILABLE,
     IC_NOT_IN_LIVEMODE,
+    IC_PROPERTY_ELEMENT_NOT_AVAILABLE,
+    IC_PROPERTY_ELEMENT_WRONG_INTERFACE,
+    IC_PROPERTY_ITEM_NOT_AVAILABLE,
     IC_SUCCESS,
     ICError,
     NoHandleError,
@@ -21,17 +24,39 @@ from .exceptions import (
     check_device_handle_error_code,
     check_property_error_code,
 )
-from .tisgrabber import HCODEC, HFRAMEFILTER, HGRABBER, load_library
+from .formats import ImageFormat
+from .instrumentation import InstrumentedLibrary
+from .tisgrabber import HCODEC, HFRAMEFILTER, HGRABBER, HMEMBUFFER, load_library
 
 FilePath = Union[str, Path]
 FRAMEREADYCALLBACK = Callable[[HGRABBER, ctypes.pointer, int, ctypes.Structure], None]
+FRAMEREADYCALLBACKEX = Callable[[HGRABBER, HMEMBUFFER, int, ctypes.Structure], None]
 DEVICELOSTCALLBACK = Callable[[HGRABBER, ctypes.Structure], None]
 
 
+def _handle_key(handle: Any) -> int:
+    try:
+        return ctypes.addressof(handle.contents)
+    except (AttributeError, TypeError, ValueError):
+        return id(handle)
+
+
 class ImageControl:
-    def __init__(self):
-        self._ic = load_library()
-        err = self._ic.IC_InitLibrary()
+    def __init__(self, library: Union[Any, str, None] = None):
+        """
+        :param library: The loaded tisgrabber library or the name of the backend to
+            load ("dll" or "simulated"). If None, the backend is chosen by the
+            environment variable `TISGRABBER_BACKEND` and defaults to the DLL shipped
+            with this package.
+        """
+        if library is None or isinstance(library, str):
+            library = load_library(library)
+        self._ic = library
+        self._image_formats: dict[int, ImageFormat] = {}
+        self._availability: dict[
+            int, dict[Union[CameraProperty, VideoProperty], tuple[bool, bool]]
+        ] = {}
+        err = self._ic.IC_InitLibrary(None)
         if err == IC_ERROR:
             raise ICError("Failed to initialize ImageControl library")
 
@@ -45,17 +70,45 @@ class ImageControl:
         return self._ic.IC_CreateGrabber()
 
     def release_grabber(self, grabber: HGRABBER) -> None:
+        self.invalidate_image_format(grabber)
+        self.invalidate_property_availability(grabber)
         self._ic.IC_ReleaseGrabber(grabber)
 
     def close_library(self) -> None:
         self._ic.IC_CloseLibrary()
 
+    @property
+    def instrumentation(self) -> Optional[InstrumentedLibrary]:
+        """The call statistics of the library, or None if they are not recorded."""
+        if isinstance(self._ic, InstrumentedLibrary):
+            return self._ic
+        return None
+
+    def enable_instrumentation(self) -> InstrumentedLibrary:
+        """
+        Record count, latency and error codes of every library call.
+
+        Return the statistics, which are also available as `instrumentation`.
+        """
+        if not isinstance(self._ic, InstrumentedLibrary):
+            self._ic = InstrumentedLibrary(self._ic)
+        return self._ic
+
+    def disable_instrumentation(self) -> None:
+        """Call the library directly again, without recording statistics."""
+        if isinstance(self._ic, InstrumentedLibrary):
+            self._ic = self._ic.library
+
     def open_video_capture_device(self, grabber: HGRABBER, device_name: str) -> None:
+        self.invalidate_image_format(grabber)
+        self.invalidate_property_availability(grabber)
         err = self._ic.IC_OpenVideoCaptureDevice(grabber, device_name.encode("utf-8"))
         if err == IC_ERROR:
             raise ICError("Failed to open video capture device")
 
     def close_video_capture_device(self, grabber: HGRABBER) -> None:
+        self.invalidate_image_format(grabber)
+        self.invalidate_property_availability(grabber)
         self._ic.IC_CloseVideoCaptureDevice(grabber)
 
     def get_device_name(self, grabber: HGRABBER) -> str:
@@ -70,6 +123,8 @@ class ImageControl:
     # def get_format()
 
     def set_video_format(self, grabber: HGRABBER, format: str) -> None:
+        self.invalidate_image_format(grabber)
+        self.invalidate_property_availability(grabber)
         err = self._ic.IC_SetVideoFormat(grabber, format.encode("utf-8"))
         if err == IC_ERROR:
             raise ICError(f"Failed to set video format to '{format}'")
@@ -79,6 +134,7 @@ class ImageControl:
     # def set_input_channel()
 
     def start_live(self, grabber: HGRABBER) -> None:
+        self.invalidate_image_format(grabber)
         return self._ic.IC_StartLive(grabber, 1)
 
     # def prepare_live()
@@ -111,7 +167,7 @@ class ImageControl:
             ctypes.byref(min_),
             ctypes.byref(max_),
         )
-        if err == IC_SUCCESS:
+        if err != IC_SUCCESS:
             raise ICError("An error occurred while getting camera property range.")
         return min_.value, max_.value
 
@@ -208,6 +264,53 @@ class ImageControl:
         if err == IC_ERROR:
             raise ICError("An error occurred while enabling auto video property.")
 
+    def get_property_availability(
+        self, grabber: HGRABBER, prop: Union[CameraProperty, VideoProperty]
+    ) -> tuple[bool, bool]:
+        """
+        Return whether `prop` and its automatic mode are available, cached per grabber.
+
+        The availability is only queried from the DLL after it has been invalidated by
+        opening a device or changing the video format.
+        """
+        properties = self.property_availability(grabber)
+        try:
+            return properties[prop]
+        except KeyError:
+            if isinstance(prop, CameraProperty):
+                availability = (
+                    self.is_camera_property_available(grabber, prop),
+                    self.is_camera_property_auto_available(grabber, prop),
+                )
+            else:
+                availability = (
+                    self.is_video_property_available(grabber, prop),
+                    self.is_video_property_auto_available(grabber, prop),
+                )
+            properties[prop] = availability
+            return availability
+
+    def property_availability(
+        self, grabber: HGRABBER
+    ) -> dict[Union[CameraProperty, VideoProperty], tuple[bool, bool]]:
+        """
+        Return the availability cached by `get_property_availability` for `grabber`.
+
+        The dict is cleared in place when it is invalidated, so that callers can keep it
+        for fast lookups and fall back to `get_property_availability` on a miss.
+        """
+        return self._availability.setdefault(_handle_key(grabber), {})
+
+    def invalidate_property_availability(
+        self, grabber: Optional[HGRABBER] = None
+    ) -> None:
+        """Drop the cached availability of `grabber`, or of all grabbers if None."""
+        if grabber is None:
+            for properties in self._availability.values():
+                properties.clear()
+        else:
+            self._availability.get(_handle_key(grabber), {}).clear()
+
     def get_image_description(self, grabber: HGRABBER) -> tuple[int, int, int, int]:
         width = ctypes.c_long()
         height = ctypes.c_long()
@@ -241,25 +344,48 @@ class ImageControl:
         if err == IC_ERROR:
             raise ICError("An error occurred while saving the image.")
 
+    def get_image_format(self, grabber: HGRABBER) -> ImageFormat:
+        """
+        Return the cached image format of the grabber.
+
+        The image description is only queried from the DLL after the format has been
+        invalidated, e.g. by changing the video format or the frame filters.
+        """
+        key = _handle_key(grabber)
+        try:
+            return self._image_formats[key]
+        except KeyError:
+            image_format = ImageFormat(*self.get_image_description(grabber))
+            self._image_formats[key] = image_format
+            return image_format
+
+    def invalidate_image_format(self, grabber: Optional[HGRABBER] = None) -> None:
+        """Drop the cached image format of `grabber`, or of all grabbers if None."""
+        if grabber is None:
+            self._image_formats.clear()
+        else:
+            self._image_formats.pop(_handle_key(grabber), None)
+
     def _get_image_ptr(self, grabber: HGRABBER):
         return self._ic.IC_GetImagePtr(grabber)
 
-    def get_image_data(self, grabber: HGRABBER) -> np.ndarray:
-        width, height, bits_per_pixel, _ = self.get_image_description(grabber)
-        buffer_size = width * height * bits_per_pixel
+    def get_image_data(
+        self, grabber: HGRABBER, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Return a view of the current image, which is overwritten by the next frame.
 
+        :param out: If given, the image is copied into this array, which is returned.
+        """
+        image_format = self.get_image_format(grabber)
         image_ptr = self._get_image_ptr(grabber)
-        image_data = ctypes.cast(
-            image_ptr, ctypes.POINTER(ctypes.c_ubyte * buffer_size)
-        )
-
-        image = np.ndarray(
-            buffer=image_data.contents,
-            dtype=np.uint8,
-            shape=(height, width, bits_per_pixel // 8),
-        )
-
-        return image
+        if not image_ptr:
+            raise ICError("No image data available. Snap an image first.")
+        image = image_format.view(image_ptr)
+        if out is None:
+            return image
+        np.copyto(out, image)
+        return out
 
     def set_hwnd(self, grabber: HGRABBER, hwnd: Any) -> None:
         err = self._ic.IC_SetHWnd(grabber, int(hwnd))
@@ -297,8 +423,12 @@ class ImageControl:
 
     # def get_video_format_count()
 
-    def get_video_format(self, grabber: HGRABBER) -> str:
-        return self._ic.IC_GetVideoFormat(grabber).decode("utf-8")
+    def get_video_format(self, grabber: HGRABBER, index: int) -> str:
+        """Return the name of the video format at `index` of the device's list."""
+        video_format = self._ic.IC_GetVideoFormat(grabber, index)
+        if video_format is None:
+            raise ICError(f"No video format at index {index}.")
+        return video_format.decode("utf-8")
 
     def save_device_state_to_file(self, grabber: HGRABBER, file_path: FilePath) -> None:
         err = self._ic.IC_SaveDeviceStateToFile(grabber, str(file_path).encode("utf-8"))
@@ -308,6 +438,8 @@ class ImageControl:
     def load_device_state_from_file(
         self, grabber: HGRABBER, file_path: FilePath
     ) -> HGRABBER:
+        self.invalidate_image_format(grabber)
+        self.invalidate_property_availability(grabber)
         return self._ic.IC_LoadDeviceStateFromFile(
             grabber, str(file_path).encode("utf-8")
         )
@@ -317,19 +449,33 @@ class ImageControl:
     # def get_display_name()
 
     def open_dev_by_unique_name(self, grabber: HGRABBER, unique_name: str) -> None:
+        self.invalidate_image_format(grabber)
+        self.invalidate_property_availability(grabber)
         return self._ic.IC_OpenDevByUniqueName(grabber, unique_name.encode("utf-8"))
 
-    # def get_unique_name()
+    def get_unique_name(self, grabber: HGRABBER) -> str:
+        unique_name = ctypes.create_string_buffer(256)
+        err = self._ic.IC_GetUniqueName(grabber, unique_name, len(unique_name))
+        check_device_handle_error_code(err)
+        if err == IC_ERROR:
+            raise ICError("Failed to get the unique name of the device.")
+        return unique_name.value.decode("utf-8")
 
     def is_dev_valid(self, grabber: HGRABBER) -> bool:
         return bool(self._ic.IC_IsDevValid(grabber))
 
     def show_property_dialog(self, grabber: HGRABBER) -> None:
+        # the video format can be changed in the dialog
+        self.invalidate_image_format(grabber)
+        self.invalidate_property_availability(grabber)
         _ = self._ic.IC_ShowPropertyDialog(grabber)
 
     def show_device_selection_dialog(
         self, grabber: Optional[HGRABBER] = None
     ) -> HGRABBER:
+        if grabber is not None:
+            self.invalidate_image_format(grabber)
+            self.invalidate_property_availability(grabber)
         return self._ic.IC_ShowDeviceSelectionDialog(grabber)
 
     def is_trigger_available(self, grabber: HGRABBER) -> bool:
@@ -358,6 +504,15 @@ class ImageControl:
     ) -> FRAMEREADYCALLBACK:
         return self._ic.FRAMEREADYCALLBACK(callback)
 
+    def create_frame_ready_callback_ex(
+        self,
+        callback: Callable[
+            [HGRABBER, HMEMBUFFER, int, ctypes.Structure],
+            None,
+        ],
+    ) -> FRAMEREADYCALLBACKEX:
+        return self._ic.FRAMEREADYCALLBACKEX(callback)
+
     def create_device_lost_callback(self, callback: Callable[[HGRABBER, Any], None]):
         return self._ic.DEVICELOSTCALLBACK(callback)
 
@@ -369,6 +524,20 @@ class ImageControl:
     ) -> None:
         self._ic.IC_SetFrameReadyCallback(grabber, callback, data)
 
+    def set_frame_ready_callback_ex(
+        self,
+        grabber: HGRABBER,
+        callback: FRAMEREADYCALLBACKEX,
+        data: ctypes.Structure,
+    ) -> None:
+        """
+        Set a callback that receives the image buffer handle instead of a raw pointer.
+        """
+        err = self._ic.IC_SetFrameReadyCallbackEx(grabber, callback, data)
+        check_device_handle_error_code(err)
+        if err == IC_ERROR:
+            raise ICError("Failed to set frame ready callback.")
+
     def set_callbacks(
         self,
         grabber: HGRABBER,
@@ -503,6 +672,36 @@ class ImageControl:
     def print_item_and_element_names(self, grabber: HGRABBER) -> None:
         self._ic.IC_PrintItemAndElementNames(grabber)
 
+    def _enumerate(self, function: Callable, *args: Any) -> list[str]:
+        def callback(name, names):
+            names.append(name.decode("utf-8"))
+            return 0
+
+        names: list[str] = []
+        err = function(*args, self._ic.ENUMCB(callback), names)
+        check_property_error_code(err)
+        return names
+
+    def enum_properties(self, grabber: HGRABBER) -> list[str]:
+        """Return the names of the property items of the device."""
+        return self._enumerate(self._ic.IC_enumProperties, grabber)
+
+    def enum_property_elements(self, grabber: HGRABBER, prop: str) -> list[str]:
+        return self._enumerate(
+            self._ic.IC_enumPropertyElements, grabber, prop.encode("utf-8")
+        )
+
+    def enum_property_element_interfaces(
+        self, grabber: HGRABBER, prop: str, element: str
+    ) -> list[str]:
+        """Return the interfaces of an element, e.g. "Range" or "AbsoluteValues"."""
+        return self._enumerate(
+            self._ic.IC_enumPropertyElementInterfaces,
+            grabber,
+            prop.encode("utf-8"),
+            element.encode("utf-8"),
+        )
+
     def reset_properties(self, grabber: HGRABBER) -> None:
         err = self._ic.IC_ResetProperties(grabber)
         if err != IC_SUCCESS:
@@ -514,10 +713,24 @@ class ImageControl:
 
     # def set_window_position()
 
-    def is_property_available(self, grabber: HGRABBER, prop: str) -> bool:
-        err = self._ic.IC_IsPropertyAvailable(grabber, prop.encode("utf-8"))
+    def is_property_available(
+        self, grabber: HGRABBER, prop: str, element: Optional[str] = None
+    ) -> bool:
+        """Whether a property item, or one of its elements, is available."""
+        err = self._ic.IC_IsPropertyAvailable(
+            grabber,
+            prop.encode("utf-8"),
+            None if element is None else element.encode("utf-8"),
+        )
+        if err in (
+            IC_ERROR,
+            IC_PROPERTY_ITEM_NOT_AVAILABLE,
+            IC_PROPERTY_ELEMENT_NOT_AVAILABLE,
+            IC_PROPERTY_ELEMENT_WRONG_INTERFACE,
+        ):
+            return False
         check_property_error_code(err)
-        return bool(err)
+        return err == IC_SUCCESS
 
     def get_property_value_range(
         self, grabber: HGRABBER, prop: str, element: str
@@ -544,6 +757,8 @@ class ImageControl:
             grabber, prop.encode("utf-8"), element.encode("utf-8"), value
         )
         check_property_error_code(err)
+        if err == IC_ERROR:
+            raise ICError(f"Failed to set property value {prop}/{element}.")
 
     def get_property_absolute_value_range(
         self, grabber: HGRABBER, prop: str, element: str
@@ -572,6 +787,8 @@ class ImageControl:
             grabber, prop.encode("utf-8"), element.encode("utf-8"), value
         )
         check_property_error_code(err)
+        if err == IC_ERROR:
+            raise ICError(f"Failed to set property absolute value {prop}/{element}.")
 
     def get_property_switch(self, grabber: HGRABBER, prop: str, element: str) -> bool:
         on = ctypes.c_int()
@@ -588,6 +805,8 @@ class ImageControl:
             grabber, prop.encode("utf-8"), element.encode("utf-8"), int(on)
         )
         check_property_error_code(err)
+        if err == IC_ERROR:
+            raise ICError(f"Failed to set property switch {prop}/{element}.")
 
     def property_one_push(self, grabber: HGRABBER, prop: str) -> None:
         err = self._ic.IC_PropertyOnePush(
@@ -595,9 +814,44 @@ class ImageControl:
         )
         check_property_error_code(err)
 
-    # def get_property_map_strings()
+    def get_property_map_strings(
+        self, grabber: HGRABBER, prop: str, element: str
+    ) -> list[str]:
+        prop_, element_ = prop.encode("utf-8"), element.encode("utf-8")
+        count, max_length = ctypes.c_int(), ctypes.c_int()
+        # the first call only returns the number and maximum length of the strings
+        err = self._ic.IC_GetPropertyMapStrings(
+            grabber, prop_, element_, count, max_length, None
+        )
+        check_property_error_code(err)
+        string_buffers = [
+            ctypes.create_string_buffer(max_length.value + 1)
+            for _ in range(count.value)
+        ]
+        pointers = (ctypes.c_char_p * count.value)(
+            *map(ctypes.addressof, string_buffers)
+        )
+        err = self._ic.IC_GetPropertyMapStrings(
+            grabber, prop_, element_, count, max_length, pointers
+        )
+        check_property_error_code(err)
+        return [
+            string_buffer.value.decode("utf-8")
+            for string_buffer in string_buffers[: count.value]
+        ]
 
-    # def set_property_map_strings()
+    def set_property_map_string(
+        self, grabber: HGRABBER, prop: str, element: str, string: str
+    ) -> None:
+        err = self._ic.IC_SetPropertyMapString(
+            grabber,
+            prop.encode("utf-8"),
+            element.encode("utf-8"),
+            string.encode("utf-8"),
+        )
+        check_property_error_code(err)
+        if err == IC_ERROR:
+            raise ICError(f"Failed to set property map string {prop}/{element}.")
 
     def get_available_frame_filter_count(self):
         return self._ic.IC_GetAvailableFrameFilterCount()
@@ -624,6 +878,7 @@ class ImageControl:
     def add_frame_filter_to_device(
         self, grabber: HGRABBER, filter: HFRAMEFILTER
     ) -> None:
+        self.invalidate_image_format(grabber)
         err = self._ic.IC_AddFrameFilterToDevice(grabber, filter)
         if err == IC_ERROR:
             raise ICError("Adding frame filter failed.")
@@ -637,6 +892,8 @@ class ImageControl:
     def frame_filter_set_parameter_int(
         self, filter: HFRAMEFILTER, param: str, value: int
     ) -> None:
+        # filter parameters can change the geometry of any grabber using it
+        self.invalidate_image_format()
         err = self._ic.IC_FrameFilterSetParameterInt(
             filter, param.encode("utf-8"), value
         )
@@ -647,6 +904,7 @@ class ImageControl:
     def frame_filter_set_parameter_float(
         self, filter: HFRAMEFILTER, param: str, value: float
     ) -> None:
+        self.invalidate_image_format()
         err = self._ic.IC_FrameFilterSetParameterFloat(
             filter, param.encode("utf-8"), value
         )
@@ -657,6 +915,7 @@ class ImageControl:
     def frame_filter_set_parameter_boolean(
         self, filter: HFRAMEFILTER, param: str, value: bool
     ) -> None:
+        self.invalidate_image_format()
         err = self._ic.IC_FrameFilterSetParameterBoolean(
             filter, param.encode("utf-8"), int(value)
         )
@@ -667,6 +926,7 @@ class ImageControl:
     def frame_filter_set_parameter_string(
         self, filter: HFRAMEFILTER, param: str, value: str
     ) -> None:
+        self.invalidate_image_format()
         err = self._ic.IC_FrameFilterSetParameterString(
             filter, param.encode("utf-8"), value
         )
@@ -675,6 +935,7 @@ class ImageControl:
             raise ICError("Setting frame filter parameter failed.")
 
     def frame_filter_device_clear(self, grabber: HGRABBER) -> None:
+        self.invalidate_image_format(grabber)
         self._ic.IC_FrameFilterDeviceClear(grabber)
 
     def get_available_codecs(self) -> list[str]:
@@ -708,3 +969,82 @@ class ImageControl:
 
     def enable_avi_capture_pause(self, grabber: HGRABBER, enable: bool) -> None:
         self._ic.IC_enableAVICapturePause(grabber, int(enable))
+
+    def set_ring_buffer_size(self, grabber: HGRABBER, count: int) -> None:
+        """
+        Set the number of image buffers of the internal ring buffer.
+
+        The live video must be stopped before calling this.
+        """
+        err = self._ic.IC_SetRingBufferSize(grabber, count)
+        check_device_handle_error_code(err)
+        if err == IC_ERROR:
+            raise ICError(
+                f"Failed to set ring buffer size to {count}. Is live mode running?"
+            )
+
+    def get_ring_buffer_size(self, grabber: HGRABBER) -> int:
+        count = ctypes.c_int()
+        err = self._ic.IC_GetRingBufferSize(grabber, ctypes.byref(count))
+        check_device_handle_error_code(err)
+        return count.value
+
+    def get_mem_buffer(self, grabber: HGRABBER, index: int) -> HMEMBUFFER:
+        buffer = ctypes.POINTER(HMEMBUFFER)()
+        err = self._ic.IC_GetMemBuffer(grabber, index, ctypes.byref(buffer))
+        check_device_handle_error_code(err)
+        if err == IC_ERROR:
+            raise ICError(f"Failed to get image buffer {index}. Is the sink created?")
+        return buffer
+
+    def get_mem_buffer_last_acq(self, grabber: HGRABBER) -> HMEMBUFFER:
+        buffer = ctypes.POINTER(HMEMBUFFER)()
+        err = self._ic.IC_GetMemBufferLastAcq(grabber, ctypes.byref(buffer))
+        check_device_handle_error_code(err)
+        if err == IC_ERROR:
+            raise ICError("Failed to get last acquired image buffer.")
+        return buffer
+
+    def release_mem_buffer(self, buffer: HMEMBUFFER) -> None:
+        self._ic.IC_ReleaseMemBuffer(ctypes.byref(buffer))
+
+    def get_mem_buffer_description(self, buffer: HMEMBUFFER) -> tuple[int, int, int]:
+        width = ctypes.c_int()
+        height = ctypes.c_int()
+        bits_per_pixel = ctypes.c_int()
+        err = self._ic.IC_GetMemBufferDescription(
+            buffer,
+            ctypes.byref(width),
+            ctypes.byref(height),
+            ctypes.byref(bits_per_pixel),
+        )
+        if err != IC_SUCCESS:
+            raise NoHandleError("Invalid image buffer handle.")
+        return width.value, height.value, bits_per_pixel.value
+
+    def mem_buffer_lock(self, buffer: HMEMBUFFER, lock: bool) -> None:
+        """Lock or unlock an image buffer. Locked buffers are not overwritten."""
+        err = self._ic.IC_MemBufferLock(buffer, int(lock))
+        if err != IC_SUCCESS:
+            raise NoHandleError("Invalid image buffer handle.")
+
+    def mem_buffer_is_locked(self, buffer: HMEMBUFFER) -> bool:
+        locked = ctypes.c_int()
+        err = self._ic.IC_MemBufferisLocked(buffer, ctypes.byref(locked))
+        if err != IC_SUCCESS:
+            raise NoHandleError("Invalid image buffer handle.")
+        return bool(locked.value)
+
+    def mem_buffer_get_index(self, buffer: HMEMBUFFER) -> int:
+        index = ctypes.c_int()
+        err = self._ic.IC_MemBufferGetIndex(buffer, ctypes.byref(index))
+        if err != IC_SUCCESS:
+            raise NoHandleError("Invalid image buffer handle.")
+        return index.value
+
+    def mem_buffer_get_data_ptr(self, buffer: HMEMBUFFER):
+        data = ctypes.POINTER(ctypes.c_ubyte)()
+        err = self._ic.IC_MemBufferGetDataPtr(buffer, ctypes.byref(data))
+        if err != IC_SUCCESS:
+            raise NoHandleError("Invalid image buffer handle.")
+        return data
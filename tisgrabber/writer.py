@@ -0,0 +1,233 @@
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Self, Union
+
+import numpy as np
+
+from .frames import Frame, FrameLease
+from .wrapper import FilePath
+
+# file extension -> format passed to the encoder
+FORMATS = {
+    ".npy": "NPY",
+    ".png": "PNG",
+    ".tif": "TIFF",
+    ".tiff": "TIFF",
+    ".jpg": "JPEG",
+    ".jpeg": "JPEG",
+    ".bmp": "BMP",
+}
+
+
+def _to_pil_array(image: np.ndarray) -> np.ndarray:
+    # sinks deliver BGR(A), Pillow expects RGB(A)
+    if image.ndim == 3 and image.shape[2] == 1:
+        return image[..., 0]
+    if image.ndim == 3 and image.shape[2] == 3:
+        return np.ascontiguousarray(image[..., ::-1])
+    if image.ndim == 3 and image.shape[2] == 4:
+        return np.ascontiguousarray(image[..., [2, 1, 0, 3]])
+    return image
+
+
+def encode_image(path: str, image: np.ndarray, format: str, options: dict) -> int:
+    """Encode `image` to `path` and return the number of bytes written."""
+    if format == "NPY":
+        np.save(path, image, allow_pickle=False)
+    else:
+        try:
+            from PIL import Image
+        except ImportError as e:
+            raise ImportError(
+                f"Writing {format} images requires Pillow. Install it with "
+                "`pip install py-tisgrabber[imaging]`."
+            ) from e
+        Image.fromarray(_to_pil_array(image)).save(path, format=format, **options)
+    return os.path.getsize(path)
+
+
+@dataclass(frozen=True)
+class WriteResult:
+    """Outcome of writing one image, passed to the completion callback."""
+
+    index: int
+    path: Path
+    nbytes: int
+    error: Optional[BaseException] = None
+
+
+@dataclass(frozen=True)
+class WriterStats:
+    """Throughput of an `ImageWriter` since its first image was submitted."""
+
+    written: int
+    failed: int
+    dropped: int
+    queue_depth: int
+    nbytes: int
+    elapsed: float
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.written / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.nbytes / self.elapsed / 1e6 if self.elapsed else 0.0
+
+
+class ImageWriter:
+    """
+    Encode and save images in the background instead of on the acquisition thread.
+
+    Images are encoded in a thread pool, or in any other executor such as a
+    `ProcessPoolExecutor`. The format is chosen from the file extension (PNG, TIFF,
+    NPY, JPEG or BMP). At most `max_pending` images are queued: `write` then blocks,
+    or drops the image if `block` is False. Completion callbacks are called in
+    submission order, from the thread that completes the image.
+
+    Arrays passed to `write` must not be modified until they have been written. Frames
+    and leases from a `FramePool` are released after writing.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pending: int = 16,
+        executor: Optional[Executor] = None,
+        on_done: Optional[Callable[[WriteResult], None]] = None,
+    ) -> None:
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            workers, thread_name_prefix="tisgrabber-writer"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        # notified when the last image has been finished, including its callback
+        self._idle = threading.Condition(self._lock)
+        self._order_lock = threading.Lock()
+        self._on_done = on_done
+        self._submitted = 0
+        self._pending = 0
+        self._unfinished = 0
+        self._next = 0
+        self._finished: dict[int, WriteResult] = {}
+        self._written = 0
+        self._failed = 0
+        self._dropped = 0
+        self._nbytes = 0
+        self._start: Optional[float] = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def stats(self) -> WriterStats:
+        with self._lock:
+            elapsed = 0.0 if self._start is None else time.perf_counter() - self._start
+            return WriterStats(
+                written=self._written,
+                failed=self._failed,
+                dropped=self._dropped,
+                queue_depth=self._pending,
+                nbytes=self._nbytes,
+                elapsed=elapsed,
+            )
+
+    def write(
+        self,
+        image: Union[np.ndarray, Frame, FrameLease],
+        path: FilePath,
+        block: bool = True,
+        **options: Any,
+    ) -> bool:
+        """
+        Queue `image` for writing to `path`. Options are passed to Pillow, e.g.
+        `quality=90` for JPEG. Return False if the image was dropped.
+        """
+        path = Path(path)
+        try:
+            format = FORMATS[path.suffix.lower()]
+        except KeyError:
+            raise ValueError(f"Unsupported image file type '{path.suffix}'.")
+        if not self._slots.acquire(blocking=block):
+            with self._lock:
+                self._dropped += 1
+            return False
+        with self._lock:
+            if self._start is None:
+                self._start = time.perf_counter()
+            index = self._submitted
+            self._submitted += 1
+            self._pending += 1
+            self._unfinished += 1
+        try:
+            future = self._executor.submit(
+                encode_image, str(path), np.asarray(image), format, options
+            )
+        except BaseException as e:
+            self._finish(index, path, image, error=e)
+            raise
+        future.add_done_callback(
+            lambda future: self._finish(index, path, image, future=future)
+        )
+        return True
+
+    def _finish(
+        self,
+        index: int,
+        path: Path,
+        image: Union[np.ndarray, Frame, FrameLease],
+        future: Optional[Future] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        try:
+            if isinstance(image, (Frame, FrameLease)):
+                image.release()
+            nbytes = 0
+            if future is not None:
+                error = future.exception()
+                if error is None:
+                    nbytes = future.result()
+            with self._lock:
+                self._pending -= 1
+                if error is None:
+                    self._written += 1
+                    self._nbytes += nbytes
+                else:
+                    self._failed += 1
+            self._slots.release()
+            # results are drained in submission order by one thread at a time
+            with self._order_lock:
+                self._finished[index] = WriteResult(index, path, nbytes, error)
+                while self._next in self._finished:
+                    result = self._finished.pop(self._next)
+                    self._next += 1
+                    if self._on_done is not None:
+                        self._on_done(result)
+        finally:
+            with self._idle:
+                self._unfinished -= 1
+                if not self._unfinished:
+                    self._idle.notify_all()
+
+    def flush(self) -> None:
+        """
+        Wait until all queued images have been written and their completion callbacks
+        have returned.
+        """
+        with self._idle:
+            self._idle.wait_for(lambda: not self._unfinished)
+
+    def close(self) -> None:
+        """Wait for the queued images and shut down the executor if it is our own."""
+        self.flush()
+        if self._own_executor:
+            self._executor.shutdown()